@@ -25,6 +25,7 @@ from src.routes.user import user_bp
 from src.routes.interview import interview_bp
 from src.routes.admin import admin_bp
 from src.routes.websocket import register_socket_handlers
+from src.routes.admin_monitor import register_admin_monitor_handlers
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
@@ -32,8 +33,13 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
 # CORS configuration
 CORS(app, origins=os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(','))
 
-# SocketIO configuration
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
+# SocketIO configuration (a message queue fans room emits out across workers)
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    async_mode='eventlet',
+    message_queue=os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+)
 
 # Register blueprints
 app.register_blueprint(user_bp, url_prefix='/api')
@@ -49,8 +55,25 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 # Initialize database
 db.init_app(app)
 
+# Transcript segments are written in batches by a background flusher
+from src.services.transcript_buffer import transcript_buffer
+transcript_buffer.init_app(app)
+
+# Recording chunks are spooled to disk during the interview and fsynced in batches
+from src.services.recording_spool import recording_spool
+recording_spool.start()
+
 # Register WebSocket handlers
 register_socket_handlers(socketio)
+register_admin_monitor_handlers(socketio)
+
+# Transcription and AI responses run on a bounded background pool
+from src.services.task_pool import task_pool
+task_pool.init_app(app, socketio)
+
+# Transcript updates are batched per room before they are emitted
+from src.services.emit_coalescer import emit_coalescer
+emit_coalescer.init_app(app, socketio)
 
 with app.app_context():
     db.create_all()
@@ -96,6 +119,10 @@ Current question context will be provided with each interaction.""",
         db.session.add(default_prompt)
         db.session.commit()
 
+# Recordings are moved to cloud storage by background upload workers
+from src.services.cloud_storage import cloud_storage
+cloud_storage.init_app(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
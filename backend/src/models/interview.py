@@ -88,8 +88,8 @@ class Recording(db.Model):
     file_path = db.Column(db.String(500), nullable=False)
     file_size = db.Column(db.Integer, nullable=True)
     duration = db.Column(db.Float, nullable=True)  # seconds
-    cloud_url = db.Column(db.String(1000), nullable=True)  # Cloud storage URL
-    storage_type = db.Column(db.String(20), default='local')  # local, cloud
+    cloud_url = db.Column(db.String(1000), nullable=True)  # Unused; cloud downloads are presigned from file_path on demand
+    storage_type = db.Column(db.String(20), default='local')  # local, cloud, client (metadata only, no server file)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -111,6 +111,21 @@ class TranscriptSegment(db.Model):
     session = db.relationship('InterviewSession', backref='transcript_segments')
     question = db.relationship('Question', backref='transcript_segments')
 
+class AIResponse(db.Model):
+    __tablename__ = 'ai_responses'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('interview_sessions.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=True)
+    response_type = db.Column(db.String(20), nullable=False)  # hint, clarification, encouragement
+    response_text = db.Column(db.Text, nullable=False)
+    context_data = db.Column(db.JSON, nullable=True)  # Request context and raw Gemini response
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    session = db.relationship('InterviewSession', backref='ai_responses')
+    question = db.relationship('Question', backref='ai_responses')
+
 class AIPromptTemplate(db.Model):
     __tablename__ = 'ai_prompt_templates'
     
@@ -8,6 +8,7 @@ from src.models.interview import (
     db, InterviewCode, QuestionSet, Question, InterviewSession, 
     QuestionResponse, AIPromptTemplate, AdminUser
 )
+from src.services.session_resolver import session_resolver
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -274,20 +275,9 @@ def get_sessions():
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
-        sessions = InterviewSession.query.order_by(InterviewSession.created_at.desc()).all()
-        
-        return jsonify({
-            'sessions': [{
-                'id': session.session_id,
-                'candidate_name': session.candidate_name,
-                'status': session.status,
-                'question_set_name': session.question_set.name,
-                'started_at': session.started_at.isoformat() if session.started_at else None,
-                'completed_at': session.completed_at.isoformat() if session.completed_at else None,
-                'created_at': session.created_at.isoformat(),
-                'response_count': len(session.responses)
-            } for session in sessions]
-        })
+        # Live dashboards use the /admin Socket.IO namespace instead of polling
+        from src.services.admin_feed import load_session_summaries
+        return jsonify({'sessions': load_session_summaries()})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -419,11 +409,11 @@ def get_session_responses(session_id):
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
-        session_obj = InterviewSession.query.filter_by(session_id=session_id).first()
+        session_obj = session_resolver.resolve(session_id)
         if not session_obj:
             return jsonify({'error': 'Session not found'}), 404
         
-        responses = QuestionResponse.query.filter_by(session_id=session_obj.id).all()
+        responses = QuestionResponse.query.filter_by(session_id=session_obj.db_id).all()
         
         response_data = []
         for response in responses:
@@ -453,12 +443,15 @@ def get_session_transcripts(session_id):
     
     try:
         from src.models.interview import TranscriptSegment
+        from src.services.transcript_buffer import transcript_buffer
         
-        session_obj = InterviewSession.query.filter_by(session_id=session_id).first()
+        session_obj = session_resolver.resolve(session_id)
         if not session_obj:
             return jsonify({'error': 'Session not found'}), 404
         
-        transcripts = TranscriptSegment.query.filter_by(session_id=session_obj.id).order_by(TranscriptSegment.start_time).all()
+        # Include segments still waiting in this worker's write-behind buffer
+        transcript_buffer.flush()
+        transcripts = TranscriptSegment.query.filter_by(session_id=session_obj.db_id).order_by(TranscriptSegment.start_time).all()
         
         transcript_data = []
         for transcript in transcripts:
@@ -488,11 +481,11 @@ def get_session_ai_responses(session_id):
     try:
         from src.models.interview import AIResponse
         
-        session_obj = InterviewSession.query.filter_by(session_id=session_id).first()
+        session_obj = session_resolver.resolve(session_id)
         if not session_obj:
             return jsonify({'error': 'Session not found'}), 404
         
-        ai_responses = AIResponse.query.filter_by(session_id=session_obj.id).order_by(AIResponse.created_at).all()
+        ai_responses = AIResponse.query.filter_by(session_id=session_obj.db_id).order_by(AIResponse.created_at).all()
         
         ai_response_data = []
         for ai_response in ai_responses:
@@ -521,12 +514,14 @@ def get_session_recordings(session_id):
     
     try:
         from src.models.interview import Recording
+        from src.routes.interview import recording_download_urls
         
-        session_obj = InterviewSession.query.filter_by(session_id=session_id).first()
+        session_obj = session_resolver.resolve(session_id)
         if not session_obj:
             return jsonify({'error': 'Session not found'}), 404
         
-        recordings = Recording.query.filter_by(session_id=session_obj.id).all()
+        recordings = Recording.query.filter_by(session_id=session_obj.db_id).all()
+        download_urls = recording_download_urls(recordings)
         
         recording_data = []
         for recording in recordings:
@@ -536,6 +531,8 @@ def get_session_recordings(session_id):
                 'file_path': recording.file_path,
                 'file_size': recording.file_size,
                 'duration': recording.duration,
+                'storage_type': recording.storage_type,
+                'download_url': download_urls.get(recording.id),
                 'created_at': recording.created_at.isoformat()
             })
         
@@ -555,21 +552,50 @@ def download_recording(recording_id):
     
     try:
         from src.models.interview import Recording
-        from flask import send_file
-        import os
+        from src.routes.interview import recording_file_response
         
         recording = Recording.query.get_or_404(recording_id)
-        
-        if not os.path.exists(recording.file_path):
-            return jsonify({'error': 'Recording file not found'}), 404
-        
-        return send_file(
-            recording.file_path,
-            as_attachment=True,
-            download_name=f'recording_{recording_id}.webm'
-        )
+        return recording_file_response(recording)
         
     except Exception as e:
 
         return jsonify({'error': str(e)}), 500
 
+
+@admin_bp.route('/ai-stats', methods=['GET'])
+def get_ai_stats():
+    """Get AI service cache, scheduler and resilience metrics"""
+    if not require_admin_auth():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    try:
+        from src.services.gemini_service import gemini_service
+        from src.services.speculation import speculation_cache
+        from src.services.transcript_buffer import transcript_buffer
+        from src.services.task_pool import task_pool
+        from src.services.transcript_sequencer import transcript_sequencer
+        from src.services.emit_coalescer import emit_coalescer
+        from src.services.event_replay import event_replay
+        from src.services.recording_spool import recording_spool
+        from src.services.cloud_storage import cloud_storage
+        
+        return jsonify({
+            'success': True,
+            'response_cache': gemini_service.get_cache_stats(),
+            'semantic_cache': gemini_service.get_semantic_cache_stats(),
+            'scheduler': gemini_service.get_scheduler_stats(),
+            'resilience': gemini_service.get_resilience_stats(),
+            'speculation': speculation_cache.get_stats(),
+            'transcript_buffer': transcript_buffer.get_stats(),
+            'task_pool': task_pool.get_stats(),
+            'transcript_sequencer': transcript_sequencer.get_stats(),
+            'emit_coalescer': emit_coalescer.get_stats(),
+            'session_resolver': session_resolver.get_stats(),
+            'event_replay': event_replay.get_stats(),
+            'recording_spool': recording_spool.get_stats(),
+            'cloud_uploads': cloud_storage.get_upload_stats(),
+            'presigned_urls': cloud_storage.get_url_cache_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,24 @@
+from flask import session
+from flask_socketio import emit, join_room
+from src.services.admin_feed import ADMIN_NAMESPACE, ADMIN_ROOM, load_session_summaries
+
+def handle_admin_connect(auth=None):
+    """Send a session snapshot to an admin dashboard, then stream deltas to it"""
+    if not session.get('admin_authenticated', False):
+        return False
+
+    # Join before loading so no delta committed after the snapshot is missed
+    join_room(ADMIN_ROOM)
+    emit('sessions_snapshot', {'sessions': load_session_summaries()})
+
+def handle_admin_snapshot_request(data=None):
+    """Resend the snapshot, e.g. after the dashboard notices it fell behind"""
+    if not session.get('admin_authenticated', False):
+        emit('error', {'message': 'Authentication required'})
+        return
+    emit('sessions_snapshot', {'sessions': load_session_summaries()})
+
+def register_admin_monitor_handlers(socketio):
+    """Register the admin monitoring namespace"""
+    socketio.on_event('connect', handle_admin_connect, namespace=ADMIN_NAMESPACE)
+    socketio.on_event('request_snapshot', handle_admin_snapshot_request, namespace=ADMIN_NAMESPACE)
@@ -1,13 +1,34 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 import json
+import os
 from src.models.interview import (
     db, InterviewCode, QuestionSet, Question, InterviewSession, 
     QuestionResponse, AIPromptTemplate
 )
+from src.services.session_resolver import session_resolver
+from src.services.admin_feed import publish_session_delta, publish_session_created
 
 interview_bp = Blueprint('interview', __name__)
 
+def start_speculation(session, question):
+    """Precompute the opening hint and a later follow-up for a question that just became current"""
+    from src.services.speculation import speculation_cache
+    
+    # Same prompt lookup as the ai_response_request handler, so results match its cache keys
+    ai_prompt = None
+    if session.question_set and hasattr(session.question_set, 'ai_prompt'):
+        ai_prompt = session.question_set.ai_prompt.prompt_text if session.question_set.ai_prompt else None
+    
+    speculation_cache.on_question_started(
+        session.session_id,
+        session.id,
+        question.id,
+        question.text,
+        question.time_limit,
+        ai_prompt
+    )
+
 @interview_bp.route('/validate-code', methods=['POST'])
 def validate_code():
     """Validate interview code and candidate name"""
@@ -49,6 +70,7 @@ def validate_code():
         
         db.session.add(session)
         db.session.commit()
+        publish_session_created(session.id)
         
         return jsonify({
             'success': True,
@@ -128,6 +150,15 @@ def start_session(session_id):
         session.current_question_id = first_question.id
         
         db.session.commit()
+        session_resolver.refresh(session)
+        publish_session_delta(
+            'status_changed', session_id,
+            status=session.status,
+            started_at=session.started_at.isoformat(),
+            current_question_id=session.current_question_id
+        )
+        
+        start_speculation(session, first_question)
         
         return jsonify({
             'success': True,
@@ -166,10 +197,17 @@ def next_question(session_id):
             Question.order_index > current_question.order_index
         ).order_by(Question.order_index).first()
         
+        # The finished question's streamed recording becomes a Recording
+        seal_recordings(session_resolver.refresh(session), current_question.id)
+        
         if next_q:
             # Move to next question
             session.current_question_id = next_q.id
             db.session.commit()
+            session_resolver.refresh(session)
+            publish_session_delta('question_advanced', session_id, current_question_id=next_q.id)
+            
+            start_speculation(session, next_q)
             
             return jsonify({
                 'success': True,
@@ -185,6 +223,15 @@ def next_question(session_id):
             session.status = 'completed'
             session.completed_at = datetime.utcnow()
             db.session.commit()
+            seal_recordings(session_resolver.refresh(session), all_questions=True)
+            publish_session_delta(
+                'status_changed', session_id,
+                status=session.status,
+                completed_at=session.completed_at.isoformat()
+            )
+            
+            from src.services.speculation import speculation_cache
+            speculation_cache.clear_session(session_id)
             
             return jsonify({
                 'success': True,
@@ -206,14 +253,14 @@ def save_response(session_id):
         ai_analysis = data.get('ai_analysis', {})
         ai_score = data.get('ai_score')
         
-        session = InterviewSession.query.filter_by(session_id=session_id).first()
+        session = session_resolver.resolve(session_id)
         
         if not session:
             return jsonify({'error': 'Session not found'}), 404
         
         # Check if response already exists
         existing_response = QuestionResponse.query.filter_by(
-            session_id=session.id,
+            session_id=session.db_id,
             question_id=question_id
         ).first()
         
@@ -226,7 +273,7 @@ def save_response(session_id):
         else:
             # Create new response
             response = QuestionResponse(
-                session_id=session.id,
+                session_id=session.db_id,
                 question_id=question_id,
                 transcript=transcript,
                 ai_analysis=json.dumps(ai_analysis) if ai_analysis else None,
@@ -237,6 +284,14 @@ def save_response(session_id):
         
         db.session.commit()
         
+        response_count = QuestionResponse.query.filter_by(session_id=session.db_id).count()
+        publish_session_delta(
+            'score_written', session_id,
+            question_id=question_id,
+            ai_score=ai_score,
+            response_count=response_count
+        )
+        
         return jsonify({'success': True})
         
     except Exception as e:
@@ -271,6 +326,64 @@ def get_ai_prompt(session_id):
         return jsonify({'error': str(e)}), 500
 
 
+def store_recording(session, file_path, file_size, question_id, recording_type, duration):
+    """Hand a received recording to storage and save its Recording row; returns the response body"""
+    from src.services.cloud_storage import cloud_storage
+    from src.models.interview import Recording
+    
+    # Save recording metadata to database; it starts out local
+    question_id = str(question_id) if question_id is not None else ''
+    recording = Recording(
+        session_id=session.db_id,
+        question_id=int(question_id) if question_id.isdigit() else None,
+        recording_type=recording_type,
+        file_path=file_path,
+        file_size=file_size,
+        duration=float(duration) if duration else 0.0,
+        storage_type='local'
+    )
+    
+    db.session.add(recording)
+    db.session.commit()
+    
+    # Upload to cloud storage in the background; the row switches to cloud when done
+    upload_queued = cloud_storage.enqueue_upload(recording.id)
+    
+    return {
+        'success': True,
+        'recording_id': recording.id,
+        'file_size': file_size,
+        'duration': recording.duration,
+        'storage_type': recording.storage_type,
+        'cloud_upload_pending': upload_queued,
+        'message': 'Recording uploaded successfully'
+    }
+
+def seal_recordings(session, question_id=None, all_questions=False):
+    """Store the recording chunks spooled for a question, or for every question, as Recordings"""
+    from src.services.recording_spool import recording_spool
+    
+    upload_dir = os.path.join(os.getcwd(), 'uploads', 'recordings')
+    try:
+        if all_questions:
+            sealed = recording_spool.seal_session(session.session_id, upload_dir)
+        else:
+            sealed = recording_spool.seal(session.session_id, question_id, upload_dir)
+        
+        for spooled in sealed:
+            store_recording(
+                session,
+                spooled['path'],
+                spooled['size'],
+                spooled['question_id'],
+                'video',
+                spooled['duration']
+            )
+    except Exception as e:
+        # The spool stays on disk and is sealed with the rest of the session
+        db.session.rollback()
+        print(f"Error sealing recordings for session {session.session_id}: {str(e)}")
+
 @interview_bp.route('/upload-recording', methods=['POST'])
 def upload_recording():
     """Upload interview recording"""
@@ -293,7 +406,7 @@ def upload_recording():
             return jsonify({'error': 'Session ID is required'}), 400
         
         # Verify session exists
-        session = InterviewSession.query.filter_by(session_id=session_id).first()
+        session = session_resolver.resolve(session_id)
         if not session:
             return jsonify({'error': 'Invalid session ID'}), 404
         
@@ -312,52 +425,146 @@ def upload_recording():
         file.save(file_path)
         file_size = os.path.getsize(file_path)
         
-        # Upload to cloud storage
-        from src.services.cloud_storage import cloud_storage
-        storage_result = cloud_storage.upload_file(file_path, session_id, recording_type)
+        return jsonify(store_recording(session, file_path, file_size, question_id, recording_type, duration))
         
-        # Save recording metadata to database
-        from src.models.interview import Recording
-        recording = Recording(
-            session_id=session.id,
-            question_id=int(question_id) if question_id and question_id.isdigit() else None,
-            recording_type=recording_type,
-            file_path=file_path if storage_result['storage_type'] == 'local' else storage_result.get('cloud_key', file_path),
-            file_size=file_size,
-            duration=float(duration) if duration else 0.0,
-            cloud_url=storage_result.get('cloud_url'),
-            storage_type=storage_result['storage_type']
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error uploading recording: {str(e)}")
+        return jsonify({'error': 'Failed to upload recording'}), 500
+
+def upload_error_response(error):
+    """JSON body for a rejected resumable upload request"""
+    return jsonify(dict(error.details, error=error.message)), error.status_code
+
+@interview_bp.route('/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable recording upload"""
+    from src.services.resumable_upload import upload_store, UploadError
+    
+    try:
+        data = request.get_json()
+        session_id = data.get('session_id')
+        total_size = data.get('total_size')
+        
+        if not session_id:
+            return jsonify({'error': 'Session ID is required'}), 400
+        
+        if not session_resolver.resolve(session_id):
+            return jsonify({'error': 'Invalid session ID'}), 404
+        
+        upload = upload_store.create({
+            'session_id': session_id,
+            'question_id': data.get('question_id'),
+            'recording_type': data.get('recording_type', 'video'),
+            'duration': data.get('duration', 0),
+            'extension': os.path.splitext(data.get('filename', ''))[1] or '.webm'
+        }, total_size=int(total_size) if total_size is not None else None)
+        
+        return jsonify(upload), 201
+        
+    except UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        print(f"Error creating upload: {str(e)}")
+        return jsonify({'error': 'Failed to create upload'}), 500
+
+@interview_bp.route('/uploads/<upload_id>', methods=['GET'])
+def get_upload_status(upload_id):
+    """Report how much of a resumable upload the server has"""
+    from src.services.resumable_upload import upload_store, UploadError
+    
+    try:
+        return jsonify(upload_store.status(upload_id))
+    except UploadError as e:
+        return upload_error_response(e)
+
+@interview_bp.route('/uploads/<upload_id>', methods=['PATCH', 'PUT'])
+def upload_chunk(upload_id):
+    """
+    Append a chunk to a resumable upload
+    
+    The raw request body is the chunk. Upload-Offset must equal the upload's
+    current offset and Upload-Checksum is 'sha256 <base64 digest>' of the
+    chunk. On a 409 the response carries the offset to resume from.
+    """
+    from src.services.resumable_upload import upload_store, UploadError
+    
+    try:
+        offset = request.headers.get('Upload-Offset', type=int)
+        if offset is None:
+            return jsonify({'error': 'Upload-Offset is required'}), 400
+        
+        new_offset = upload_store.write_chunk(
+            upload_id,
+            offset,
+            request.stream,
+            request.content_length,
+            request.headers.get('Upload-Checksum')
         )
+        return jsonify({'upload_id': upload_id, 'offset': new_offset})
         
-        db.session.add(recording)
-        db.session.commit()
+    except UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        print(f"Error writing upload chunk: {str(e)}")
+        return jsonify({'error': 'Failed to write chunk'}), 500
+
+@interview_bp.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Store a fully received upload as a Recording"""
+    from src.services.resumable_upload import upload_store, UploadError
+    
+    try:
+        data = request.get_json(silent=True) or {}
         
-        return jsonify({
-            'success': True,
-            'recording_id': recording.id,
-            'file_size': file_size,
-            'duration': recording.duration,
-            'storage_type': storage_result['storage_type'],
-            'message': 'Recording uploaded successfully'
-        })
+        # Finalizing again returns the original result
+        status = upload_store.status(upload_id)
+        if status['completed']:
+            return jsonify(status['result'])
         
+        session = session_resolver.resolve(status['metadata']['session_id'])
+        if not session:
+            return jsonify({'error': 'Invalid session ID'}), 404
+        
+        # The finished file is moved into place, not copied
+        import uuid
+        upload_dir = os.path.join(os.getcwd(), 'uploads', 'recordings')
+        metadata = upload_store.complete(
+            upload_id,
+            os.path.join(upload_dir, f"{uuid.uuid4()}{status['metadata']['extension']}")
+        )
+        
+        result = store_recording(
+            session,
+            metadata['path'],
+            metadata['size'],
+            metadata['question_id'],
+            metadata['recording_type'],
+            data.get('duration', metadata['duration'])
+        )
+        upload_store.record_result(upload_id, result)
+        return jsonify(result)
+        
+    except UploadError as e:
+        return upload_error_response(e)
     except Exception as e:
         db.session.rollback()
-        print(f"Error uploading recording: {str(e)}")
-        return jsonify({'error': 'Failed to upload recording'}), 500
+        print(f"Error finalizing upload: {str(e)}")
+        return jsonify({'error': 'Failed to finalize upload'}), 500
 
 @interview_bp.route('/session/<session_id>/recordings', methods=['GET'])
 def get_session_recordings(session_id):
     """Get all recordings for a session"""
     try:
         # Verify session exists
-        session = InterviewSession.query.filter_by(session_id=session_id).first()
+        session = session_resolver.resolve(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
         
         # Get recordings
         from src.models.interview import Recording
-        recordings = Recording.query.filter_by(session_id=session.id).order_by(Recording.created_at).all()
+        recordings = Recording.query.filter_by(session_id=session.db_id).order_by(Recording.created_at).all()
+        download_urls = recording_download_urls(recordings)
         
         recording_data = []
         for recording in recordings:
@@ -367,6 +574,8 @@ def get_session_recordings(session_id):
                 'file_size': recording.file_size,
                 'duration': recording.duration,
                 'question_id': recording.question_id,
+                'storage_type': recording.storage_type,
+                'download_url': download_urls.get(recording.id),
                 'created_at': recording.created_at.isoformat()
             })
         
@@ -379,24 +588,79 @@ def get_session_recordings(session_id):
         print(f"Error getting recordings: {str(e)}")
         return jsonify({'error': 'Failed to get recordings'}), 500
 
+def recording_media_type(recording):
+    """(download_name, mimetype) a recording is served with"""
+    mimetype = 'audio/webm' if recording.recording_type == 'audio' else 'video/webm'
+    return f'recording_{recording.id}.webm', mimetype
+
+def recording_download_urls(recordings):
+    """
+    Presigned URLs for the cloud recordings in a listing, signed in one pass
+    
+    Returns:
+        {recording_id: url}
+    """
+    from src.services.cloud_storage import cloud_storage
+    
+    urls = {}
+    for mimetype in ('audio/webm', 'video/webm'):
+        by_key = {
+            recording.file_path: recording for recording in recordings
+            if recording.storage_type == 'cloud' and recording_media_type(recording)[1] == mimetype
+        }
+        if not by_key:
+            continue
+        signed = cloud_storage.get_download_urls(
+            list(by_key),
+            download_name=lambda key: recording_media_type(by_key[key])[0],
+            content_type=mimetype
+        )
+        urls.update({by_key[key].id: url for key, url in signed.items()})
+    return urls
+
+def recording_file_response(recording):
+    """
+    Response serving a recording's media
+    
+    Cloud recordings redirect to a freshly presigned URL, so the media is
+    fetched from storage directly. Local files are sent with byte-range
+    (206) support and an ETag, so players can seek without downloading the
+    whole file and unchanged files are answered with 304.
+    """
+    from flask import send_file, redirect
+    from src.services.cloud_storage import cloud_storage
+    
+    download_name, mimetype = recording_media_type(recording)
+    
+    if recording.storage_type == 'cloud':
+        url = cloud_storage.get_download_url(recording.file_path, download_name=download_name, content_type=mimetype)
+        if not url:
+            return jsonify({'error': 'Cloud storage unavailable'}), 503
+        response = redirect(url, 302)
+        # The target URL expires, so the redirect itself must not be cached
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    
+    if recording.storage_type != 'local' or not os.path.exists(recording.file_path):
+        return jsonify({'error': 'Recording file not found'}), 404
+    
+    return send_file(
+        recording.file_path,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name,
+        conditional=True,
+        etag=True
+    )
+
 @interview_bp.route('/recording/<int:recording_id>/download', methods=['GET'])
 def download_recording(recording_id):
     """Download a recording file"""
     try:
         from src.models.interview import Recording
-        from flask import send_file
-        import os
         
         recording = Recording.query.get_or_404(recording_id)
-        
-        if not os.path.exists(recording.file_path):
-            return jsonify({'error': 'Recording file not found'}), 404
-        
-        return send_file(
-            recording.file_path,
-            as_attachment=True,
-            download_name=f'recording_{recording_id}.webm'
-        )
+        return recording_file_response(recording)
         
     except Exception as e:
         print(f"Error downloading recording: {str(e)}")
@@ -1,29 +1,130 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
 from flask_socketio import emit, join_room, leave_room, disconnect
 from datetime import datetime
 import json
+import logging
+import os
+import threading
+import time
 from src.models.interview import (
-    db, InterviewSession, TranscriptSegment, Recording
+    db, InterviewSession, Recording
 )
+from src.services.session_registry import session_registry, SessionRecord
+from src.services.transcript_buffer import transcript_buffer
+from src.services.task_pool import task_pool, INTERACTIVE_LANE
+from src.services.transcript_sequencer import transcript_sequencer
+from src.services.emit_coalescer import emit_coalescer
+from src.services.session_resolver import session_resolver
+from src.services.admin_feed import publish_session_delta
+from src.services.event_replay import event_replay
+
+logger = logging.getLogger(__name__)
 
 socketio_bp = Blueprint('websocket', __name__)
 
-# Store active sessions
-active_sessions = {}
+# Audio chunk interval suggested to clients for each pool pressure level
+FLOW_CONTROL_BASE_CHUNK_MS = int(os.getenv('FLOW_CONTROL_BASE_CHUNK_MS', '2000'))
+FLOW_CONTROL_MULTIPLIERS = {'ok': 1, 'busy': 2, 'saturated': 4}
+
+def broadcast(event, data, room):
+    """Emit to a room or client; usable from background tasks with only an app context"""
+    current_app.extensions['socketio'].emit(event, data, to=room)
+
+def send_flow_control(session_id, level):
+    """Tell a session's client how often to send audio given server pressure"""
+    broadcast('flow_control', {
+        'session_id': session_id,
+        'level': level,
+        'chunk_ms': FLOW_CONTROL_BASE_CHUNK_MS * FLOW_CONTROL_MULTIPLIERS[level]
+    }, room=session_id)
+
+def merge_audio_tasks(pending_args, new_args):
+    """Fold a newer transcription window into a pending one when both are WAV"""
+    from src.services.audio_windowing import merge_wav_windows
+    
+    session_id, pending_bytes, pending_format, start_time, _, pending_indexes = pending_args
+    _, new_bytes, new_format, _, end_time, new_indexes = new_args
+    if pending_format != 'wav' or new_format != 'wav':
+        return None
+    merged = merge_wav_windows(pending_bytes, new_bytes)
+    if merged is None:
+        return None
+    return (session_id, merged, 'wav', start_time, end_time, pending_indexes + new_indexes)
+
+def absorb_dropped_audio(dropped_args, new_args):
+    """Carry a dropped window's output indexes over so its slot is released, empty"""
+    return new_args[:5] + (dropped_args[5] + new_args[5],)
+
+def submit_transcription(session_id, audio_bytes, audio_format, start_time, end_time):
+    """Queue an audio window for transcription on the session's lane"""
+    # The output index fixes where this window's text lands in the transcript
+    index = transcript_sequencer.reserve(session_id)
+    accepted = task_pool.submit(
+        session_id, process_transcription,
+        session_id, audio_bytes, audio_format, start_time, end_time, (index,),
+        kind='audio', merge=merge_audio_tasks, absorb=absorb_dropped_audio
+    )
+    if not accepted:
+        # Release the index empty so later windows don't wait on it
+        publish_transcripts(session_id, transcript_sequencer.complete(session_id, index))
+    return accepted
+
+def publish_transcripts(session_id, released):
+    """Store and broadcast transcript results released by the sequencer, in order"""
+    for index, item in released:
+        if not item:
+            continue
+        # Queue transcript segment; it is written in the next bulk insert
+        transcript_buffer.add(**item['segment'])
+        # Updates reach clients batched as one 'transcript_updates' event per
+        # window; each is kept for replay as a single 'transcript_update'
+        update = event_replay.record(session_id, 'transcript_update', dict(item['event'], seq=index))
+        emit_coalescer.enqueue(session_id, 'transcript_updates', update)
+    
+    # Results waiting on a window that never finished are released after a timeout
+    if transcript_sequencer.needs_gap_timer(session_id):
+        timer = threading.Timer(
+            transcript_sequencer.gap_timeout,
+            task_pool.submit,
+            args=(session_id, flush_transcript_gap, session_id),
+            kwargs={'kind': 'sequencer'}
+        )
+        timer.daemon = True
+        timer.start()
+
+def flush_transcript_gap(session_id):
+    """Skip a missing transcript window and publish what was held back behind it"""
+    publish_transcripts(session_id, transcript_sequencer.expire(session_id))
 
 def handle_connect():
     """Handle client connection"""
     print(f"Client connected: {request.sid}")
     emit('connected', {'message': 'Connected to interview server'})
 
+def release_session_state(session_id):
+    """Drop per-session state held by this worker for a session that has gone away"""
+    from src.services.audio_windowing import audio_window_manager
+    from src.services.hint_bank import hint_bank
+    from src.services.transcript_context import transcript_context_manager
+    audio_window_manager.discard(session_id)
+    hint_bank.clear_session(session_id)
+    transcript_context_manager.clear_session(session_id)
+
 def handle_disconnect():
     """Handle client disconnection"""
     print(f"Client disconnected: {request.sid}")
-    # Clean up any active sessions for this client
-    for session_id, session_data in list(active_sessions.items()):
-        if session_data.get('client_id') == request.sid:
-            del active_sessions[session_id]
-            break
+    emit_coalescer.forget(request.sid)
+    # Clean up any active session for this client
+    session_id = session_registry.find_by_client(request.sid)
+    if session_id:
+        session_registry.delete(session_id)
+        release_session_state(session_id)
+
+def handle_heartbeat(data):
+    """Keep a session registered while the candidate is connected but quiet"""
+    session_id = data.get('session_id')
+    if session_id and not session_registry.touch(session_id):
+        emit('error', {'message': 'Session not active'})
 
 def handle_join_interview(data):
     """Handle candidate joining an interview session"""
@@ -40,23 +141,36 @@ def handle_join_interview(data):
             emit('error', {'message': 'Invalid session ID'})
             return
         
+        session_resolver.refresh(session)
+        
         # Join the room
         join_room(session_id)
         
         # Store session info
-        active_sessions[session_id] = {
-            'client_id': request.sid,
-            'session_db_id': session.id,
-            'candidate_name': session.candidate_name,
-            'status': session.status,
-            'joined_at': datetime.utcnow()
-        }
+        session_registry.set(session_id, SessionRecord(
+            client_id=request.sid,
+            session_db_id=session.id,
+            candidate_name=session.candidate_name,
+            status=session.status
+        ))
+        
+        # A reconnecting client reports the last event it saw; anything sent
+        # to the room since is replayed after the join is confirmed. Events
+        # emitted while replaying may arrive twice, clients drop repeated ids
+        last_event_id = data.get('last_event_id')
+        missed, complete = ([], True)
+        if last_event_id is not None:
+            missed, complete = event_replay.since(session_id, int(last_event_id))
         
         emit('joined_interview', {
             'session_id': session_id,
             'candidate_name': session.candidate_name,
-            'status': session.status
+            'status': session.status,
+            'last_event_id': event_replay.last_event_id(session_id),
+            'replay': {'events': len(missed), 'complete': complete}
         })
+        for event, event_data in missed:
+            emit(event, event_data)
         
         print(f"Candidate {session.candidate_name} joined session {session_id}")
         
@@ -68,83 +182,180 @@ def handle_leave_interview(data):
     try:
         session_id = data.get('session_id')
         
-        if session_id in active_sessions:
+        if session_id in session_registry:
             leave_room(session_id)
-            del active_sessions[session_id]
+            session_registry.delete(session_id)
+            
+            from src.services.hint_bank import hint_bank
+            from src.services.transcript_context import transcript_context_manager
+            hint_bank.clear_session(session_id)
+            transcript_context_manager.clear_session(session_id)
+            
+            # Transcribe whatever speech was still buffered
+            from src.services.audio_windowing import audio_window_manager
+            for window_bytes, start_time, end_time in audio_window_manager.flush(session_id):
+                submit_transcription(session_id, window_bytes, 'wav', start_time, end_time)
             
         emit('left_interview', {'session_id': session_id})
         
     except Exception as e:
         emit('error', {'message': str(e)})
 
+async def process_transcription(session_id, audio_bytes, audio_format, start_time, end_time, indexes):
+    """Transcribe an audio window and broadcast/save the resulting segment in transcript order"""
+    from src.services.gemini_service import gemini_service
+    
+    item = None
+    try:
+        # Get transcription from Gemini
+        transcription = await gemini_service.transcribe_audio(audio_bytes, audio_format)
+        
+        if transcription and transcription.strip():
+            session = session_resolver.resolve(session_id)
+            if session:
+                item = {
+                    'segment': {
+                        'session_db_id': session.db_id,
+                        'question_id': session.current_question_id,
+                        'text': transcription,
+                        'confidence': 0.95,  # Gemini doesn't provide confidence
+                        'start_time': start_time,
+                        'end_time': end_time
+                    },
+                    'event': {
+                        'session_id': session_id,
+                        'text': transcription,
+                        'confidence': 0.95,
+                        'timestamp': start_time
+                    }
+                }
+        
+    except Exception as e:
+        print(f"Error processing transcription: {str(e)}")
+        broadcast('error', {'message': 'Failed to process transcription'}, room=session_id)
+    
+    # Merged or absorbed windows own several indexes; the text takes the last
+    released = []
+    for index in indexes[:-1]:
+        released += transcript_sequencer.complete(session_id, index)
+    released += transcript_sequencer.complete(session_id, indexes[-1], item)
+    publish_transcripts(session_id, released)
+
 def handle_audio_data(data):
     """Handle real-time audio data for transcription"""
     try:
         session_id = data.get('session_id')
-        audio_data = data.get('audio_data')  # Base64 encoded audio
+        audio_data = data.get('audio_data')  # Binary attachment, or base64 from older clients
+        seq = data.get('seq')  # Per-stream frame sequence number; retries reuse it
+        stream_id = data.get('stream_id', '')
         timestamp = data.get('timestamp', datetime.utcnow().timestamp())
+        duration = float(data.get('duration', 2.0))  # seconds of audio in the chunk
+        audio_format = data.get('format', 'webm')  # webm, or pcm for raw 16-bit mono
+        sample_rate = int(data.get('sample_rate', 16000))
         
         if not session_id or not audio_data:
             emit('error', {'message': 'Session ID and audio data are required'})
             return
         
-        # Verify session is active
-        if session_id not in active_sessions:
+        # Verify session is active; audio also counts as a heartbeat
+        if not session_registry.touch(session_id):
             emit('error', {'message': 'Session not active'})
             return
         
-        # Process audio with Gemini API asynchronously
-        import asyncio
-        from src.services.gemini_service import gemini_service
+        # Retried frames are acknowledged but never transcribed twice
+        if seq is not None and not transcript_sequencer.admit(session_id, stream_id, 'audio', int(seq)):
+            emit('audio_processed', {
+                'session_id': session_id,
+                'seq': seq,
+                'timestamp': timestamp,
+                'status': 'duplicate'
+            })
+            return
         
-        async def process_transcription():
-            try:
-                import base64
-                # Decode audio data
-                audio_bytes = base64.b64decode(audio_data)
-                
-                # Get transcription from Gemini
-                transcription = await gemini_service.transcribe_audio(audio_bytes, 'webm')
-                
-                if transcription and transcription.strip():
-                    # Save transcript segment
-                    session = InterviewSession.query.filter_by(session_id=session_id).first()
-                    if session:
-                        segment = TranscriptSegment(
-                            session_id=session.id,
-                            text=transcription,
-                            confidence=0.95,  # Gemini doesn't provide confidence
-                            start_time=timestamp,
-                            end_time=timestamp + 2.0  # Assume 2-second chunks
-                        )
-                        db.session.add(segment)
-                        db.session.commit()
-                        
-                        # Broadcast transcript to room
-                        emit('transcript_update', {
-                            'session_id': session_id,
-                            'text': transcription,
-                            'confidence': 0.95,
-                            'timestamp': timestamp
-                        }, room=session_id)
-                
-            except Exception as e:
-                print(f"Error processing transcription: {str(e)}")
-                emit('error', {'message': 'Failed to process transcription'})
-        
-        # Run transcription in background
-        asyncio.create_task(process_transcription())
+        # Process audio with Gemini API in the background pool
+        import base64
+        from src.services.audio_windowing import audio_window_manager, PCM_FORMATS
+        
+        # Binary frames are passed on as a view of the received buffer
+        if isinstance(audio_data, (bytes, bytearray, memoryview)):
+            audio_bytes = memoryview(audio_data)
+        else:
+            audio_bytes = base64.b64decode(audio_data)
+        
+        if audio_format in PCM_FORMATS:
+            # Raw PCM is merged into speech windows; silence is never sent
+            windows = audio_window_manager.add_chunk(session_id, audio_bytes, timestamp, sample_rate)
+        else:
+            # Compressed chunks can't be inspected or merged, so send as-is
+            windows = [(audio_bytes, timestamp, timestamp + duration)]
+        
+        # Run transcription in background; under overload stale windows are
+        # merged or dropped by the pool and the chunk is reported as dropped
+        window_format = 'wav' if audio_format in PCM_FORMATS else audio_format
+        accepted = all([
+            submit_transcription(session_id, window_bytes, window_format, start_time, end_time)
+            for window_bytes, start_time, end_time in windows
+        ])
+        
+        if not accepted:
+            status = 'dropped'
+        else:
+            status = 'processing' if windows else 'buffered'
         
         # Acknowledge receipt immediately
         emit('audio_processed', {
             'session_id': session_id,
+            'seq': seq,
             'timestamp': timestamp,
-            'status': 'processing'
+            'status': status,
+            'pressure': task_pool.pressure(session_id)
         })
         
     except Exception as e:
         emit('error', {'message': str(e)})
 
+def handle_recording_chunk(data):
+    """Append a MediaRecorder chunk to the spool for the session's current question"""
+    from src.services.recording_spool import recording_spool, SpoolSealedError
+    
+    try:
+        session_id = data.get('session_id')
+        question_id = data.get('question_id')
+        chunk = data.get('chunk')  # Binary attachment
+        seq = data.get('seq')  # Chunk number within this recorder, from 0
+        
+        if not session_id or chunk is None or seq is None:
+            return {'status': 'error', 'message': 'Session ID, chunk and seq are required'}
+        
+        if not session_resolver.resolve(session_id):
+            return {'status': 'error', 'message': 'Session not found'}
+        session_registry.touch(session_id)
+        
+        appended = recording_spool.append(
+            session_id,
+            question_id,
+            data.get('stream_id', ''),
+            int(seq),
+            chunk,
+            elapsed=data.get('elapsed'),
+            mime_type=data.get('mime_type')
+        )
+        
+        # The return value is the client's acknowledgement
+        return {'status': 'stored' if appended else 'duplicate', 'seq': seq}
+        
+    except SpoolSealedError as e:
+        # Not retried: the question's recording has already been stored
+        return {'status': 'sealed', 'seq': data.get('seq'), 'message': str(e)}
+    except Exception as e:
+        print(f"Error spooling recording chunk: {str(e)}")
+        return {'status': 'error', 'message': 'Failed to store recording chunk'}
+
+def publish_transcript_segment(session_id, item):
+    """Place a client-supplied segment after all transcription queued before it"""
+    index = transcript_sequencer.reserve(session_id)
+    publish_transcripts(session_id, transcript_sequencer.complete(session_id, index, item))
+
 def handle_transcript_segment(data):
     """Handle transcribed text segment"""
     try:
@@ -154,43 +365,230 @@ def handle_transcript_segment(data):
         start_time = data.get('start_time', 0.0)
         end_time = data.get('end_time', 0.0)
         question_id = data.get('question_id')
+        seq = data.get('seq')  # Per-stream segment sequence number; retries reuse it
+        stream_id = data.get('stream_id', '')
         
         if not session_id or not text:
             emit('error', {'message': 'Session ID and text are required'})
             return
         
-        # Get session from database
-        session = InterviewSession.query.filter_by(session_id=session_id).first()
+        # Retried segments are not stored or broadcast again
+        if seq is not None and not transcript_sequencer.admit(session_id, stream_id, 'segment', int(seq)):
+            return
+        
+        session = session_resolver.resolve(session_id)
         if not session:
             emit('error', {'message': 'Session not found'})
             return
         
-        # Save transcript segment
-        segment = TranscriptSegment(
-            session_id=session.id,
+        item = {
+            'segment': {
+                'session_db_id': session.db_id,
+                'question_id': question_id,
+                'text': text,
+                'confidence': confidence,
+                'start_time': start_time,
+                'end_time': end_time
+            },
+            'event': {
+                'session_id': session_id,
+                'text': text,
+                'confidence': confidence,
+                'start_time': start_time,
+                'end_time': end_time,
+                'question_id': question_id
+            }
+        }
+        
+        # Published from the session's lane, in order with transcribed audio
+        if not task_pool.submit(session_id, publish_transcript_segment, session_id, item, kind='segment'):
+            emit('error', {'message': 'Server is busy, please try again shortly'})
+        
+    except Exception as e:
+        db.session.rollback()
+        emit('error', {'message': str(e)})
+
+def send_ai_response(session_db_id, session_id, question_id, request_type, transcript_context, ai_response_data, source='gemini'):
+    """Persist an AI response and send it to the session, falling back to a canned message"""
+    if ai_response_data:
+        # Save AI response to database
+        from src.models.interview import AIResponse
+        ai_response = AIResponse(
+            session_id=session_db_id,
             question_id=question_id,
-            text=text,
-            confidence=confidence,
-            start_time=start_time,
-            end_time=end_time
+            response_type=request_type,
+            response_text=ai_response_data.get('message', ''),
+            context_data={
+                'transcript_length': len(transcript_context),
+                'response_type': request_type,
+                'source': source,
+                'gemini_response': ai_response_data
+            }
         )
-        
-        db.session.add(segment)
+        db.session.add(ai_response)
         db.session.commit()
         
-        # Broadcast transcript to room
-        emit('transcript_update', {
+        # Send AI response to the session
+        broadcast('ai_response', event_replay.record(session_id, 'ai_response', {
             'session_id': session_id,
-            'text': text,
-            'confidence': confidence,
-            'start_time': start_time,
-            'end_time': end_time,
-            'question_id': question_id
-        }, room=session_id)
+            'question_id': question_id,
+            'response': {
+                'type': ai_response_data.get('type', request_type),
+                'message': ai_response_data.get('message', ''),
+                'source': source,
+                'timestamp': ai_response.created_at.isoformat()
+            }
+        }), room=session_id)
+    else:
+        # Fallback response if Gemini fails
+        fallback_responses = {
+            'hint': "Try breaking down the problem into smaller components and think about the key factors involved.",
+            'clarification': "Consider what assumptions you're making and whether they're reasonable for this type of problem.",
+            'encouragement': "You're on the right track! Keep thinking through it step by step."
+        }
+        
+        fallback_message = fallback_responses.get(request_type, fallback_responses['hint'])
+        
+        broadcast('ai_response', event_replay.record(session_id, 'ai_response', {
+            'session_id': session_id,
+            'question_id': question_id,
+            'response': {
+                'type': request_type,
+                'message': fallback_message,
+                'source': 'fallback',
+                'timestamp': datetime.utcnow().isoformat()
+            }
+        }), room=session_id)
+
+async def process_ai_response(client_id, session_id, question_id, transcript_context, request_type, stream, requested_at):
+    """
+    Generate an AI response for a request and send it to the session
+    
+    requested_at is the time.monotonic() at which the request was queued;
+    the hint latency SLO counts from then
+    """
+    import asyncio
+    from src.services.gemini_service import gemini_service
+    from src.services.hint_bank import hint_bank
+    from src.services.transcript_context import transcript_context_manager
+    from src.services.speculation import speculation_cache
+    from src.models.interview import Question
+    
+    try:
+        # Reload in this task's database session
+        session = InterviewSession.query.filter_by(session_id=session_id).first()
+        question = Question.query.filter_by(id=question_id).first()
+        if not session or not question:
+            broadcast('error', {'message': 'Question not found'}, room=client_id)
+            return
+        
+        # Get AI prompt from session's question set
+        ai_prompt = None
+        if session.question_set and hasattr(session.question_set, 'ai_prompt'):
+            ai_prompt = session.question_set.ai_prompt.prompt_text if session.question_set.ai_prompt else None
+        
+        # Prompt context comes from stored segments, bounded by a token
+        # budget; the client's transcript is only used when none exist
+        context = await transcript_context_manager.get_context(
+            session_id, session.id, question_id, question.text
+        )
+        if not context:
+            context = transcript_context_manager.clip(transcript_context)
+        
+        # Opening hints and follow-ups may already have been precomputed
+        if request_type in ('hint', 'follow_up'):
+            speculative = speculation_cache.take(session_id, question.id, request_type, context)
+            if speculative:
+                send_ai_response(
+                    session.id, session_id, question_id, request_type,
+                    transcript_context, speculative, source='speculative'
+                )
+                return
+        
+        # Set once the candidate has seen output for this request
+        answered = asyncio.Event()
+        state = {'late': False}
+        
+        async def generate():
+            if not stream:
+                if request_type == 'follow_up':
+                    follow_up = await gemini_service.generate_follow_up_question(question.text, context)
+                    result = {'type': 'follow_up', 'message': follow_up} if follow_up else None
+                else:
+                    result = await gemini_service.generate_ai_response(
+                        question.text, context, request_type, ai_prompt
+                    )
+                answered.set()
+                return result
+            
+            # Forward chunks as they arrive until a curated hint has been served
+            chunks = []
+            async for delta in gemini_service.stream_ai_response(
+                question.text, context, request_type, ai_prompt
+            ):
+                if not state['late']:
+                    broadcast('ai_response_delta', {
+                        'session_id': session_id,
+                        'question_id': question_id,
+                        'type': request_type,
+                        'index': len(chunks),
+                        'delta': delta
+                    }, room=session_id)
+                    answered.set()
+                chunks.append(delta)
+            
+            answered.set()
+            message = ''.join(chunks).strip()
+            return {'type': request_type, 'message': message} if message else None
+        
+        generation = asyncio.ensure_future(generate())
+        
+        # Hints are bounded by the latency SLO: if Gemini hasn't produced
+        # anything in time, serve the next curated hint for the question
+        if request_type == 'hint':
+            remaining = hint_bank.slo_seconds - (time.monotonic() - requested_at)
+            try:
+                await asyncio.wait_for(asyncio.shield(answered.wait()), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                curated = hint_bank.next_hint(session_id, question)
+                if curated:
+                    state['late'] = True
+                    send_ai_response(
+                        session.id, session_id, question_id, request_type,
+                        transcript_context, {'type': request_type, 'message': curated},
+                        source='curated'
+                    )
+        
+        ai_response_data = await generation
+        
+        if state['late']:
+            # The candidate already has a curated hint; the Gemini answer
+            # is still cached, and optionally delivered as a follow-up
+            if ai_response_data and hint_bank.late_policy == 'follow_up':
+                send_ai_response(
+                    session.id, session_id, question_id, request_type, transcript_context,
+                    dict(ai_response_data, type='follow_up'), source='gemini_late'
+                )
+            return
+        
+        if not ai_response_data and request_type == 'hint':
+            curated = hint_bank.next_hint(session_id, question)
+            if curated:
+                send_ai_response(
+                    session.id, session_id, question_id, request_type,
+                    transcript_context, {'type': request_type, 'message': curated},
+                    source='curated'
+                )
+                return
+        
+        send_ai_response(
+            session.id, session_id, question_id, request_type,
+            transcript_context, ai_response_data
+        )
         
     except Exception as e:
-        db.session.rollback()
-        emit('error', {'message': str(e)})
+        print(f"Error processing AI response: {str(e)}")
+        broadcast('error', {'message': 'Failed to generate AI response'}, room=client_id)
 
 def handle_ai_response_request(data):
     """Handle request for AI response/hint"""
@@ -198,100 +596,36 @@ def handle_ai_response_request(data):
         session_id = data.get('session_id')
         question_id = data.get('question_id')
         transcript_context = data.get('transcript_context', '')
-        request_type = data.get('type', 'hint')  # hint, clarification, encouragement
+        request_type = data.get('type', 'hint')  # hint, clarification, encouragement, follow_up
+        stream = bool(data.get('stream', False))  # Emit ai_response_delta chunks before the final response
         
         if not session_id or not question_id:
             emit('error', {'message': 'Session ID and question ID are required'})
             return
         
         # Verify session
-        session = InterviewSession.query.filter_by(session_id=session_id).first()
-        if not session:
+        if not session_resolver.resolve(session_id):
             emit('error', {'message': 'Session not found'})
             return
-        
-        # Process AI response with Gemini API asynchronously
-        import asyncio
-        from src.services.gemini_service import gemini_service
-        from src.models.interview import Question
-        
-        async def process_ai_response():
-            try:
-                # Get question text
-                question = Question.query.filter_by(id=question_id).first()
-                if not question:
-                    emit('error', {'message': 'Question not found'})
-                    return
-                
-                # Get AI prompt from session's question set
-                ai_prompt = None
-                if session.question_set and hasattr(session.question_set, 'ai_prompt'):
-                    ai_prompt = session.question_set.ai_prompt.prompt_text if session.question_set.ai_prompt else None
-                
-                # Generate AI response
-                ai_response_data = await gemini_service.generate_ai_response(
-                    question.text, transcript_context, request_type, ai_prompt
-                )
-                
-                if ai_response_data:
-                    # Save AI response to database
-                    from src.models.interview import AIResponse
-                    ai_response = AIResponse(
-                        session_id=session.id,
-                        question_id=question_id,
-                        response_type=request_type,
-                        response_text=ai_response_data.get('message', ''),
-                        context_data={
-                            'transcript_length': len(transcript_context),
-                            'response_type': request_type,
-                            'gemini_response': ai_response_data
-                        }
-                    )
-                    db.session.add(ai_response)
-                    db.session.commit()
-                    
-                    # Send AI response to the session
-                    emit('ai_response', {
-                        'session_id': session_id,
-                        'question_id': question_id,
-                        'response': {
-                            'type': ai_response_data.get('type', request_type),
-                            'message': ai_response_data.get('message', ''),
-                            'timestamp': ai_response.created_at.isoformat()
-                        }
-                    }, room=session_id)
-                else:
-                    # Fallback response if Gemini fails
-                    fallback_responses = {
-                        'hint': "Try breaking down the problem into smaller components and think about the key factors involved.",
-                        'clarification': "Consider what assumptions you're making and whether they're reasonable for this type of problem.",
-                        'encouragement': "You're on the right track! Keep thinking through it step by step."
-                    }
-                    
-                    fallback_message = fallback_responses.get(request_type, fallback_responses['hint'])
-                    
-                    emit('ai_response', {
-                        'session_id': session_id,
-                        'question_id': question_id,
-                        'response': {
-                            'type': request_type,
-                            'message': fallback_message,
-                            'timestamp': datetime.utcnow().isoformat()
-                        }
-                    }, room=session_id)
-                
-            except Exception as e:
-                print(f"Error processing AI response: {str(e)}")
-                emit('error', {'message': 'Failed to generate AI response'})
-        
-        # Run AI response generation in background
-        asyncio.create_task(process_ai_response())
+        session_registry.touch(session_id)
+        
+        # Run AI response generation in background on the session's
+        # interactive lane, ahead of any queued transcription
+        accepted = task_pool.submit(
+            INTERACTIVE_LANE + session_id, process_ai_response,
+            request.sid, session_id, question_id, transcript_context, request_type, stream, time.monotonic(),
+            kind='ai_response'
+        )
+        if not accepted:
+            emit('error', {'message': 'Server is busy, please try again shortly'})
+            return
         
         # Acknowledge request immediately
         emit('ai_request_received', {
             'session_id': session_id,
             'question_id': question_id,
-            'type': request_type
+            'type': request_type,
+            'stream': stream
         })
         
     except Exception as e:
@@ -307,17 +641,15 @@ def handle_video_stream_start(data):
             emit('error', {'message': 'Session ID is required'})
             return
         
-        # Verify session
-        if session_id not in active_sessions:
-            emit('error', {'message': 'Session not active'})
-            return
-        
         # Update session with video stream info
-        active_sessions[session_id]['video_stream'] = {
+        updated = session_registry.update(session_id, video_stream={
             'active': True,
             'config': stream_config,
-            'started_at': datetime.utcnow()
-        }
+            'started_at': datetime.utcnow().isoformat()
+        })
+        if updated is None:
+            emit('error', {'message': 'Session not active'})
+            return
         
         emit('video_stream_started', {
             'session_id': session_id,
@@ -332,10 +664,13 @@ def handle_video_stream_stop(data):
     try:
         session_id = data.get('session_id')
         
-        if session_id in active_sessions:
-            if 'video_stream' in active_sessions[session_id]:
-                active_sessions[session_id]['video_stream']['active'] = False
-                active_sessions[session_id]['video_stream']['stopped_at'] = datetime.utcnow()
+        record = session_registry.get(session_id) if session_id else None
+        if record and record.video_stream:
+            session_registry.update(session_id, video_stream=dict(
+                record.video_stream,
+                active=False,
+                stopped_at=datetime.utcnow().isoformat()
+            ))
         
         emit('video_stream_stopped', {
             'session_id': session_id
@@ -356,20 +691,21 @@ def handle_recording_metadata(data):
             emit('error', {'message': 'Session ID is required'})
             return
         
-        # Get session from database
-        session = InterviewSession.query.filter_by(session_id=session_id).first()
+        session = session_resolver.resolve(session_id)
         if not session:
             emit('error', {'message': 'Session not found'})
             return
         
-        # Save recording metadata
+        # Save recording metadata; the path is the client's own, never a
+        # file on this server
         recording = Recording(
-            session_id=session.id,
+            session_id=session.db_id,
             question_id=question_id,
             recording_type=recording_type,
             file_path=file_info.get('path', ''),
             file_size=file_info.get('size'),
-            duration=file_info.get('duration')
+            duration=file_info.get('duration'),
+            storage_type='client'
         )
         
         db.session.add(recording)
@@ -402,10 +738,20 @@ def handle_session_status_update(data):
             if status == 'completed':
                 session.completed_at = datetime.utcnow()
             db.session.commit()
+            resolved = session_resolver.refresh(session)
+            if status == 'completed':
+                from src.routes.interview import seal_recordings
+                from src.services.speculation import speculation_cache
+                seal_recordings(resolved, all_questions=True)
+                speculation_cache.clear_session(session_id)
+            publish_session_delta(
+                'status_changed', session_id,
+                status=session.status,
+                completed_at=session.completed_at.isoformat() if session.completed_at else None
+            )
         
         # Update active session
-        if session_id in active_sessions:
-            active_sessions[session_id]['status'] = status
+        session_registry.update(session_id, status=status)
         
         emit('session_status_updated', {
             'session_id': session_id,
@@ -416,18 +762,41 @@ def handle_session_status_update(data):
         db.session.rollback()
         emit('error', {'message': str(e)})
 
+def sweep_idle_sessions(socketio):
+    """Periodically evict sessions whose client stopped sending heartbeats"""
+    from src.services.speculation import speculation_cache
+    idle_timeout = float(os.getenv('SESSION_IDLE_TIMEOUT', '300'))
+    interval = float(os.getenv('SESSION_SWEEP_INTERVAL', '60'))
+    
+    while True:
+        socketio.sleep(interval)
+        try:
+            for session_id in session_registry.evict_idle(idle_timeout):
+                release_session_state(session_id)
+                # An abandoned session never reaches its next question
+                speculation_cache.clear_session(session_id)
+                logger.info(f"Evicted idle session {session_id}")
+        except Exception as e:
+            logger.error(f"Error sweeping idle sessions: {str(e)}")
+
 # Register socket event handlers
 def register_socket_handlers(socketio):
     """Register all socket event handlers"""
     socketio.on_event('connect', handle_connect)
     socketio.on_event('disconnect', handle_disconnect)
+    socketio.on_event('heartbeat', handle_heartbeat)
     socketio.on_event('join_interview', handle_join_interview)
     socketio.on_event('leave_interview', handle_leave_interview)
     socketio.on_event('audio_data', handle_audio_data)
     socketio.on_event('transcript_segment', handle_transcript_segment)
+    socketio.on_event('recording_chunk', handle_recording_chunk)
     socketio.on_event('ai_response_request', handle_ai_response_request)
     socketio.on_event('video_stream_start', handle_video_stream_start)
     socketio.on_event('video_stream_stop', handle_video_stream_stop)
     socketio.on_event('recording_metadata', handle_recording_metadata)
     socketio.on_event('session_status_update', handle_session_status_update)
-
+    
+    socketio.start_background_task(sweep_idle_sessions, socketio)
+    
+    # Clients are told to send audio less often while the task pool is loaded
+    task_pool.on_pressure_change = send_flow_control
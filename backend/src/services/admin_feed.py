@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Admin dashboards connect to this namespace and join this room
+ADMIN_NAMESPACE = '/admin'
+ADMIN_ROOM = 'admins'
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def load_session_summaries(session_db_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Dashboard rows for interview sessions, newest first
+
+    Question set names and response counts are loaded in the same query
+    rather than lazily per session.
+
+    Args:
+        session_db_ids: Restrict to these database ids; all sessions if None
+    """
+    from src.models.interview import db, InterviewSession, QuestionSet, QuestionResponse
+
+    response_counts = db.session.query(
+        QuestionResponse.session_id,
+        db.func.count(QuestionResponse.id).label('response_count')
+    ).group_by(QuestionResponse.session_id).subquery()
+
+    query = db.session.query(
+        InterviewSession,
+        QuestionSet.name,
+        db.func.coalesce(response_counts.c.response_count, 0)
+    ).outerjoin(
+        QuestionSet, QuestionSet.id == InterviewSession.question_set_id
+    ).outerjoin(
+        response_counts, response_counts.c.session_id == InterviewSession.id
+    )
+    if session_db_ids is not None:
+        query = query.filter(InterviewSession.id.in_(list(session_db_ids)))
+
+    return [{
+        'id': session.session_id,
+        'candidate_name': session.candidate_name,
+        'status': session.status,
+        'question_set_name': question_set_name,
+        'current_question_id': session.current_question_id,
+        'started_at': _isoformat(session.started_at),
+        'completed_at': _isoformat(session.completed_at),
+        'created_at': _isoformat(session.created_at),
+        'response_count': response_count
+    } for session, question_set_name, response_count in query.order_by(InterviewSession.created_at.desc())]
+
+def publish_session_delta(delta_type: str, session_id: str, **fields):
+    """
+    Push a change to connected admin dashboards
+
+    Deltas carry the new absolute values of the changed fields, so applying
+    one twice, or after a snapshot that already includes it, is harmless.
+
+    Args:
+        delta_type: 'session_created', 'status_changed', 'question_advanced'
+            or 'score_written'
+        session_id: Public session id
+    """
+    from flask import current_app
+
+    try:
+        current_app.extensions['socketio'].emit('session_delta', {
+            'type': delta_type,
+            'session': dict(fields, id=session_id),
+            'timestamp': datetime.utcnow().isoformat()
+        }, to=ADMIN_ROOM, namespace=ADMIN_NAMESPACE)
+    except Exception as e:
+        # Monitoring must never fail the change being reported
+        logger.error(f"Error publishing admin {delta_type} delta: {str(e)}")
+
+def publish_session_created(session_db_id: int):
+    """Push the full dashboard row for a new session"""
+    try:
+        summaries = load_session_summaries([session_db_id])
+    except Exception as e:
+        logger.error(f"Error loading new session for admin feed: {str(e)}")
+        return
+    if summaries:
+        summary = summaries[0]
+        publish_session_delta('session_created', summary.pop('id'), **summary)
@@ -0,0 +1,204 @@
+import io
+import os
+import threading
+import wave
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Formats the accumulator can run voice activity detection on
+PCM_FORMATS = ('pcm', 'pcm_s16le')
+
+def merge_wav_windows(first: bytes, second: bytes, max_seconds: float = 30.0) -> Optional[bytes]:
+    """
+    Concatenate two WAV windows with the same format
+
+    Returns None if the formats differ or the result would be longer than
+    max_seconds.
+    """
+    with wave.open(io.BytesIO(first), 'rb') as a, wave.open(io.BytesIO(second), 'rb') as b:
+        if a.getparams()[:3] != b.getparams()[:3]:
+            return None
+        if (a.getnframes() + b.getnframes()) / a.getframerate() > max_seconds:
+            return None
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as merged:
+            merged.setparams(a.getparams())
+            merged.writeframes(a.readframes(a.getnframes()))
+            merged.writeframes(b.readframes(b.getnframes()))
+    return buffer.getvalue()
+
+class SpeechWindowAccumulator:
+    """
+    Merges raw 16-bit mono PCM chunks for one session into speech windows
+
+    Each chunk is split into fixed-size frames and classified as speech or
+    silence by frame energy. Silence is dropped, and buffered speech is
+    released as a WAV window once it reaches the configured length or the
+    speaker pauses.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_seconds: float = 6.0,
+        frame_ms: int = 30,
+        threshold_db: float = -45.0,
+        pause_seconds: float = 0.8,
+        pre_roll_seconds: float = 0.3
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.window_frames = max(1, int(window_seconds * 1000 / frame_ms))
+        self.pause_frames = max(1, int(pause_seconds * 1000 / frame_ms))
+        self.pre_roll_frames = int(pre_roll_seconds * 1000 / frame_ms)
+        self.threshold_db = threshold_db
+        self.lock = threading.Lock()
+
+        self._remainder = np.empty(0, dtype=np.int16)
+        self._frames: List[np.ndarray] = []
+        self._has_speech = False
+        self._trailing_silence = 0
+        self._window_start: Optional[float] = None
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        """Return a boolean speech mask for a (n_frames, frame_size) int16 array"""
+        samples = frames.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        energy_db = 20.0 * np.log10(rms + 1e-10)
+        return energy_db > self.threshold_db
+
+    def _emit(self) -> Tuple[bytes, float, float]:
+        """Encode buffered frames as WAV and reset the window"""
+        pcm = np.concatenate(self._frames)
+        start_time = self._window_start
+        end_time = start_time + len(pcm) / self.sample_rate
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm.tobytes())
+
+        self._frames = []
+        self._has_speech = False
+        self._trailing_silence = 0
+        self._window_start = None
+        return buffer.getvalue(), start_time, end_time
+
+    def add_chunk(self, pcm_bytes: bytes, timestamp: float) -> List[Tuple[bytes, float, float]]:
+        """
+        Add a PCM chunk and return any speech windows ready for transcription
+
+        Args:
+            pcm_bytes: Little-endian 16-bit mono PCM
+            timestamp: Client timestamp of the start of the chunk
+
+        Returns:
+            List of (wav_bytes, start_time, end_time) tuples
+        """
+        usable = len(pcm_bytes) - len(pcm_bytes) % 2
+        samples = np.frombuffer(pcm_bytes[:usable], dtype='<i2')
+        if self._remainder.size:
+            chunk_start = timestamp - self._remainder.size / self.sample_rate
+            samples = np.concatenate([self._remainder, samples])
+        else:
+            chunk_start = timestamp
+
+        n_frames = samples.size // self.frame_size
+        self._remainder = samples[n_frames * self.frame_size:].copy()
+        if n_frames == 0:
+            return []
+
+        frames = samples[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        speech_mask = self._classify(frames)
+
+        windows = []
+        for index in range(n_frames):
+            if not self._frames:
+                self._window_start = chunk_start + index * self.frame_size / self.sample_rate
+            self._frames.append(frames[index])
+
+            if speech_mask[index]:
+                self._has_speech = True
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += 1
+
+            if not self._has_speech:
+                # Keep only a short pre-roll of silence so word onsets survive
+                if len(self._frames) > self.pre_roll_frames:
+                    self._frames.pop(0)
+                    self._window_start += self.frame_size / self.sample_rate
+                continue
+
+            if len(self._frames) >= self.window_frames or self._trailing_silence >= self.pause_frames:
+                windows.append(self._emit())
+
+        return windows
+
+    def flush(self) -> List[Tuple[bytes, float, float]]:
+        """Return the buffered window if it contains speech, then reset"""
+        windows = [self._emit()] if self._has_speech and self._frames else []
+        self._frames = []
+        self._has_speech = False
+        self._trailing_silence = 0
+        self._window_start = None
+        self._remainder = np.empty(0, dtype=np.int16)
+        return windows
+
+class AudioWindowManager:
+    """Keeps one speech window accumulator per interview session"""
+
+    def __init__(self):
+        self.window_seconds = float(os.getenv('AUDIO_WINDOW_SECONDS', '6'))
+        self.threshold_db = float(os.getenv('AUDIO_VAD_THRESHOLD_DB', '-45'))
+        self.pause_seconds = float(os.getenv('AUDIO_VAD_PAUSE_SECONDS', '0.8'))
+
+        self._accumulators: Dict[str, SpeechWindowAccumulator] = {}
+        self._lock = threading.Lock()
+
+    def add_chunk(
+        self,
+        session_id: str,
+        pcm_bytes: bytes,
+        timestamp: float,
+        sample_rate: int = 16000
+    ) -> List[Tuple[bytes, float, float]]:
+        """Feed a session's PCM chunk and return speech windows ready to transcribe"""
+        with self._lock:
+            accumulator = self._accumulators.get(session_id)
+            if accumulator is None or accumulator.sample_rate != sample_rate:
+                accumulator = SpeechWindowAccumulator(
+                    sample_rate=sample_rate,
+                    window_seconds=self.window_seconds,
+                    threshold_db=self.threshold_db,
+                    pause_seconds=self.pause_seconds
+                )
+                self._accumulators[session_id] = accumulator
+
+        with accumulator.lock:
+            return accumulator.add_chunk(pcm_bytes, timestamp)
+
+    def flush(self, session_id: str) -> List[Tuple[bytes, float, float]]:
+        """Release any buffered speech for a session and forget it"""
+        with self._lock:
+            accumulator = self._accumulators.pop(session_id, None)
+        if accumulator is None:
+            return []
+
+        with accumulator.lock:
+            return accumulator.flush()
+
+    def discard(self, session_id: str):
+        """Drop a session's buffered audio"""
+        with self._lock:
+            self._accumulators.pop(session_id, None)
+
+# Global instance
+audio_window_manager = AudioWindowManager()
@@ -1,11 +1,39 @@
+import fcntl
 import os
+import queue
+import threading
+import time
 import boto3
-from botocore.exceptions import ClientError
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 
+MB = 1024 * 1024
+
 class CloudStorageService:
-    """Service for handling cloud storage operations"""
+    """
+    Service for handling cloud storage operations
+    
+    One S3 client is shared by all requests and upload workers; its
+    connection pool is sized for upload_workers × upload_concurrency part
+    uploads. Files are sent as multipart uploads of part_size parts, and
+    botocore retries each failed part request. enqueue_upload() hands a
+    saved Recording to a bounded pool of background workers, which move it
+    from local to cloud storage once the transfer completes. A worker holds
+    an exclusive lock on the local file while uploading it, so each
+    recording is uploaded by one process even when several server processes
+    requeue the same leftovers at startup. Only files inside recordings_dir,
+    where the server writes recordings itself, are ever uploaded or removed.
+    
+    Only the object key is stored. Presigned download URLs are signed on
+    demand and cached per key until less than url_margin of their validity
+    is left, so repeated listings reuse them and never hand out a link about
+    to expire.
+    """
     
     def __init__(self):
         self.s3_client = None
@@ -13,6 +41,35 @@ class CloudStorageService:
         self.aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
         self.aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
         self.aws_region = os.getenv('AWS_REGION', 'us-east-1')
+        self.endpoint_url = os.getenv('AWS_S3_ENDPOINT_URL') or None  # MinIO or another S3 stand-in
+        
+        self.upload_workers = int(os.getenv('S3_UPLOAD_WORKERS', '2'))
+        self.upload_concurrency = int(os.getenv('S3_UPLOAD_CONCURRENCY', '4'))
+        self.upload_attempts = max(1, int(os.getenv('S3_UPLOAD_ATTEMPTS', '3')))
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(float(os.getenv('S3_MULTIPART_THRESHOLD_MB', '16')) * MB),
+            multipart_chunksize=int(float(os.getenv('S3_PART_SIZE_MB', '16')) * MB),
+            max_concurrency=self.upload_concurrency,
+            use_threads=True
+        )
+        
+        self.url_expires = int(os.getenv('S3_PRESIGNED_URL_EXPIRES', '3600'))
+        self.url_margin = int(os.getenv('S3_PRESIGNED_URL_MARGIN', '300'))
+        self.url_cache_size = int(os.getenv('S3_PRESIGNED_URL_CACHE_SIZE', '5000'))
+        self._url_cache = OrderedDict()  # (cloud_key, download_name, content_type) -> (url, expires_at)
+        self._url_lock = threading.Lock()
+        self.url_hits = 0
+        self.url_misses = 0
+        
+        self.recordings_dir = os.path.realpath(os.path.join(os.getcwd(), 'uploads', 'recordings'))
+        
+        self.app = None
+        self._queue = queue.Queue(maxsize=int(os.getenv('S3_UPLOAD_QUEUE_SIZE', '100')))
+        self._workers_started = False
+        self.uploads_completed = 0
+        self.uploads_failed = 0
+        self.uploads_rejected = 0
+        self.uploads_skipped = 0
         
         # Initialize S3 client if credentials are available
         if self.aws_access_key and self.aws_secret_key and self.bucket_name:
@@ -21,7 +78,12 @@ class CloudStorageService:
                     's3',
                     aws_access_key_id=self.aws_access_key,
                     aws_secret_access_key=self.aws_secret_key,
-                    region_name=self.aws_region
+                    region_name=self.aws_region,
+                    endpoint_url=self.endpoint_url,
+                    config=Config(
+                        max_pool_connections=max(10, self.upload_workers * self.upload_concurrency + 4),
+                        retries={'max_attempts': int(os.getenv('S3_MAX_RETRIES', '5')), 'mode': 'standard'}
+                    )
                 )
                 print("Cloud storage initialized successfully")
             except Exception as e:
@@ -30,7 +92,132 @@ class CloudStorageService:
         else:
             print("Cloud storage not configured - using local storage")
     
-    def upload_file(self, file_path, session_id, recording_type='video'):
+    def init_app(self, app):
+        """Start the background upload workers and requeue recordings left local by a restart"""
+        self.app = app
+        if not self.s3_client or self._workers_started:
+            return
+        self._workers_started = True
+        for _ in range(self.upload_workers):
+            threading.Thread(target=self._upload_worker, daemon=True).start()
+        
+        from src.models.interview import Recording
+        with app.app_context():
+            try:
+                pending = Recording.query.filter_by(storage_type='local').order_by(Recording.id).limit(self._queue.maxsize).all()
+                for recording in pending:
+                    if self._managed_path(recording.file_path):
+                        self.enqueue_upload(recording.id)
+            except Exception as e:
+                print(f"Error requeueing local recordings: {e}")
+    
+    def enqueue_upload(self, recording_id):
+        """
+        Upload a locally stored Recording in the background
+        
+        Returns:
+            False if cloud storage is not configured or the queue is full;
+            the recording then stays local
+        """
+        if not self.s3_client or not self._workers_started:
+            return False
+        try:
+            self._queue.put_nowait(recording_id)
+            return True
+        except queue.Full:
+            self.uploads_rejected += 1
+            print(f"Upload queue full; recording {recording_id} stays local")
+            return False
+    
+    def _managed_path(self, file_path):
+        """
+        Resolved path of a file the server wrote to recordings_dir, or None
+        
+        Recording paths can come from clients, so anything resolving outside
+        the directory is never read, uploaded or deleted.
+        """
+        if not file_path:
+            return None
+        real_path = os.path.realpath(file_path)
+        if not real_path.startswith(self.recordings_dir + os.sep) or not os.path.isfile(real_path):
+            return None
+        return real_path
+    
+    def _upload_worker(self):
+        while True:
+            recording_id = self._queue.get()
+            try:
+                with self.app.app_context():
+                    self._upload_recording(recording_id)
+            except Exception as e:
+                self.uploads_failed += 1
+                print(f"Error uploading recording {recording_id}: {e}")
+            finally:
+                self._queue.task_done()
+    
+    def _upload_recording(self, recording_id):
+        from src.models.interview import db, Recording, InterviewSession
+        
+        recording = Recording.query.get(recording_id)
+        if not recording or recording.storage_type != 'local':
+            return
+        local_path = self._managed_path(recording.file_path)
+        if local_path is None:
+            self.uploads_skipped += 1
+            return
+        try:
+            local_file = open(local_path, 'rb')
+        except FileNotFoundError:
+            return
+        
+        with local_file:
+            # The lock is the claim; it is released on close, or if the process dies
+            try:
+                fcntl.flock(local_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.uploads_skipped += 1
+                return
+            
+            # Another process may have finished the upload before the lock was free
+            db.session.refresh(recording)
+            if recording.storage_type != 'local' or not os.path.exists(local_path):
+                self.uploads_skipped += 1
+                return
+            session = InterviewSession.query.get(recording.session_id)
+            
+            result = None
+            for attempt in range(self.upload_attempts):
+                result = self.upload_file(local_path, session.session_id, recording.recording_type, remove_local=False)
+                if result['storage_type'] == 'cloud':
+                    break
+                if attempt < self.upload_attempts - 1:
+                    time.sleep(2 ** attempt)
+            
+            if result['storage_type'] != 'cloud':
+                self.uploads_failed += 1
+                return
+            
+            recording.file_path = result['cloud_key']
+            recording.cloud_url = None
+            recording.storage_type = 'cloud'
+            db.session.commit()
+            self.uploads_completed += 1
+            
+            # The local copy goes only once the row points at the cloud object
+            os.remove(local_path)
+    
+    def get_upload_stats(self):
+        """Return background upload counters"""
+        return {
+            'configured': self.s3_client is not None,
+            'queued': self._queue.qsize(),
+            'completed': self.uploads_completed,
+            'failed': self.uploads_failed,
+            'rejected': self.uploads_rejected,
+            'skipped': self.uploads_skipped
+        }
+    
+    def upload_file(self, file_path, session_id, recording_type='video', remove_local=True):
         """Upload file to cloud storage or keep local"""
         try:
             if self.s3_client and self.bucket_name:
@@ -39,7 +226,7 @@ class CloudStorageService:
                 file_extension = os.path.splitext(file_path)[1]
                 cloud_key = f"recordings/{session_id}/{timestamp}_{uuid.uuid4()}{file_extension}"
                 
-                # Upload to S3
+                # Upload to S3 (multipart above the threshold)
                 self.s3_client.upload_file(
                     file_path, 
                     self.bucket_name, 
@@ -47,22 +234,17 @@ class CloudStorageService:
                     ExtraArgs={
                         'ContentType': 'video/webm' if recording_type == 'video' else 'audio/webm',
                         'ServerSideEncryption': 'AES256'
-                    }
-                )
-                
-                # Generate presigned URL for access
-                cloud_url = self.s3_client.generate_presigned_url(
-                    'get_object',
-                    Params={'Bucket': self.bucket_name, 'Key': cloud_key},
-                    ExpiresIn=3600 * 24 * 7  # 7 days
+                    },
+                    Config=self.transfer_config
                 )
                 
                 # Remove local file after successful upload
-                if os.path.exists(file_path):
+                if remove_local and os.path.exists(file_path):
                     os.remove(file_path)
                 
+                # Download URLs are presigned on demand; see get_download_url
                 return {
-                    'cloud_url': cloud_url,
+                    'cloud_url': None,
                     'cloud_key': cloud_key,
                     'storage_type': 'cloud'
                 }
@@ -74,7 +256,7 @@ class CloudStorageService:
                     'storage_type': 'local'
                 }
                 
-        except ClientError as e:
+        except (ClientError, BotoCoreError, S3UploadFailedError) as e:
             print(f"Error uploading to cloud storage: {e}")
             return {
                 'cloud_url': None,
@@ -90,23 +272,92 @@ class CloudStorageService:
                     Bucket=self.bucket_name,
                     Key=cloud_key
                 )
+                with self._url_lock:
+                    for cache_key in [k for k in self._url_cache if k[0] == cloud_key]:
+                        del self._url_cache[cache_key]
                 return True
         except ClientError as e:
             print(f"Error deleting from cloud storage: {e}")
         return False
     
-    def get_download_url(self, cloud_key, expires_in=3600):
-        """Generate presigned download URL"""
-        try:
-            if self.s3_client and self.bucket_name and cloud_key:
-                return self.s3_client.generate_presigned_url(
+    def get_download_url(self, cloud_key, download_name=None, content_type=None):
+        """
+        Presigned download URL, reused while it has more than url_margin left
+        
+        download_name and content_type override the headers S3 answers with,
+        so the browser saves or plays the object like a local download
+        """
+        return self.get_download_urls([cloud_key], download_name, content_type).get(cloud_key)
+    
+    def get_download_urls(self, cloud_keys, download_name=None, content_type=None):
+        """
+        Presigned download URLs for many keys at once
+        
+        download_name may be a callable taking the key, for listings where
+        each object is saved under its own name.
+        
+        Returns:
+            {cloud_key: url}; keys that could not be signed are left out
+        """
+        if not self.s3_client or not self.bucket_name:
+            return {}
+        
+        def cache_key(key):
+            name = download_name(key) if callable(download_name) else download_name
+            return key, name, content_type
+        
+        urls = {}
+        missing = []
+        now = time.time()
+        with self._url_lock:
+            for key in cloud_keys:
+                if not key:
+                    continue
+                cached = self._url_cache.get(cache_key(key))
+                if cached and cached[1] - now > self.url_margin:
+                    self._url_cache.move_to_end(cache_key(key))
+                    urls[key] = cached[0]
+                    self.url_hits += 1
+                else:
+                    missing.append(key)
+        
+        # Signing is local computation; no request is made to S3
+        signed = {}
+        for key in missing:
+            _, name, _ = cache_key(key)
+            params = {'Bucket': self.bucket_name, 'Key': key}
+            if name:
+                params['ResponseContentDisposition'] = f'attachment; filename="{name}"'
+            if content_type:
+                params['ResponseContentType'] = content_type
+            try:
+                signed[key] = self.s3_client.generate_presigned_url(
                     'get_object',
-                    Params={'Bucket': self.bucket_name, 'Key': cloud_key},
-                    ExpiresIn=expires_in
+                    Params=params,
+                    ExpiresIn=self.url_expires
                 )
-        except ClientError as e:
-            print(f"Error generating download URL: {e}")
-        return None
+            except (ClientError, BotoCoreError) as e:
+                print(f"Error generating download URL: {e}")
+        
+        if signed:
+            expires_at = now + self.url_expires
+            with self._url_lock:
+                for key, url in signed.items():
+                    self._url_cache[cache_key(key)] = (url, expires_at)
+                    self.url_misses += 1
+                while len(self._url_cache) > self.url_cache_size:
+                    self._url_cache.popitem(last=False)
+            urls.update(signed)
+        return urls
+    
+    def get_url_cache_stats(self):
+        """Return presigned URL cache counters"""
+        with self._url_lock:
+            return {
+                'entries': len(self._url_cache),
+                'hits': self.url_hits,
+                'misses': self.url_misses
+            }
 
 # Global instance
 cloud_storage = CloudStorageService()
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _Recipient:
+    """Delivery state for one connected client"""
+
+    __slots__ = ('in_flight', 'backlog', 'dropped')
+
+    def __init__(self):
+        self.in_flight = deque()  # send times of batches not yet acknowledged
+        self.backlog = deque()  # updates held back while the client catches up
+        self.dropped = 0  # updates discarded since the last delivered batch
+
+class EmitCoalescer:
+    """
+    Batches frequent room events into one array event per window
+
+    Updates queued with enqueue() are collected per (namespace, room, event)
+    and sent every window_ms as a single event whose payload carries the
+    list. Clients connected to this worker receive their batch individually
+    and acknowledge it; a client with max_in_flight unacknowledged batches
+    is treated as slow and its updates are held in a backlog of at most
+    queue_limit entries, oldest dropped first. The next batch it receives
+    reports how many updates were dropped so it can resync. Batches that are
+    not acknowledged within ack_timeout count as delivered, so clients that
+    never acknowledge are not starved. Clients on other workers get the
+    batch as a plain room emit through the message queue.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = 150,
+        queue_limit: int = 50,
+        max_in_flight: int = 2,
+        ack_timeout: float = 5.0,
+        max_recipients: int = 10000
+    ):
+        self.window = window_ms / 1000.0
+        self.queue_limit = queue_limit
+        self.max_in_flight = max_in_flight
+        self.ack_timeout = ack_timeout
+        self.max_recipients = max_recipients
+
+        self.socketio = None
+        self._pending: Dict[Tuple[str, str, str], List[Any]] = {}
+        self._recipients = OrderedDict()  # (namespace, sid) -> _Recipient
+        self._lock = threading.Lock()
+        self._started = False
+
+        self.batches = 0
+        self.updates = 0
+        self.dropped = 0
+
+    def init_app(self, app, socketio):
+        """Start the flusher for a Flask-SocketIO server"""
+        self.socketio = socketio
+        if self._started:
+            return
+        self._started = True
+        socketio.start_background_task(self._run)
+
+    def enqueue(self, room: str, event: str, update: Any, namespace: str = '/'):
+        """Queue an update for the next batch of event sent to room"""
+        with self._lock:
+            self._pending.setdefault((namespace, room, event), []).append(update)
+            self.updates += 1
+
+    def forget(self, sid: str, namespace: str = '/'):
+        """Drop delivery state for a disconnected client"""
+        with self._lock:
+            self._recipients.pop((namespace, sid), None)
+
+    def flush(self):
+        """Send every pending batch now"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        for (namespace, room, event), updates in pending.items():
+            try:
+                self._deliver(namespace, room, event, updates)
+            except Exception as e:
+                logger.error(f"Error emitting {event} to {room}: {str(e)}")
+
+    def _deliver(self, namespace: str, room: str, event: str, updates: List[Any]):
+        self.batches += 1
+        local_sids = [sid for sid, _ in self.socketio.server.manager.get_participants(namespace, room)]
+
+        # Clients on other workers can't be tracked here; they get the plain batch
+        self.socketio.emit(
+            event, {'room': room, 'updates': updates, 'dropped': 0},
+            to=room, namespace=namespace, skip_sid=local_sids or None
+        )
+
+        now = time.monotonic()
+        for sid in local_sids:
+            with self._lock:
+                recipient = self._recipient(namespace, sid)
+                while recipient.in_flight and now - recipient.in_flight[0] > self.ack_timeout:
+                    recipient.in_flight.popleft()
+
+                recipient.backlog.extend(updates)
+                overflow = len(recipient.backlog) - self.queue_limit
+                if overflow > 0:
+                    for _ in range(overflow):
+                        recipient.backlog.popleft()
+                    recipient.dropped += overflow
+                    self.dropped += overflow
+
+                batch = self._take_batch(recipient, now)
+            if batch is not None:
+                self._send(namespace, room, event, sid, batch)
+
+    def _recipient(self, namespace: str, sid: str) -> _Recipient:
+        """Look up or create a client's state; caller holds the lock"""
+        key = (namespace, sid)
+        recipient = self._recipients.get(key)
+        if recipient is None:
+            recipient = _Recipient()
+            self._recipients[key] = recipient
+            while len(self._recipients) > self.max_recipients:
+                self._recipients.popitem(last=False)
+        else:
+            self._recipients.move_to_end(key)
+        return recipient
+
+    def _take_batch(self, recipient: _Recipient, now: float) -> Optional[Dict[str, Any]]:
+        """Empty the backlog into a batch if the client can take one; caller holds the lock"""
+        if not recipient.backlog or len(recipient.in_flight) >= self.max_in_flight:
+            return None
+        batch = {'updates': list(recipient.backlog), 'dropped': recipient.dropped}
+        recipient.backlog.clear()
+        recipient.dropped = 0
+        recipient.in_flight.append(now)
+        return batch
+
+    def _send(self, namespace: str, room: str, event: str, sid: str, batch: Dict[str, Any]):
+        def on_ack(*_):
+            self._on_ack(namespace, room, event, sid)
+
+        self.socketio.emit(event, dict(batch, room=room), to=sid, namespace=namespace, callback=on_ack)
+
+    def _on_ack(self, namespace: str, room: str, event: str, sid: str):
+        with self._lock:
+            recipient = self._recipients.get((namespace, sid))
+            if recipient is None:
+                return
+            if recipient.in_flight:
+                recipient.in_flight.popleft()
+            batch = self._take_batch(recipient, time.monotonic())
+        if batch is not None:
+            self._send(namespace, room, event, sid, batch)
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Emit coalescer error: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return coalescer counters"""
+        with self._lock:
+            return {
+                'window_ms': self.window * 1000,
+                'recipients': len(self._recipients),
+                'slow_recipients': sum(
+                    1 for recipient in self._recipients.values()
+                    if len(recipient.in_flight) >= self.max_in_flight
+                ),
+                'batches': self.batches,
+                'updates': self.updates,
+                'updates_per_batch': self.updates / self.batches if self.batches else 0.0,
+                'dropped': self.dropped
+            }
+
+# Global instance
+emit_coalescer = EmitCoalescer(
+    window_ms=float(os.getenv('EMIT_COALESCE_WINDOW_MS', '150')),
+    queue_limit=int(os.getenv('EMIT_RECIPIENT_QUEUE_LIMIT', '50')),
+    max_in_flight=int(os.getenv('EMIT_MAX_IN_FLIGHT', '2')),
+    ack_timeout=float(os.getenv('EMIT_ACK_TIMEOUT', '5'))
+)
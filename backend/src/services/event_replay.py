@@ -0,0 +1,122 @@
+import bisect
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.session_registry import InMemorySessionRegistry, session_registry
+
+class _SessionLog:
+    """Recent outbound events for one session"""
+
+    __slots__ = ('events',)
+
+    def __init__(self):
+        self.events = []  # (event_id, event, data), ordered by event id
+
+class EventReplayBuffer:
+    """
+    Ring buffer of recent events sent to each session's room
+
+    record() stamps an outgoing event with the session's next event id and
+    keeps a copy. Ids come from the session registry, so with a shared
+    registry backend they are consecutive per session across all workers,
+    and a reconnecting client that reports the last id it saw can be sent
+    exactly the events after it. Each worker only keeps the events it sent
+    itself; if any id in the requested range was evicted or sent by another
+    worker, since() reports the replay as incomplete.
+    """
+
+    def __init__(self, capacity: int = 200, max_sessions: int = 2000, id_source=None):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self.id_source = id_source or InMemorySessionRegistry()
+
+        self._logs = OrderedDict()  # session_id -> _SessionLog
+        self._lock = threading.Lock()
+
+        self.recorded = 0
+        self.replayed = 0
+        self.incomplete = 0
+
+    def record(self, session_id: str, event: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign the next event id; returns a copy of data carrying 'event_id'"""
+        event_id = self.id_source.next_event_id(session_id)
+        stamped = dict(data, event_id=event_id)
+
+        with self._lock:
+            log = self._logs.get(session_id)
+            if log is None:
+                log = _SessionLog()
+                self._logs[session_id] = log
+                while len(self._logs) > self.max_sessions:
+                    self._logs.popitem(last=False)
+            else:
+                self._logs.move_to_end(session_id)
+
+            # Concurrent senders may append slightly out of id order
+            bisect.insort(log.events, (event_id, event, stamped))
+            if len(log.events) > self.capacity:
+                del log.events[0]
+            self.recorded += 1
+            return stamped
+
+    def last_event_id(self, session_id: str) -> Optional[int]:
+        """Id of the latest event sent to a session by any worker"""
+        return self.id_source.last_event_id(session_id)
+
+    def since(self, session_id: str, last_event_id: int) -> Tuple[List[Tuple[str, Dict[str, Any]]], bool]:
+        """
+        Events recorded after last_event_id
+
+        Returns:
+            ([(event, data), ...], complete) where complete is False if some
+            events after last_event_id are not available from this worker
+        """
+        latest = self.id_source.last_event_id(session_id)
+
+        with self._lock:
+            if latest is None:
+                self.incomplete += 1
+                return [], False
+
+            if last_event_id >= latest:
+                # Ids beyond the latest come from a counter that no longer exists
+                complete = last_event_id == latest
+                if not complete:
+                    self.incomplete += 1
+                return [], complete
+
+            log = self._logs.get(session_id)
+            events = log.events if log else []
+            start = bisect.bisect_left(events, (last_event_id + 1,))
+            missed = events[start:]
+            # Ids are unique and sorted, so a full count means no gaps
+            complete = sum(1 for event_id, _, _ in missed if event_id <= latest) == latest - last_event_id
+            self.replayed += len(missed)
+            if not complete:
+                self.incomplete += 1
+            return [(event, data) for _, event, data in missed], complete
+
+    def clear_session(self, session_id: str):
+        """Forget a session's events"""
+        with self._lock:
+            self._logs.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return buffer counters"""
+        with self._lock:
+            return {
+                'sessions': len(self._logs),
+                'events': sum(len(log.events) for log in self._logs.values()),
+                'recorded': self.recorded,
+                'replayed': self.replayed,
+                'incomplete': self.incomplete
+            }
+
+# Global instance
+event_replay = EventReplayBuffer(
+    capacity=int(os.getenv('REPLAY_BUFFER_EVENTS', '200')),
+    max_sessions=int(os.getenv('REPLAY_BUFFER_MAX_SESSIONS', '2000')),
+    id_source=session_registry
+)
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterator, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FakeGeminiError(Exception):
+    """Simulated upstream failure"""
+    pass
+
+class FakeResponse:
+    """Minimal stand-in for a GenerateContentResponse (or one streamed chunk)"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeStreamingResponse:
+    """Iterable of FakeResponse chunks that sleeps between chunks"""
+
+    def __init__(self, chunks: List[str], delays: List[float]):
+        self._chunks = chunks
+        self._delays = delays
+        self.text = ''.join(chunks)
+
+    def __iter__(self) -> Iterator[FakeResponse]:
+        for chunk, delay in zip(self._chunks, self._delays):
+            time.sleep(delay)
+            yield FakeResponse(chunk)
+
+_TRANSCRIPTS = [
+    "Let me start by estimating the population of the city.",
+    "I'll assume roughly one car for every three people.",
+    "So that gives us about two and a half million households.",
+    "Each household probably uses this about twice a week.",
+    "Let me sanity check that number against what I know.",
+    ""
+]
+
+_HINTS = [
+    "Try splitting the population into segments that behave differently.",
+    "Which single assumption drives your estimate the most? Can you sanity-check it?",
+    "Consider estimating from the supply side as well as the demand side.",
+    "Think about how often the event happens per person per year."
+]
+
+_FOLLOW_UPS = [
+    "How would your estimate change if usage doubled on weekends?",
+    "Which of your assumptions are you least confident about, and why?",
+    "How could you validate this number with publicly available data?"
+]
+
+class FakeGenerativeModel:
+    """
+    Offline, deterministic replacement for genai.GenerativeModel
+
+    Responses are chosen from canned outputs by prompt type. Latency follows
+    a log-normal distribution around a configurable median, and a
+    configurable fraction of calls fail. Randomness is seeded per prompt, so
+    the same sequence of calls behaves the same way on every run. Call counts
+    are kept for the most recent max_tracked_prompts prompts only; a prompt
+    seen again after being forgotten starts over from its first response.
+    """
+
+    def __init__(
+        self,
+        median_latency_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        ttft_fraction: float = 0.25,
+        stream_chunk_words: int = 3,
+        seed: int = 0,
+        max_tracked_prompts: int = 10000
+    ):
+        self.median_latency = median_latency_ms / 1000.0
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.ttft_fraction = ttft_fraction
+        self.stream_chunk_words = max(1, stream_chunk_words)
+        self.seed = seed
+        self.max_tracked_prompts = max_tracked_prompts
+
+        self._calls = OrderedDict()  # prompt digest -> times seen
+        self._lock = threading.Lock()
+
+    def _rng(self, contents: Any) -> random.Random:
+        """Return an RNG seeded by the prompt and how often it has been seen"""
+        if isinstance(contents, list):
+            prompt = ''.join(part if isinstance(part, str) else str(part.get('data', ''))[:256] for part in contents)
+        else:
+            prompt = str(contents)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+        with self._lock:
+            count = self._calls.get(digest, 0)
+            self._calls[digest] = count + 1
+            self._calls.move_to_end(digest)
+            while len(self._calls) > self.max_tracked_prompts:
+                self._calls.popitem(last=False)
+        return random.Random(f"{self.seed}:{digest}:{count}")
+
+    def _respond(self, contents: Any, rng: random.Random) -> str:
+        """Produce a canned answer matching the prompt type"""
+        if isinstance(contents, list):
+            return rng.choice(_TRANSCRIPTS)
+
+        prompt = str(contents)
+        if 'Analyze this interview response' in prompt:
+            breakdown = {name: rng.randint(10, 25) for name in ('structure', 'assumptions', 'math', 'communication')}
+            return json.dumps({
+                'total_score': sum(breakdown.values()),
+                'breakdown': breakdown,
+                'strengths': ['Clear structure', 'Stated assumptions explicitly'],
+                'improvements': ['Sanity-check the final number', 'Consider edge segments'],
+                'overall_feedback': 'A reasonable, structured estimate.'
+            })
+        if 'follow-up question' in prompt:
+            return rng.choice(_FOLLOW_UPS)
+        if 'running summary' in prompt:
+            match = re.search(r'New transcript:\s*(.*)', prompt)
+            return (match.group(1).strip() if match else '')[:400]
+
+        match = re.search(r'Response type requested:\s*(\w+)', prompt)
+        response_type = match.group(1) if match else 'hint'
+        message = rng.choice(_HINTS)
+        if 'without JSON formatting' in prompt:
+            return message
+        return json.dumps({'type': response_type, 'message': message})
+
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs):
+        """Mimic GenerativeModel.generate_content, blocking for the simulated latency"""
+        rng = self._rng(contents)
+        if self.latency_sigma > 0:
+            latency = self.median_latency * rng.lognormvariate(0.0, self.latency_sigma)
+        else:
+            latency = self.median_latency
+        failed = rng.random() < self.error_rate
+        text = self._respond(contents, rng)
+
+        if not stream:
+            time.sleep(latency)
+            if failed:
+                raise FakeGeminiError("Simulated Gemini failure")
+            return FakeResponse(text)
+
+        # Streaming: the first chunk arrives after the TTFT share of the
+        # latency, the rest are spread evenly over the remainder
+        time.sleep(latency * self.ttft_fraction)
+        if failed:
+            raise FakeGeminiError("Simulated Gemini failure")
+        words = text.split(' ')
+        chunks = [
+            ' '.join(words[i:i + self.stream_chunk_words]) + (' ' if i + self.stream_chunk_words < len(words) else '')
+            for i in range(0, len(words), self.stream_chunk_words)
+        ]
+        gap = latency * (1 - self.ttft_fraction) / max(1, len(chunks) - 1)
+        return FakeStreamingResponse(chunks, [0.0] + [gap] * (len(chunks) - 1))
+
+def create_fake_model() -> FakeGenerativeModel:
+    """Build a fake model configured from GEMINI_FAKE_* environment variables"""
+    return FakeGenerativeModel(
+        median_latency_ms=float(os.getenv('GEMINI_FAKE_LATENCY_MS', '800')),
+        latency_sigma=float(os.getenv('GEMINI_FAKE_LATENCY_SIGMA', '0.5')),
+        error_rate=float(os.getenv('GEMINI_FAKE_ERROR_RATE', '0')),
+        ttft_fraction=float(os.getenv('GEMINI_FAKE_TTFT_FRACTION', '0.25')),
+        stream_chunk_words=int(os.getenv('GEMINI_FAKE_STREAM_CHUNK_WORDS', '3')),
+        seed=int(os.getenv('GEMINI_FAKE_SEED', '0'))
+    )
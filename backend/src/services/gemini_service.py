@@ -1,17 +1,212 @@
 import google.generativeai as genai
-import base64
 import io
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Union
 import logging
 import asyncio
+import concurrent.futures
+import heapq
+import itertools
 import json
+import threading
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from src.services.response_cache import response_cache
+from src.services.semantic_cache import semantic_cache
+from src.services.resilience import CircuitBreaker, ResilientCaller
 
 logger = logging.getLogger(__name__)
 
+# Call classes in priority order (lower value is served first)
+CALL_PRIORITIES = {
+    'transcription': 0,
+    'hint': 1,
+    'follow_up': 2,
+    'analysis': 3
+}
+
+class GeminiScheduler:
+    """
+    Admits Gemini calls by priority under an in-flight cap and a rate limit
+    
+    Waiting calls are kept in a single heap ordered by call class, so live
+    transcription and hints always jump ahead of queued post-hoc analysis.
+    Admission also requires a token from a requests-per-minute bucket.
+    """
+
+    def __init__(self, max_in_flight: int = 8, requests_per_minute: float = 0, burst: int = 10):
+        self.max_in_flight = max(1, max_in_flight)
+        self.requests_per_minute = requests_per_minute  # 0 disables rate limiting
+        self.burst = max(1, burst)
+
+        self._lock = threading.Lock()
+        self._waiters = []  # heap of (priority, seq, call_class, enqueued_at, future)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+
+        self._admitted = {call_class: 0 for call_class in CALL_PRIORITIES}
+        self._wait_times = {call_class: deque(maxlen=200) for call_class in CALL_PRIORITIES}
+
+    def _refill(self):
+        """Add tokens earned since the last refill"""
+        now = time.monotonic()
+        if self.requests_per_minute > 0:
+            earned = (now - self._refilled_at) * self.requests_per_minute / 60.0
+            self._tokens = min(float(self.burst), self._tokens + earned)
+        self._refilled_at = now
+
+    def _recheck_delay(self) -> Optional[float]:
+        """
+        Seconds a waiter may sleep before re-checking for tokens
+        
+        Releases only admit waiters while tokens remain, so under rate
+        limiting waiters also wake up on their own once a token is due.
+        """
+        if self.requests_per_minute <= 0:
+            return None
+        interval = 60.0 / self.requests_per_minute
+        if self._tokens >= 1:
+            return interval
+        return (1 - self._tokens) * interval
+
+    def _dispatch(self):
+        """Admit queued calls in priority order while capacity and tokens remain"""
+        self._refill()
+        while self._waiters and self._in_flight < self.max_in_flight:
+            if self.requests_per_minute > 0 and self._tokens < 1:
+                break
+
+            _, _, call_class, enqueued_at, future = heapq.heappop(self._waiters)
+            if future.cancelled():
+                continue
+
+            if self.requests_per_minute > 0:
+                self._tokens -= 1
+            self._in_flight += 1
+            self._admitted[call_class] += 1
+            self._wait_times[call_class].append(time.monotonic() - enqueued_at)
+            future.set_result(True)
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, call_class: str):
+        """
+        Hold an admission slot for the duration of one Gemini call
+        
+        Args:
+            call_class: One of CALL_PRIORITIES
+        """
+        # A thread-safe future can be resolved under the lock by whichever
+        # call releases a slot
+        future = concurrent.futures.Future()
+        with self._lock:
+            heapq.heappush(self._waiters, (
+                CALL_PRIORITIES[call_class], next(self._sequence),
+                call_class, time.monotonic(), future
+            ))
+            self._dispatch()
+
+        try:
+            while not future.done():
+                with self._lock:
+                    self._dispatch()
+                    delay = self._recheck_delay()
+                if future.done():
+                    break
+                try:
+                    # Wake up when admitted, or when the next token is due
+                    await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # Cancelled while queued: give the slot back if it was granted meanwhile
+            with self._lock:
+                granted = not future.cancel()
+            if granted:
+                self._release()
+            raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth, in-flight count and wait-time metrics"""
+        with self._lock:
+            self._refill()
+            queued = {call_class: 0 for call_class in CALL_PRIORITIES}
+            for _, _, call_class, _, future in self._waiters:
+                if not future.done():
+                    queued[call_class] += 1
+
+            wait_times = {}
+            for call_class, samples in self._wait_times.items():
+                ordered = sorted(samples)
+                wait_times[call_class] = {
+                    'samples': len(ordered),
+                    'avg_ms': round(1000 * sum(ordered) / len(ordered), 1) if ordered else 0.0,
+                    'p95_ms': round(1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1) if ordered else 0.0,
+                    'max_ms': round(1000 * ordered[-1], 1) if ordered else 0.0
+                }
+
+            return {
+                'max_in_flight': self.max_in_flight,
+                'in_flight': self._in_flight,
+                'requests_per_minute': self.requests_per_minute,
+                'tokens_available': round(self._tokens, 2),
+                'queue_depth': queued,
+                'admitted': dict(self._admitted),
+                'wait_times': wait_times
+            }
+
 class GeminiService:
     def __init__(self):
         """Initialize Gemini API service"""
+        # All Gemini calls share one scheduler so interactive calls win under load
+        self.scheduler = GeminiScheduler(
+            max_in_flight=int(os.getenv('GEMINI_MAX_IN_FLIGHT', '8')),
+            requests_per_minute=float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '0')),
+            burst=int(os.getenv('GEMINI_RATE_BURST', '10'))
+        )
+        
+        # Deadlines bound how long a call stays useful; a transcription chunk
+        # is worthless after a few seconds, post-hoc analysis can wait
+        self.resilience = ResilientCaller(
+            deadlines={
+                call_class: float(os.getenv(f'GEMINI_DEADLINE_{call_class.upper()}', default))
+                for call_class, default in (
+                    ('transcription', '5'), ('hint', '10'), ('follow_up', '20'), ('analysis', '60')
+                )
+            },
+            max_retries=int(os.getenv('GEMINI_MAX_RETRIES', '2')),
+            hedge_classes=[c.strip() for c in os.getenv('GEMINI_HEDGE_CALLS', '').split(',') if c.strip()],
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv('GEMINI_BREAKER_FAILURES', '5')),
+                cooldown_seconds=float(os.getenv('GEMINI_BREAKER_COOLDOWN', '30'))
+            )
+        )
+        
+        self.text_model = None
+        self.audio_model = None
+        
+        # GEMINI_BACKEND=fake swaps in an offline, deterministic stand-in
+        self.backend = os.getenv('GEMINI_BACKEND', 'gemini').lower()
+        if self.backend == 'fake':
+            from src.services.fake_gemini import create_fake_model
+            self.api_key = None
+            self.text_model = create_fake_model()
+            self.audio_model = create_fake_model()
+            logger.info("Gemini service using offline fake backend")
+            return
+        
         self.api_key = os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             logger.warning("GEMINI_API_KEY not found in environment variables")
@@ -25,16 +220,30 @@ class GeminiService:
         
         logger.info("Gemini API service initialized successfully")
 
+    async def _call_model(self, call_class: str, model_call, *args, **kwargs):
+        """
+        Run a blocking model call through the scheduler and resilience layer
+        
+        Each attempt (including retries and hedges) waits for its own
+        scheduler slot. A timed-out attempt stops being awaited, but the
+        underlying thread runs to completion in the background.
+        """
+        async def attempt():
+            async with self.scheduler.slot(call_class):
+                return await asyncio.to_thread(model_call, *args, **kwargs)
+        
+        return await self.resilience.call(call_class, attempt)
+
     def is_available(self) -> bool:
         """Check if Gemini API is available"""
-        return self.api_key is not None
+        return self.text_model is not None
 
-    async def transcribe_audio(self, audio_data: bytes, format: str = 'webm') -> Optional[str]:
+    async def transcribe_audio(self, audio_data: Union[bytes, memoryview], format: str = 'webm') -> Optional[str]:
         """
         Transcribe audio data using Gemini API
         
         Args:
-            audio_data: Raw audio bytes
+            audio_data: Raw audio bytes, or a view of them
             format: Audio format (webm, mp3, wav, etc.)
             
         Returns:
@@ -45,13 +254,11 @@ class GeminiService:
             return None
             
         try:
-            # Convert audio data to base64
-            audio_b64 = base64.b64encode(audio_data).decode('utf-8')
-            
-            # Create audio part for Gemini
+            # Inline blobs take raw bytes; bytes() is a no-op for bytes
+            # and the only copy made of a received memoryview
             audio_part = {
                 "mime_type": f"audio/{format}",
-                "data": audio_b64
+                "data": bytes(audio_data)
             }
             
             # Create prompt for transcription
@@ -62,7 +269,8 @@ class GeminiService:
             """
             
             # Generate transcription
-            response = await asyncio.to_thread(
+            response = await self._call_model(
+                'transcription',
                 self.audio_model.generate_content,
                 [prompt, audio_part]
             )
@@ -101,12 +309,36 @@ class GeminiService:
         if not self.is_available():
             logger.error("Gemini API not available")
             return None
+        
+        # Default AI prompt if none provided
+        if not ai_prompt:
+            ai_prompt = self._get_default_ai_prompt()
+        
+        async def compute():
+            # Near-duplicate transcripts for the same question share an answer
+            cached = semantic_cache.lookup(question, transcript, response_type, ai_prompt)
+            if cached:
+                return cached
             
+            result = await self._generate_ai_response(question, transcript, response_type, ai_prompt)
+            if result:
+                semantic_cache.add(question, transcript, response_type, ai_prompt, result)
+            return result
+        
+        # Identical requests within the TTL are served from cache, and
+        # concurrent identical requests share a single Gemini call
+        cache_key = response_cache.make_key(question, transcript, response_type, ai_prompt)
+        return await response_cache.get_or_compute(cache_key, compute)
+
+    async def _generate_ai_response(
+        self,
+        question: str,
+        transcript: str,
+        response_type: str,
+        ai_prompt: str
+    ) -> Optional[Dict[str, Any]]:
+        """Call Gemini for an AI response without consulting the cache"""
         try:
-            # Default AI prompt if none provided
-            if not ai_prompt:
-                ai_prompt = self._get_default_ai_prompt()
-            
             # Format the prompt with context
             formatted_prompt = ai_prompt.format(
                 question=question,
@@ -115,7 +347,8 @@ class GeminiService:
             )
             
             # Generate AI response
-            response = await asyncio.to_thread(
+            response = await self._call_model(
+                'hint',
                 self.text_model.generate_content,
                 formatted_prompt
             )
@@ -145,6 +378,155 @@ class GeminiService:
             logger.error(f"Error generating AI response: {str(e)}")
             return None
 
+    async def stream_ai_response(
+        self,
+        question: str,
+        transcript: str,
+        response_type: str = 'hint',
+        ai_prompt: str = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream an AI response as text chunks while Gemini generates it
+        
+        Args:
+            question: The interview question
+            transcript: Candidate's response transcript
+            response_type: Type of response (hint, feedback, encouragement)
+            ai_prompt: Custom AI prompt template
+            
+        Yields:
+            Message text chunks; nothing if generation failed
+        """
+        if not self.is_available():
+            logger.error("Gemini API not available")
+            return
+        
+        # Default AI prompt if none provided
+        if not ai_prompt:
+            ai_prompt = self._get_default_ai_prompt()
+        
+        async def compute():
+            # Near-duplicate transcripts for the same question share an answer
+            cached = semantic_cache.lookup(question, transcript, response_type, ai_prompt)
+            if cached:
+                return cached
+            
+            result = await self._stream_ai_response(question, transcript, response_type, ai_prompt, chunks)
+            if result:
+                semantic_cache.add(question, transcript, response_type, ai_prompt, result)
+            return result
+        
+        # Like generate_ai_response, identical concurrent requests share one
+        # Gemini call. Only the caller that makes it sees chunks as they
+        # arrive; cached answers and coalesced callers get a single chunk
+        chunks = asyncio.Queue()
+        cache_key = response_cache.make_key(question, transcript, response_type, ai_prompt)
+        request = asyncio.ensure_future(response_cache.get_or_compute(cache_key, compute))
+        next_chunk = None
+        streamed = False
+        try:
+            while not request.done():
+                next_chunk = asyncio.ensure_future(chunks.get())
+                await asyncio.wait({request, next_chunk}, return_when=asyncio.FIRST_COMPLETED)
+                if next_chunk.done():
+                    streamed = True
+                    yield next_chunk.result()
+            while not chunks.empty():
+                streamed = True
+                yield chunks.get_nowait()
+            
+            result = request.result()
+            if result and not streamed:
+                yield result.get('message', '')
+        except Exception as e:
+            logger.error(f"Error streaming AI response: {str(e)}")
+        finally:
+            # A caller that stops listening hands the call over to any waiters
+            if next_chunk is not None:
+                next_chunk.cancel()
+            request.cancel()
+
+    async def _stream_ai_response(
+        self,
+        question: str,
+        transcript: str,
+        response_type: str,
+        ai_prompt: str,
+        chunks: asyncio.Queue
+    ) -> Optional[Dict[str, Any]]:
+        """Stream a response from Gemini into chunks without consulting the cache"""
+        streamed = []
+        try:
+            # Partial JSON is useless to display, so ask for plain text
+            formatted_prompt = ai_prompt.format(
+                question=question,
+                transcript=transcript,
+                response_type=response_type
+            ) + "\nRespond with the message text only, without JSON formatting."
+            
+            # The deadline applies to opening the stream, then to each gap
+            # between chunks. Every attempt, hedges included, waits for its
+            # own scheduler slot; the slot of an attempt that opened a stream
+            # is held until the stream has been read
+            deadline = self.resilience.deadlines['hint']
+            async with AsyncExitStack() as held_slots:
+                async def attempt():
+                    slot = self.scheduler.slot('hint')
+                    await slot.__aenter__()
+                    try:
+                        response = await asyncio.to_thread(
+                            self.text_model.generate_content,
+                            formatted_prompt,
+                            stream=True
+                        )
+                    except BaseException:
+                        await slot.__aexit__(None, None, None)
+                        raise
+                    held_slots.push_async_exit(slot)
+                    return response
+                
+                response = await self.resilience.call('hint', attempt)
+                
+                # Each step of the stream blocks on the network, so pull it off-thread
+                stream = iter(response)
+                while True:
+                    chunk = await asyncio.wait_for(asyncio.to_thread(next, stream, None), timeout=deadline)
+                    if chunk is None:
+                        break
+                    if chunk.text:
+                        streamed.append(chunk.text)
+                        chunks.put_nowait(chunk.text)
+                    
+        except Exception as e:
+            logger.error(f"Error streaming AI response: {str(e)}")
+            return None
+        
+        ai_text = ''.join(streamed).strip()
+        if not ai_text:
+            logger.warning("No AI response streamed")
+            return None
+        return {
+            'type': response_type,
+            'message': ai_text,
+            'timestamp': None
+        }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get AI response cache counters"""
+        return response_cache.get_stats()
+
+    def get_semantic_cache_stats(self) -> Dict[str, Any]:
+        """Get semantic (near-duplicate) cache counters"""
+        return semantic_cache.get_stats()
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Get call scheduler queue and wait-time metrics"""
+        return self.scheduler.get_stats()
+
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """Get retry, hedging, timeout and circuit breaker metrics"""
+        return self.resilience.get_stats()
+
     def _get_default_ai_prompt(self) -> str:
         """Get default AI prompt template"""
         return """
@@ -169,10 +551,10 @@ Guidelines:
 5. Focus on the thinking process, not the final number
 
 Respond with a JSON object in this format:
-{
+{{
     "type": "{response_type}",
     "message": "Your helpful response here"
-}
+}}
 """
 
     async def analyze_response_quality(
@@ -222,7 +604,8 @@ Respond with a JSON object in this format:
             }}
             """
             
-            response = await asyncio.to_thread(
+            response = await self._call_model(
+                'analysis',
                 self.text_model.generate_content,
                 prompt
             )
@@ -278,7 +661,8 @@ Respond with a JSON object in this format:
             Return only the follow-up question, no additional text.
             """
             
-            response = await asyncio.to_thread(
+            response = await self._call_model(
+                'follow_up',
                 self.text_model.generate_content,
                 prompt
             )
@@ -295,6 +679,58 @@ Respond with a JSON object in this format:
             logger.error(f"Error generating follow-up question: {str(e)}")
             return None
 
+    async def summarize_transcript(
+        self,
+        question: str,
+        previous_summary: str,
+        transcript: str,
+        max_tokens: int = 150
+    ) -> Optional[str]:
+        """
+        Fold new transcript text into a running summary of the candidate's answer
+        
+        Args:
+            question: The interview question
+            previous_summary: Summary of earlier material (may be empty)
+            transcript: New transcript text to fold in
+            max_tokens: Approximate size limit for the summary
+            
+        Returns:
+            Updated summary or None
+        """
+        if not self.is_available():
+            logger.error("Gemini API not available")
+            return None
+            
+        try:
+            prompt = f"""
+            Update the running summary of a candidate's answer to a guesstimate question.
+            
+            Question: {question}
+            Summary so far: {previous_summary or '(none)'}
+            New transcript: {transcript}
+            
+            Keep the assumptions, numbers and structure the candidate has stated.
+            Use at most {max_tokens * 3 // 4} words.
+            Return only the updated summary, no additional text.
+            """
+            
+            response = await self._call_model(
+                'analysis',
+                self.text_model.generate_content,
+                prompt
+            )
+            
+            if response and response.text:
+                return response.text.strip()
+            else:
+                logger.warning("No transcript summary generated")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Error summarizing transcript: {str(e)}")
+            return None
+
 # Global instance
 gemini_service = GeminiService()
 
@@ -0,0 +1,60 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class HintBank:
+    """
+    Serves curated Question.hints in order, one per request
+
+    Each question's JSON hints are parsed once into an in-memory index, and
+    a per-session cursor tracks which hints the candidate has already seen.
+    """
+
+    def __init__(self):
+        self.slo_seconds = float(os.getenv('HINT_LATENCY_SLO_MS', '1500')) / 1000.0
+        self.late_policy = os.getenv('HINT_LATE_POLICY', 'follow_up')  # follow_up, discard
+
+        self._hints: Dict[int, List[str]] = {}
+        self._cursors: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def get_hints(self, question) -> List[str]:
+        """Return the parsed curated hints for a question, indexing it on first use"""
+        with self._lock:
+            hints = self._hints.get(question.id)
+        if hints is not None:
+            return hints
+
+        try:
+            parsed = json.loads(question.hints) if question.hints else []
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid hints JSON for question {question.id}")
+            parsed = []
+        hints = [str(hint).strip() for hint in parsed if str(hint).strip()]
+
+        with self._lock:
+            self._hints[question.id] = hints
+        return hints
+
+    def next_hint(self, session_id: str, question) -> Optional[str]:
+        """Return the next curated hint this session hasn't seen for the question"""
+        hints = self.get_hints(question)
+        with self._lock:
+            cursor = self._cursors.get((session_id, question.id), 0)
+            if cursor >= len(hints):
+                return None
+            self._cursors[(session_id, question.id)] = cursor + 1
+        return hints[cursor]
+
+    def clear_session(self, session_id: str):
+        """Forget which hints a session has seen"""
+        with self._lock:
+            for key in [key for key in self._cursors if key[0] == session_id]:
+                del self._cursors[key]
+
+# Global instance
+hint_bank = HintBank()
@@ -0,0 +1,329 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SESSION_SEALED_MARKER = 'session.sealed'
+
+class SpoolSealedError(Exception):
+    """A chunk arrived for a question whose recording has already been sealed"""
+
+class _Spool:
+    """An open spool file and the chunks waiting for their turn"""
+
+    __slots__ = ('path', 'file', 'lock', 'next_seq', 'pending', 'unsynced', 'last_write', 'duration', 'mime_type')
+
+    def __init__(self, path: str, next_seq: int, duration: float, mime_type: Optional[str]):
+        self.path = path
+        self.file = open(path, 'ab')
+        self.lock = threading.Lock()
+        self.next_seq = next_seq
+        self.pending: Dict[int, bytes] = {}  # seq -> chunk received ahead of its turn
+        self.unsynced = 0
+        self.last_write = time.monotonic()
+        self.duration = duration
+        self.mime_type = mime_type
+
+class RecordingSpool:
+    """
+    Append-only spool files for recording chunks sent during the interview
+
+    Each (session, question, client stream) gets its own file, so a browser
+    that reloads mid-question starts a new, independently playable file
+    rather than appending a second header to the first. Chunks are written
+    in sequence order: early arrivals wait in memory for up to window chunks,
+    and repeats are dropped. Writes are fsynced once fsync_bytes have
+    accumulated, and otherwise every fsync_interval by a background thread,
+    along with a small .json file holding the next sequence number and
+    duration. seal() closes a question's spools and moves them out for
+    storage as Recordings, and leaves a marker file so chunks arriving later
+    are rejected rather than starting a new spool without a container
+    header. Session directories left holding only markers are removed after
+    sealed_retention seconds.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        fsync_bytes: int = 1024 * 1024,
+        fsync_interval: float = 1.0,
+        window: int = 16,
+        idle_close: float = 60.0,
+        sealed_retention: float = 24 * 3600
+    ):
+        self.base_dir = base_dir
+        self.fsync_bytes = fsync_bytes
+        self.fsync_interval = fsync_interval
+        self.window = window
+        self.idle_close = idle_close
+        self.sealed_retention = sealed_retention
+
+        self._spools = OrderedDict()  # (session_id, question_key, stream_key) -> _Spool
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self.duplicates = 0
+        self.sealed = 0
+        self.rejected = 0
+        self._last_cleanup = time.monotonic()
+
+    def start(self):
+        """Start the background fsync thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _safe(value: Any) -> str:
+        return re.sub(r'[^A-Za-z0-9_-]', '', str(value)) or 'none'
+
+    def _key(self, session_id: str, question_id: Optional[int], stream_id: str) -> Tuple[str, str, str]:
+        return self._safe(session_id), self._safe(question_id), self._safe(stream_id)
+
+    def _is_sealed(self, key: Tuple[str, str, str]) -> bool:
+        session_dir = os.path.join(self.base_dir, key[0])
+        return (
+            os.path.exists(os.path.join(session_dir, SESSION_SEALED_MARKER))
+            or os.path.exists(os.path.join(session_dir, f"{key[1]}.sealed"))
+        )
+
+    def _mark_sealed(self, session_key: str, marker: str):
+        """Record a seal on disk, so every process sharing base_dir sees it; caller holds the lock"""
+        session_dir = os.path.join(self.base_dir, session_key)
+        os.makedirs(session_dir, exist_ok=True)
+        open(os.path.join(session_dir, marker), 'w').close()
+
+    def _open(self, key: Tuple[str, str, str]) -> _Spool:
+        """Look up or open a spool, resuming saved state; caller holds the lock"""
+        spool = self._spools.get(key)
+        if spool is not None:
+            return spool
+
+        session_dir = os.path.join(self.base_dir, key[0])
+        os.makedirs(session_dir, exist_ok=True)
+        path = os.path.join(session_dir, f"{key[1]}_{key[2]}.spool")
+        state = {}
+        if os.path.exists(path + '.json'):
+            try:
+                with open(path + '.json') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+        spool = _Spool(path, state.get('next_seq', 0), state.get('duration', 0.0), state.get('mime_type'))
+        self._spools[key] = spool
+        return spool
+
+    def append(
+        self,
+        session_id: str,
+        question_id: Optional[int],
+        stream_id: str,
+        seq: int,
+        data: bytes,
+        elapsed: Optional[float] = None,
+        mime_type: Optional[str] = None
+    ) -> bool:
+        """
+        Add a chunk to its spool
+
+        Args:
+            seq: Chunk number within the stream's recording of this question, from 0
+            elapsed: Seconds recorded so far, for the Recording's duration
+
+        Returns:
+            False if the chunk was a repeat
+
+        Raises:
+            SpoolSealedError: The question's recording has already been sealed
+        """
+        key = self._key(session_id, question_id, stream_id)
+        while True:
+            with self._lock:
+                if self._is_sealed(key):
+                    self.rejected += 1
+                    raise SpoolSealedError(f"Recording for question {question_id} is already sealed")
+                spool = self._open(key)
+                self._spools.move_to_end(key)
+            spool.lock.acquire()
+            if not spool.file.closed:
+                break
+            # Closed by the idle sweep or a seal in the meantime; reopen
+            spool.lock.release()
+
+        try:
+            if seq < spool.next_seq or seq in spool.pending:
+                self.duplicates += 1
+                return False
+
+            spool.pending[seq] = bytes(data)
+            if elapsed is not None:
+                spool.duration = max(spool.duration, float(elapsed))
+            if mime_type:
+                spool.mime_type = mime_type
+
+            # A chunk that never arrives holds the rest back for at most window chunks
+            if len(spool.pending) > self.window and spool.next_seq not in spool.pending:
+                spool.next_seq = min(spool.pending)
+            while spool.next_seq in spool.pending:
+                chunk = spool.pending.pop(spool.next_seq)
+                spool.file.write(chunk)
+                spool.unsynced += len(chunk)
+                spool.next_seq += 1
+                self.bytes_written += len(chunk)
+            spool.last_write = time.monotonic()
+
+            if spool.unsynced >= self.fsync_bytes:
+                self._sync(spool)
+            return True
+        finally:
+            spool.lock.release()
+
+    def _sync(self, spool: _Spool):
+        """Make a spool's writes durable and save its state; caller holds spool.lock"""
+        spool.file.flush()
+        os.fsync(spool.file.fileno())
+        spool.unsynced = 0
+        self.fsyncs += 1
+
+        tmp_path = spool.path + '.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'next_seq': spool.next_seq, 'duration': spool.duration, 'mime_type': spool.mime_type}, f)
+        os.replace(tmp_path, spool.path + '.json')
+
+    def seal(self, session_id: str, question_id: Optional[int], destination_dir: str) -> List[Dict[str, Any]]:
+        """
+        Close a question's spools and move them into destination_dir
+
+        Returns:
+            One {'question_id', 'path', 'size', 'duration', 'mime_type'} per
+            non-empty spool
+        """
+        session_key, question_key, _ = self._key(session_id, question_id, '')
+        return self._seal(session_key, f"{question_key}_", f"{question_key}.sealed", destination_dir)
+
+    def seal_session(self, session_id: str, destination_dir: str) -> List[Dict[str, Any]]:
+        """Close and move every remaining spool of a session; see seal()"""
+        return self._seal(self._safe(session_id), '', SESSION_SEALED_MARKER, destination_dir)
+
+    def _seal(self, session_key: str, prefix: str, marker: str, destination_dir: str) -> List[Dict[str, Any]]:
+        session_dir = os.path.join(self.base_dir, session_key)
+
+        # From here on, appends for these spools are rejected
+        with self._lock:
+            self._mark_sealed(session_key, marker)
+
+        # Spools may exist on disk from before a restart, not just in memory
+        sealed = []
+        for name in sorted(os.listdir(session_dir)):
+            if not name.startswith(prefix) or not name.endswith('.spool'):
+                continue
+            question_key, stream_key = name[:-len('.spool')].split('_', 1)
+            key = (session_key, question_key, stream_key)
+
+            with self._lock:
+                spool = self._open(key)
+                del self._spools[key]
+
+            with spool.lock:
+                # Anything still waiting on a missing chunk is written as is
+                for seq in sorted(spool.pending):
+                    spool.file.write(spool.pending.pop(seq))
+                self._sync(spool)
+                spool.file.close()
+
+            size = os.path.getsize(spool.path)
+            if size:
+                os.makedirs(destination_dir, exist_ok=True)
+                destination = os.path.join(destination_dir, f"{uuid.uuid4()}.webm")
+                shutil.move(spool.path, destination)
+                sealed.append({
+                    'question_id': int(question_key) if question_key.isdigit() else None,
+                    'path': destination,
+                    'size': size,
+                    'duration': spool.duration,
+                    'mime_type': spool.mime_type
+                })
+                self.sealed += 1
+            else:
+                os.remove(spool.path)
+            os.remove(spool.path + '.json')
+        return sealed
+
+    def _remove_expired_seals(self):
+        """Remove session directories that hold nothing but old seal markers"""
+        if not os.path.isdir(self.base_dir):
+            return
+        cutoff = time.time() - self.sealed_retention
+        for session_key in os.listdir(self.base_dir):
+            session_dir = os.path.join(self.base_dir, session_key)
+            try:
+                names = os.listdir(session_dir)
+                if all(
+                    name.endswith('.sealed') and os.path.getmtime(os.path.join(session_dir, name)) < cutoff
+                    for name in names
+                ):
+                    shutil.rmtree(session_dir, ignore_errors=True)
+            except OSError:
+                continue
+
+    def _run(self):
+        while True:
+            time.sleep(self.fsync_interval)
+            if time.monotonic() - self._last_cleanup > min(self.sealed_retention, 3600):
+                self._last_cleanup = time.monotonic()
+                try:
+                    self._remove_expired_seals()
+                except Exception as e:
+                    logger.error(f"Error removing expired recording seals: {str(e)}")
+
+            with self._lock:
+                spools = list(self._spools.items())
+
+            now = time.monotonic()
+            for key, spool in spools:
+                try:
+                    with spool.lock:
+                        if spool.file.closed:
+                            continue
+                        if spool.unsynced:
+                            self._sync(spool)
+                        idle = now - spool.last_write > self.idle_close and not spool.pending
+                    # Idle spools are closed; they reopen on the next chunk
+                    if idle:
+                        with self._lock:
+                            if self._spools.get(key) is spool:
+                                del self._spools[key]
+                                with spool.lock:
+                                    spool.file.close()
+                except Exception as e:
+                    logger.error(f"Error syncing recording spool {spool.path}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return spool counters"""
+        with self._lock:
+            open_spools = len(self._spools)
+        return {
+            'open_spools': open_spools,
+            'bytes_written': self.bytes_written,
+            'fsyncs': self.fsyncs,
+            'duplicates': self.duplicates,
+            'sealed': self.sealed,
+            'rejected': self.rejected
+        }
+
+# Global instance
+recording_spool = RecordingSpool(
+    base_dir=os.getenv('RECORDING_SPOOL_DIR', os.path.join(os.getcwd(), 'uploads', 'spool')),
+    fsync_bytes=int(os.getenv('RECORDING_SPOOL_FSYNC_BYTES', str(1024 * 1024))),
+    fsync_interval=float(os.getenv('RECORDING_SPOOL_FSYNC_INTERVAL', '1'))
+)
@@ -0,0 +1,258 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the upstream is marked unhealthy"""
+    pass
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast for cooldown_seconds. A single trial call is then let through;
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+
+        self._lock = threading.Lock()
+        self._state = 'closed'  # closed, open, half_open
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Return whether a call may be attempted now"""
+        with self._lock:
+            if self._state == 'closed':
+                return True
+
+            if self._state == 'open':
+                if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                    return False
+                self._state = 'half_open'
+                self._trial_in_flight = False
+
+            # Half open: admit exactly one trial call
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = 'closed'
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                if self._state != 'open':
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._state = 'open'
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def record_cancelled(self):
+        """A call gave up without an outcome; a half-open trial slot is freed for the next call"""
+        with self._lock:
+            if self._state == 'half_open':
+                self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given percentile, or None until enough samples exist"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+class ResilientCaller:
+    """
+    Runs upstream calls under a per-class deadline
+
+    Failed attempts are retried with full-jitter backoff only while the
+    deadline budget can still fit another attempt. For hedged call classes,
+    a duplicate attempt is started once the primary has run longer than the
+    class's recent p95 latency, and the first success wins. All attempts
+    report to a shared circuit breaker.
+    """
+
+    def __init__(
+        self,
+        deadlines: Dict[str, float],
+        max_retries: int = 2,
+        hedge_classes: Iterable[str] = (),
+        breaker: Optional[CircuitBreaker] = None,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 2.0
+    ):
+        self.deadlines = deadlines
+        self.max_retries = max_retries
+        self.hedge_classes = set(hedge_classes)
+        self.breaker = breaker or CircuitBreaker()
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.latency = {call_class: LatencyTracker() for call_class in deadlines}
+
+        self._lock = threading.Lock()
+        self._counters = {
+            'attempts': 0,
+            'retries': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'timeouts': 0,
+            'short_circuited': 0
+        }
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    async def _run_attempt(self, call_class: str, attempt: Callable[[], Awaitable[Any]], remaining: float) -> Any:
+        """Run one attempt, hedging it if the class allows and history supports it"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        hedge_delay = None
+        if call_class in self.hedge_classes:
+            hedge_delay = self.latency[call_class].percentile(95)
+
+        if hedge_delay is None or hedge_delay >= remaining:
+            self._count('attempts')
+            result = await asyncio.wait_for(attempt(), timeout=remaining)
+            self.latency[call_class].record(loop.time() - started)
+            return result
+
+        self._count('attempts')
+        primary = asyncio.ensure_future(attempt())
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done:
+                self._count('attempts')
+                self._count('hedges')
+                pending.add(asyncio.ensure_future(attempt()))
+
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count('hedge_wins')
+                        self.latency[call_class].record(loop.time() - started)
+                        return task.result()
+                    error = task.exception()
+
+                if not pending:
+                    raise error
+
+                timeout = remaining - (loop.time() - started)
+                if timeout <= 0:
+                    raise asyncio.TimeoutError()
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, call_class: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run attempt() under the class's deadline, retry and hedging policy
+
+        Args:
+            call_class: Key into deadlines
+            attempt: Factory returning a fresh awaitable for each attempt
+
+        Returns:
+            The first successful attempt's result
+
+        Raises:
+            CircuitOpenError: The circuit is open
+            asyncio.TimeoutError: The deadline passed
+            Exception: The last attempt's error once retries are exhausted
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadlines[call_class]
+        retries = 0
+
+        while True:
+            if not self.breaker.allow():
+                self._count('short_circuited')
+                raise CircuitOpenError(f"Gemini circuit open; rejecting {call_class} call")
+
+            try:
+                result = await self._run_attempt(call_class, attempt, deadline - loop.time())
+                self.breaker.record_success()
+                return result
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                if isinstance(e, asyncio.TimeoutError):
+                    self._count('timeouts')
+
+                if retries >= self.max_retries:
+                    raise
+
+                # Only retry if a typical attempt still fits in the budget
+                retries += 1
+                backoff = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** retries))
+                expected = self.latency[call_class].percentile(50) or 0.0
+                if loop.time() + backoff + expected >= deadline:
+                    raise
+
+                logger.info(f"Retrying {call_class} call in {backoff:.2f}s after error: {e!r}")
+                self._count('retries')
+                await asyncio.sleep(backoff)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return retry/hedge counters, breaker state and latency percentiles"""
+        with self._lock:
+            stats = dict(self._counters)
+
+        stats['circuit_state'] = self.breaker.state
+        stats['deadlines'] = dict(self.deadlines)
+        stats['latency'] = {}
+        for call_class, tracker in self.latency.items():
+            p50 = tracker.percentile(50)
+            p95 = tracker.percentile(95)
+            stats['latency'][call_class] = {
+                'p50_ms': round(1000 * p50, 1) if p50 is not None else None,
+                'p95_ms': round(1000 * p95, 1) if p95 is not None else None
+            }
+        return stats
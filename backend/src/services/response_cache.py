@@ -0,0 +1,168 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _OwnerCancelled(Exception):
+    """Set on a shared future when the caller computing it was cancelled"""
+
+class ResponseCache:
+    """In-process LRU + TTL cache for AI responses with request coalescing"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}  # key -> concurrent.futures.Future
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def normalize_transcript(transcript: Optional[str]) -> str:
+        """Collapse whitespace and case so trivially different transcripts share a key"""
+        if not transcript:
+            return ''
+        return ' '.join(transcript.split()).lower()
+
+    @classmethod
+    def make_key(
+        cls,
+        question: str,
+        transcript: str,
+        response_type: str,
+        ai_prompt: Optional[str]
+    ) -> str:
+        """Build a cache key from the inputs that determine a Gemini response"""
+        digest = hashlib.sha256()
+        for part in (
+            question or '',
+            cls.normalize_transcript(transcript),
+            response_type or '',
+            ai_prompt or ''
+        ):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh cached value, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries over capacity"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        Return the cached value for key, or compute it once
+
+        Concurrent callers with the same key wait on the first caller's
+        result instead of issuing their own request. None results are
+        shared with waiters but never cached. If the first caller is
+        cancelled, a waiter takes over the computation.
+
+        Args:
+            key: Cache key from make_key
+            compute: Coroutine factory producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                # A thread-safe future lets waiters share the result whichever
+                # loop or thread they run on
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+                self.misses += 1
+                owner = True
+
+        if not owner:
+            try:
+                # Shielded, so a cancelled waiter doesn't cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _OwnerCancelled:
+                return await self.get_or_compute(key, compute)
+
+        try:
+            value = await compute()
+            if value is not None:
+                self.set(key, value)
+        except BaseException as e:
+            # Waiters must never be left on an unresolved future, including
+            # when the owner is cancelled
+            with self._lock:
+                self._in_flight.pop(key, None)
+            if not future.done():
+                future.set_exception(e if isinstance(e, Exception) else _OwnerCancelled())
+            raise
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if not future.done():
+            future.set_result(value)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'entries': len(self._entries),
+                'in_flight': len(self._in_flight),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
+
+# Global instance
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('AI_RESPONSE_CACHE_SIZE', '1024')),
+    ttl_seconds=float(os.getenv('AI_RESPONSE_CACHE_TTL', '300'))
+)
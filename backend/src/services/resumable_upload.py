@@ -0,0 +1,269 @@
+import base64
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Optional
+
+CHECKSUM_ALGORITHMS = {'sha256': hashlib.sha256}
+READ_BLOCK_BYTES = 64 * 1024
+
+class UploadError(Exception):
+    """A rejected upload request, with the HTTP status to answer with"""
+
+    def __init__(self, message: str, status_code: int = 400, **details):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.details = details
+
+class ResumableUploadStore:
+    """
+    Offset-based resumable uploads written straight to disk
+
+    Each upload is a .part file plus a .json file holding its metadata in
+    base_dir, so any worker sharing the directory can continue it. The size
+    of the .part file is the upload offset. A chunk must start at that
+    offset; it is streamed to the file in small blocks while its checksum
+    is computed, and cut off again if the checksum does not match. Writes to
+    one upload, and its completion, are serialized with a file lock on the
+    .part file. Uploads untouched for
+    expire_after seconds are removed.
+    """
+
+    def __init__(self, base_dir: str, max_chunk_bytes: int = 16 * 1024 * 1024, expire_after: float = 24 * 3600):
+        self.base_dir = base_dir
+        self.max_chunk_bytes = max_chunk_bytes
+        self.expire_after = expire_after
+
+    def _paths(self, upload_id: str):
+        # Ids are generated here; anything else can't name a file
+        try:
+            upload_id = str(uuid.UUID(upload_id))
+        except (ValueError, TypeError):
+            raise UploadError('Upload not found', 404)
+        base = os.path.join(self.base_dir, upload_id)
+        return base + '.part', base + '.json'
+
+    def _read_meta(self, meta_path: str) -> Dict[str, Any]:
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadError('Upload not found', 404)
+
+    def _write_meta(self, meta_path: str, meta: Dict[str, Any]):
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def create(self, metadata: Dict[str, Any], total_size: Optional[int] = None) -> Dict[str, Any]:
+        """Start an upload; metadata is stored and returned on completion"""
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.expire_stale()
+
+        upload_id = str(uuid.uuid4())
+        part_path, meta_path = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        self._write_meta(meta_path, {
+            'upload_id': upload_id,
+            'total_size': total_size,
+            'metadata': metadata,
+            'created_at': time.time(),
+            'result': None
+        })
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """Return the upload's offset, declared size and metadata, and its result once completed"""
+        part_path, meta_path = self._paths(upload_id)
+        meta = self._read_meta(meta_path)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else meta.get('final_size', 0)
+        return {
+            'upload_id': meta['upload_id'],
+            'offset': offset,
+            'total_size': meta['total_size'],
+            'max_chunk_size': self.max_chunk_bytes,
+            'metadata': meta['metadata'],
+            'completed': meta['result'] is not None,
+            'result': meta['result']
+        }
+
+    def write_chunk(
+        self,
+        upload_id: str,
+        offset: int,
+        stream: BinaryIO,
+        length: Optional[int],
+        checksum: Optional[str]
+    ) -> int:
+        """
+        Append a chunk read from stream at offset
+
+        Args:
+            offset: Where the client believes the upload ends
+            length: Chunk size in bytes (the request's Content-Length)
+            checksum: '<algorithm> <base64 digest>' of the chunk
+
+        Returns:
+            The new offset
+        """
+        part_path, meta_path = self._paths(upload_id)
+        meta = self._read_meta(meta_path)
+        if meta['result'] is not None or 'final_path' in meta:
+            raise UploadError('Upload already completed', 409)
+
+        if length is None:
+            raise UploadError('Content-Length is required', 411)
+        if length > self.max_chunk_bytes:
+            raise UploadError('Chunk too large', 413, max_chunk_size=self.max_chunk_bytes)
+        if not checksum:
+            raise UploadError('Upload-Checksum is required')
+
+        algorithm, _, expected = checksum.partition(' ')
+        if algorithm.lower() not in CHECKSUM_ALGORITHMS:
+            raise UploadError(f'Unsupported checksum algorithm: {algorithm}')
+        try:
+            expected_digest = base64.b64decode(expected, validate=True)
+        except ValueError:
+            raise UploadError('Malformed Upload-Checksum')
+        digest = CHECKSUM_ALGORITHMS[algorithm.lower()]()
+
+        try:
+            part_file = open(part_path, 'r+b')
+        except FileNotFoundError:
+            raise UploadError('Upload already completed', 409)
+
+        with part_file as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('Another chunk is being written', 409)
+
+            try:
+                # The upload may have been completed while the lock was held
+                if 'final_path' in self._read_meta(meta_path):
+                    raise UploadError('Upload already completed', 409)
+
+                current = f.seek(0, os.SEEK_END)
+                if offset != current:
+                    raise UploadError('Offset mismatch', 409, offset=current)
+                if meta['total_size'] is not None and current + length > meta['total_size']:
+                    raise UploadError('Chunk exceeds upload length', 400, offset=current)
+
+                remaining = length
+                while remaining > 0:
+                    block = stream.read(min(READ_BLOCK_BYTES, remaining))
+                    if not block:
+                        break
+                    digest.update(block)
+                    f.write(block)
+                    remaining -= len(block)
+
+                # A rejected chunk leaves the upload where it was
+                if remaining > 0:
+                    f.truncate(current)
+                    raise UploadError('Incomplete chunk', 400, offset=current)
+                if digest.digest() != expected_digest:
+                    f.truncate(current)
+                    raise UploadError('Checksum mismatch', 460, offset=current)
+
+                f.flush()
+                new_offset = f.tell()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+        os.utime(meta_path)
+        return new_offset
+
+    def complete(self, upload_id: str, destination: str) -> Dict[str, Any]:
+        """
+        Move a fully received upload to destination
+
+        Returns:
+            The stored metadata, with 'size' and 'path'
+        """
+        part_path, meta_path = self._paths(upload_id)
+        meta = self._read_meta(meta_path)
+        if meta['result'] is not None:
+            raise UploadError('Upload already completed', 409, result=meta['result'])
+
+        # A finalize that failed after the move is retried against the moved file
+        if 'final_path' in meta:
+            return dict(meta['metadata'], size=meta['final_size'], path=meta['final_path'])
+
+        try:
+            part_file = open(part_path, 'rb')
+        except FileNotFoundError:
+            meta = self._read_meta(meta_path)
+            if 'final_path' in meta:
+                return dict(meta['metadata'], size=meta['final_size'], path=meta['final_path'])
+            raise UploadError('Upload not found', 404)
+
+        # Holding the chunk lock keeps an in-flight chunk out of the move
+        with part_file:
+            try:
+                fcntl.flock(part_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('A chunk is still being written', 409)
+
+            try:
+                meta = self._read_meta(meta_path)
+                if 'final_path' in meta:
+                    return dict(meta['metadata'], size=meta['final_size'], path=meta['final_path'])
+
+                size = os.fstat(part_file.fileno()).st_size
+                if meta['total_size'] is not None and size != meta['total_size']:
+                    raise UploadError('Upload is incomplete', 409, offset=size)
+
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.move(part_path, destination)
+                meta['final_size'] = size
+                meta['final_path'] = destination
+                self._write_meta(meta_path, meta)
+            finally:
+                fcntl.flock(part_file, fcntl.LOCK_UN)
+
+        return dict(meta['metadata'], size=size, path=destination)
+
+    def record_result(self, upload_id: str, result: Dict[str, Any]):
+        """Remember the response for a completed upload so finalize can be retried"""
+        _, meta_path = self._paths(upload_id)
+        meta = self._read_meta(meta_path)
+        meta['result'] = result
+        self._write_meta(meta_path, meta)
+
+    def discard(self, upload_id: str):
+        """Remove an upload's files"""
+        for path in self._paths(upload_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def expire_stale(self) -> int:
+        """Remove uploads not written to within expire_after; returns how many"""
+        if not os.path.isdir(self.base_dir):
+            return 0
+        cutoff = time.time() - self.expire_after
+        removed = 0
+        for name in os.listdir(self.base_dir):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.base_dir, name)
+            try:
+                if os.path.getmtime(meta_path) < cutoff:
+                    self.discard(name[:-len('.json')])
+                    removed += 1
+            except (OSError, UploadError):
+                continue
+        return removed
+
+# Global instance
+upload_store = ResumableUploadStore(
+    base_dir=os.getenv('UPLOAD_STAGING_DIR', os.path.join(os.getcwd(), 'uploads', 'incoming')),
+    max_chunk_bytes=int(os.getenv('UPLOAD_MAX_CHUNK_BYTES', str(16 * 1024 * 1024))),
+    expire_after=float(os.getenv('UPLOAD_EXPIRE_HOURS', '24')) * 3600
+)
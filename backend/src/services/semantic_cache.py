@@ -0,0 +1,210 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def embed_text(text: str, dim: int = 2048, ngram: int = 3) -> Optional[np.ndarray]:
+    """
+    Embed text as an L2-normalized hashed character n-gram vector
+
+    Counts are log-scaled so repeated filler words don't dominate. Returns
+    None for text too short to produce any n-grams.
+    """
+    normalized = ' '.join(text.lower().split())
+    if len(normalized) < ngram:
+        return None
+
+    padded = f' {normalized} '
+    buckets = np.fromiter(
+        (zlib.crc32(padded[i:i + ngram].encode('utf-8')) % dim for i in range(len(padded) - ngram + 1)),
+        dtype=np.int64
+    )
+    counts = np.bincount(buckets, minlength=dim).astype(np.float32)
+    vector = np.log1p(counts)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+def _grow(array: np.ndarray, rows: int) -> np.ndarray:
+    """Copy an array into a zero-filled one with more rows"""
+    grown = np.zeros((rows,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class _Partition:
+    """
+    Embedding matrix and responses for one question
+
+    Rows are allocated on demand, doubling up to the capacity, so questions
+    that only ever see a few transcripts stay small.
+    """
+
+    __slots__ = ('capacity', 'vectors', 'expires_at', 'last_used', 'responses', 'size')
+
+    INITIAL_ROWS = 8
+
+    def __init__(self, capacity: int, dim: int):
+        rows = min(self.INITIAL_ROWS, capacity)
+        self.capacity = capacity
+        self.vectors = np.zeros((rows, dim), dtype=np.float32)
+        self.expires_at = np.zeros(rows, dtype=np.float64)
+        self.last_used = np.zeros(rows, dtype=np.float64)
+        self.responses = [None] * rows
+        self.size = 0
+
+    def append_row(self) -> Optional[int]:
+        """Claim the next unused row, growing the arrays if needed; None when full"""
+        if self.size >= self.capacity:
+            return None
+        rows = len(self.responses)
+        if self.size == rows:
+            grown = min(rows * 2, self.capacity)
+            self.vectors = _grow(self.vectors, grown)
+            self.expires_at = _grow(self.expires_at, grown)
+            self.last_used = _grow(self.last_used, grown)
+            self.responses.extend([None] * (grown - rows))
+        row = self.size
+        self.size += 1
+        return row
+
+class SemanticCache:
+    """
+    Near-duplicate cache for AI responses, partitioned per question
+
+    Transcripts are embedded and compared by cosine similarity against all
+    cached transcripts for the same question, response type and prompt in a
+    single matrix-vector product. A match at or above the threshold returns
+    the cached response.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        dim: int = 2048,
+        partition_capacity: int = 256,
+        max_partitions: int = 200,
+        ttl_seconds: float = 1800.0,
+        min_chars: int = 20
+    ):
+        self.threshold = threshold
+        self.dim = dim
+        self.partition_capacity = partition_capacity
+        self.max_partitions = max_partitions
+        self.ttl_seconds = ttl_seconds
+        self.min_chars = min_chars
+
+        self._partitions = OrderedDict()  # partition key -> _Partition
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _partition_key(question: str, response_type: str, ai_prompt: Optional[str]) -> str:
+        digest = hashlib.sha256()
+        for part in (question or '', response_type or '', ai_prompt or ''):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def lookup(
+        self,
+        question: str,
+        transcript: str,
+        response_type: str,
+        ai_prompt: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached response for the most similar transcript above the threshold"""
+        if not transcript or len(transcript) < self.min_chars:
+            return None
+        vector = embed_text(transcript, self.dim)
+        if vector is None:
+            return None
+
+        key = self._partition_key(question, response_type, ai_prompt)
+        now = time.monotonic()
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is None or partition.size == 0:
+                self.misses += 1
+                return None
+            self._partitions.move_to_end(key)
+
+            similarities = partition.vectors[:partition.size] @ vector
+            similarities[partition.expires_at[:partition.size] <= now] = -1.0
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            partition.last_used[best] = now
+            self.hits += 1
+            return partition.responses[best]
+
+    def add(
+        self,
+        question: str,
+        transcript: str,
+        response_type: str,
+        ai_prompt: Optional[str],
+        response: Dict[str, Any]
+    ):
+        """Cache a response, evicting the least recently used entry of a full partition"""
+        if not transcript or len(transcript) < self.min_chars:
+            return
+        vector = embed_text(transcript, self.dim)
+        if vector is None:
+            return
+
+        key = self._partition_key(question, response_type, ai_prompt)
+        now = time.monotonic()
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = _Partition(self.partition_capacity, self.dim)
+                self._partitions[key] = partition
+                while len(self._partitions) > self.max_partitions:
+                    self._partitions.popitem(last=False)
+                    self.evictions += 1
+            self._partitions.move_to_end(key)
+
+            row = partition.append_row()
+            if row is None:
+                # Prefer an expired row, otherwise the least recently used one
+                expired = np.flatnonzero(partition.expires_at <= now)
+                row = int(expired[0]) if expired.size else int(np.argmin(partition.last_used))
+                self.evictions += 1
+
+            partition.vectors[row] = vector
+            partition.expires_at[row] = now + self.ttl_seconds
+            partition.last_used[row] = now
+            partition.responses[row] = response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'partitions': len(self._partitions),
+                'entries': sum(partition.size for partition in self._partitions.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+# Global instance
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92')),
+    partition_capacity=int(os.getenv('SEMANTIC_CACHE_PER_QUESTION', '256')),
+    max_partitions=int(os.getenv('SEMANTIC_CACHE_MAX_QUESTIONS', '200')),
+    ttl_seconds=float(os.getenv('SEMANTIC_CACHE_TTL', '1800'))
+)
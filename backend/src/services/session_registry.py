@@ -0,0 +1,388 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Event id counters outlive the session's record, so a client rejoining
+# after a disconnect can still be told exactly what it missed
+EVENT_COUNTER_TTL = 6 * 3600
+EVENT_COUNTER_LIMIT = 10000
+
+def event_id_seed() -> int:
+    """
+    First event id for a new counter: the current time in microseconds,
+    so a counter recreated after expiry never reuses ids a client has seen
+    """
+    return time.time_ns() // 1000
+
+class SessionRecord:
+    """State kept for an interview session with a connected client"""
+
+    __slots__ = ('client_id', 'session_db_id', 'candidate_name', 'status', 'joined_at', 'last_seen', 'video_stream')
+
+    def __init__(
+        self,
+        client_id: str,
+        session_db_id: int,
+        candidate_name: Optional[str] = None,
+        status: Optional[str] = None,
+        joined_at: Optional[float] = None,
+        last_seen: Optional[float] = None,
+        video_stream: Optional[Dict[str, Any]] = None
+    ):
+        now = time.time()
+        self.client_id = client_id
+        self.session_db_id = session_db_id
+        self.candidate_name = candidate_name
+        self.status = status
+        self.joined_at = joined_at if joined_at is not None else now
+        self.last_seen = last_seen if last_seen is not None else now
+        self.video_stream = video_stream
+
+    def copy(self) -> 'SessionRecord':
+        return SessionRecord(**self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SessionRecord':
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+class SessionRegistry(ABC):
+    """
+    Registry of interview sessions with a connected client
+
+    Records are looked up by session id or, on disconnect, by socket client
+    id. Every event from a client refreshes its heartbeat, and sessions whose
+    client has gone quiet for too long are evicted by the sweeper. The
+    registry also allocates each session's outbound event ids, so they are
+    consecutive across every worker sharing it.
+    Backends implement the abstract methods; update() and `in` are built
+    on top of them.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, session_id: str, record: SessionRecord):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_by_client(self, client_id: str) -> Optional[str]:
+        """Return the session id the given socket client joined, if any"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def touch(self, session_id: str) -> bool:
+        """Record a heartbeat; returns False if the session is not registered"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def evict_idle(self, max_idle_seconds: float) -> List[str]:
+        """Remove sessions without a heartbeat within max_idle_seconds and return their ids"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def next_event_id(self, session_id: str) -> int:
+        """Allocate the session's next outbound event id"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def last_event_id(self, session_id: str) -> Optional[int]:
+        """Return the session's most recently allocated event id, if any"""
+        raise NotImplementedError
+
+    def update(self, session_id: str, **fields) -> Optional[SessionRecord]:
+        """Set fields on a session's record; returns the new record or None if absent"""
+        record = self.get(session_id)
+        if record is None:
+            return None
+        for name, value in fields.items():
+            setattr(record, name, value)
+        record.last_seen = time.time()
+        self.set(session_id, record)
+        return record
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+class InMemorySessionRegistry(SessionRegistry):
+    """Process-local registry; only valid with a single worker"""
+
+    def __init__(self):
+        self._sessions: Dict[str, SessionRecord] = {}
+        self._by_client: Dict[str, str] = {}  # client id -> session id
+        self._event_ids = OrderedDict()  # session id -> last event id
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            return record.copy() if record is not None else None
+
+    def set(self, session_id, record):
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous is not None and self._by_client.get(previous.client_id) == session_id:
+                del self._by_client[previous.client_id]
+            self._sessions[session_id] = record.copy()
+            if record.client_id:
+                self._by_client[record.client_id] = session_id
+
+    def delete(self, session_id):
+        with self._lock:
+            record = self._sessions.pop(session_id, None)
+            if record is not None and self._by_client.get(record.client_id) == session_id:
+                del self._by_client[record.client_id]
+
+    def find_by_client(self, client_id):
+        with self._lock:
+            return self._by_client.get(client_id)
+
+    def touch(self, session_id):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None:
+                return False
+            record.last_seen = time.time()
+            return True
+
+    def evict_idle(self, max_idle_seconds):
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            idle = [session_id for session_id, record in self._sessions.items() if record.last_seen < cutoff]
+            for session_id in idle:
+                record = self._sessions.pop(session_id)
+                if self._by_client.get(record.client_id) == session_id:
+                    del self._by_client[record.client_id]
+        return idle
+
+    def next_event_id(self, session_id):
+        with self._lock:
+            event_id = self._event_ids.get(session_id, event_id_seed() - 1) + 1
+            self._event_ids[session_id] = event_id
+            self._event_ids.move_to_end(session_id)
+            while len(self._event_ids) > EVENT_COUNTER_LIMIT:
+                self._event_ids.popitem(last=False)
+            return event_id
+
+    def last_event_id(self, session_id):
+        with self._lock:
+            return self._event_ids.get(session_id)
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """
+    Registry shared by all workers on one host through a SQLite file
+
+    Each thread (green thread under eventlet) reuses its own connection,
+    since touch() runs for every audio chunk. Connections are never shared
+    across threads or inherited by forked worker processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # WAL is a property of the database file, so it is set once here
+        with closing(sqlite3.connect(self.path, timeout=5.0, isolation_level=None)) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS active_sessions ('
+                'session_id TEXT PRIMARY KEY, client_id TEXT, data TEXT NOT NULL, last_seen REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_active_sessions_client ON active_sessions (client_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_active_sessions_last_seen ON active_sessions (last_seen)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS event_counters ('
+                'session_id TEXT PRIMARY KEY, last_id INTEGER NOT NULL, updated_at REAL NOT NULL)'
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        try:
+            yield conn
+        except BaseException:
+            # Never leave a failed transaction open on the reused connection
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def get(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT data, last_seen FROM active_sessions WHERE session_id = ?', (session_id,)
+            ).fetchone()
+        if not row:
+            return None
+        record = SessionRecord.from_dict(json.loads(row[0]))
+        record.last_seen = row[1]
+        return record
+
+    def set(self, session_id, record):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO active_sessions (session_id, client_id, data, last_seen) VALUES (?, ?, ?, ?)',
+                (session_id, record.client_id, json.dumps(record.to_dict()), record.last_seen)
+            )
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM active_sessions WHERE session_id = ?', (session_id,))
+
+    def find_by_client(self, client_id):
+        with self._connect() as conn:
+            row = conn.execute('SELECT session_id FROM active_sessions WHERE client_id = ?', (client_id,)).fetchone()
+        return row[0] if row else None
+
+    def touch(self, session_id):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE active_sessions SET last_seen = ? WHERE session_id = ?', (time.time(), session_id)
+            )
+        return cursor.rowcount > 0
+
+    def evict_idle(self, max_idle_seconds):
+        cutoff = time.time() - max_idle_seconds
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            idle = [row[0] for row in conn.execute(
+                'SELECT session_id FROM active_sessions WHERE last_seen < ?', (cutoff,)
+            )]
+            conn.execute('DELETE FROM active_sessions WHERE last_seen < ?', (cutoff,))
+            conn.execute('DELETE FROM event_counters WHERE updated_at < ?', (time.time() - EVENT_COUNTER_TTL,))
+            conn.execute('COMMIT')
+        return idle
+
+    def next_event_id(self, session_id):
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT last_id FROM event_counters WHERE session_id = ?', (session_id,)).fetchone()
+            event_id = row[0] + 1 if row else event_id_seed()
+            conn.execute(
+                'INSERT OR REPLACE INTO event_counters (session_id, last_id, updated_at) VALUES (?, ?, ?)',
+                (session_id, event_id, time.time())
+            )
+            conn.execute('COMMIT')
+        return event_id
+
+    def last_event_id(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute('SELECT last_id FROM event_counters WHERE session_id = ?', (session_id,)).fetchone()
+        return row[0] if row else None
+
+class RedisSessionRegistry(SessionRegistry):
+    """
+    Registry shared across hosts through Redis
+
+    Heartbeats are kept in a sorted set so idle sessions can be found
+    without scanning every record. Keys also carry a TTL as a backstop.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int = 6 * 3600, prefix: str = 'interview:active_session:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for SESSION_REGISTRY_BACKEND=redis")
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.client_prefix = prefix + 'client:'
+        self.event_id_prefix = prefix + 'event_id:'
+        self.heartbeat_key = prefix + 'heartbeats'
+
+    def get(self, session_id):
+        raw = self.client.get(self.prefix + session_id)
+        return SessionRecord.from_dict(json.loads(raw)) if raw else None
+
+    def set(self, session_id, record):
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + session_id, json.dumps(record.to_dict()), ex=self.ttl_seconds)
+        if record.client_id:
+            pipe.set(self.client_prefix + record.client_id, session_id, ex=self.ttl_seconds)
+        pipe.zadd(self.heartbeat_key, {session_id: record.last_seen})
+        pipe.execute()
+
+    def delete(self, session_id):
+        record = self.get(session_id)
+        pipe = self.client.pipeline()
+        pipe.delete(self.prefix + session_id)
+        if record and record.client_id:
+            pipe.delete(self.client_prefix + record.client_id)
+        pipe.zrem(self.heartbeat_key, session_id)
+        pipe.execute()
+
+    def find_by_client(self, client_id):
+        raw = self.client.get(self.client_prefix + client_id)
+        if not raw:
+            return None
+        # The mapping may be stale if the session was rejoined from another client
+        session_id = raw.decode('utf-8')
+        record = self.get(session_id)
+        return session_id if record and record.client_id == client_id else None
+
+    def touch(self, session_id):
+        # XX: only refresh sessions that are still registered
+        pipe = self.client.pipeline()
+        pipe.zadd(self.heartbeat_key, {session_id: time.time()}, xx=True, ch=True)
+        pipe.expire(self.prefix + session_id, self.ttl_seconds)
+        changed, _ = pipe.execute()
+        return bool(changed)
+
+    def evict_idle(self, max_idle_seconds):
+        cutoff = time.time() - max_idle_seconds
+        idle = [raw.decode('utf-8') for raw in self.client.zrangebyscore(self.heartbeat_key, '-inf', cutoff)]
+        evicted = []
+        for session_id in idle:
+            # Only the worker that removes the heartbeat entry evicts the session
+            if self.client.zrem(self.heartbeat_key, session_id):
+                self.delete(session_id)
+                evicted.append(session_id)
+        return evicted
+
+    def next_event_id(self, session_id):
+        key = self.event_id_prefix + session_id
+        pipe = self.client.pipeline()
+        pipe.set(key, event_id_seed() - 1, nx=True)
+        pipe.incr(key)
+        pipe.expire(key, EVENT_COUNTER_TTL)
+        _, event_id, _ = pipe.execute()
+        return int(event_id)
+
+    def last_event_id(self, session_id):
+        raw = self.client.get(self.event_id_prefix + session_id)
+        return int(raw) if raw else None
+
+def create_session_registry() -> SessionRegistry:
+    """Build the registry selected by SESSION_REGISTRY_BACKEND (memory, sqlite, redis)"""
+    backend = os.getenv('SESSION_REGISTRY_BACKEND', 'memory').lower()
+    url = os.getenv('SESSION_REGISTRY_URL')
+
+    if backend == 'redis':
+        return RedisSessionRegistry(url or 'redis://localhost:6379/0')
+    if backend == 'sqlite':
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'sessions.db')
+        return SQLiteSessionRegistry(url or default_path)
+    return InMemorySessionRegistry()
+
+# Global instance
+session_registry = create_session_registry()
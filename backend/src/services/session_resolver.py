@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+class ResolvedSession:
+    """The fields of an InterviewSession that handlers need on every event"""
+
+    __slots__ = ('session_id', 'db_id', 'status', 'question_set_id', 'current_question_id')
+
+    def __init__(
+        self,
+        session_id: str,
+        db_id: int,
+        status: str,
+        question_set_id: int,
+        current_question_id: Optional[int]
+    ):
+        self.session_id = session_id
+        self.db_id = db_id
+        self.status = status
+        self.question_set_id = question_set_id
+        self.current_question_id = current_question_id
+
+    @classmethod
+    def from_model(cls, session) -> 'ResolvedSession':
+        return cls(
+            session.session_id,
+            session.id,
+            session.status,
+            session.question_set_id,
+            session.current_question_id
+        )
+
+class SessionResolver:
+    """
+    Cache from public session UUIDs to their database row essentials
+
+    Socket and HTTP handlers call resolve() instead of querying
+    InterviewSession for every event. Code that changes a session's status
+    or current question calls refresh() (or invalidate()) after committing.
+    Entries also expire after ttl seconds, which bounds how stale another
+    worker's copy can be. Unknown session ids are not cached.
+    """
+
+    def __init__(self, ttl: float = 10.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # session_id -> (ResolvedSession, expires_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, session_id: str) -> Optional[ResolvedSession]:
+        """Return the cached session, loading it from the database on a miss"""
+        from src.models.interview import InterviewSession
+
+        if not session_id:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        session = InterviewSession.query.filter_by(session_id=session_id).first()
+        if not session:
+            self.invalidate(session_id)
+            return None
+        return self.refresh(session)
+
+    def refresh(self, session) -> ResolvedSession:
+        """Cache the current state of an InterviewSession model instance"""
+        resolved = ResolvedSession.from_model(session)
+        with self._lock:
+            self._entries[resolved.session_id] = (resolved, time.monotonic() + self.ttl)
+            self._entries.move_to_end(resolved.session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return resolved
+
+    def invalidate(self, session_id: str):
+        """Forget a session so the next resolve() reads the database"""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+# Global instance
+session_resolver = SessionResolver(
+    ttl=float(os.getenv('SESSION_CACHE_TTL', '10')),
+    max_entries=int(os.getenv('SESSION_CACHE_MAX_ENTRIES', '10000'))
+)
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SpeculationCache:
+    """
+    Precomputes likely AI responses when a question becomes current
+
+    The opening hint depends almost entirely on the question text, so it is
+    generated as soon as the question starts. A follow-up question is
+    generated near the end of the question's time limit. Results are kept
+    per session and question until they are used, expire, or the session
+    moves on.
+    """
+
+    def __init__(self):
+        self.ttl_seconds = float(os.getenv('SPECULATION_TTL', '600'))
+        self.follow_up_at = float(os.getenv('SPECULATION_FOLLOW_UP_AT', '0.8'))  # fraction of time limit
+        self.max_hint_context_tokens = int(os.getenv('SPECULATION_MAX_HINT_CONTEXT_TOKENS', '40'))
+
+        self._entries: Dict[tuple, tuple] = {}  # (session_id, question_id, kind) -> (expires_at, response)
+        self._current: Dict[str, int] = {}  # session_id -> current question id
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _is_current(self, session_id: str, question_id: int) -> bool:
+        with self._lock:
+            return self._current.get(session_id) == question_id
+
+    def _store(self, session_id: str, question_id: int, kind: str, response: Dict[str, Any]):
+        with self._lock:
+            # Drop results for questions the session has already left
+            if self._current.get(session_id) != question_id:
+                return
+            self._entries[(session_id, question_id, kind)] = (time.monotonic() + self.ttl_seconds, response)
+
+    async def _speculate_hint(self, session_id: str, question_id: int, question_text: str, ai_prompt: Optional[str]):
+        from src.services.gemini_service import gemini_service
+
+        try:
+            response = await gemini_service.generate_ai_response(question_text, '', 'hint', ai_prompt)
+            if response:
+                self._store(session_id, question_id, 'hint', response)
+        except Exception as e:
+            logger.error(f"Error precomputing opening hint: {str(e)}")
+
+    async def _speculate_follow_up(self, session_id: str, session_db_id: int, question_id: int, question_text: str):
+        from src.services.gemini_service import gemini_service
+        from src.services.transcript_context import transcript_context_manager
+        from src.services.transcript_buffer import transcript_buffer
+        from src.models.interview import TranscriptSegment
+
+        if not self._is_current(session_id, question_id):
+            return
+
+        try:
+            transcript_buffer.flush()
+            segments = TranscriptSegment.query.filter_by(
+                session_id=session_db_id, question_id=question_id
+            ).order_by(TranscriptSegment.id).all()
+            transcript = transcript_context_manager.clip(' '.join(segment.text for segment in segments))
+
+            follow_up = await gemini_service.generate_follow_up_question(question_text, transcript)
+            if follow_up:
+                self._store(session_id, question_id, 'follow_up', {'type': 'follow_up', 'message': follow_up})
+        except Exception as e:
+            logger.error(f"Error precomputing follow-up question: {str(e)}")
+
+    def _submit(self, session_id: str, fn, *args):
+        from src.services.task_pool import task_pool, BACKGROUND_LANE
+
+        # Speculation is optional work; it is simply skipped when the pool is saturated
+        task_pool.submit(BACKGROUND_LANE + session_id, fn, session_id, *args, kind='speculation')
+
+    def on_question_started(
+        self,
+        session_id: str,
+        session_db_id: int,
+        question_id: int,
+        question_text: str,
+        time_limit: Optional[int],
+        ai_prompt: Optional[str] = None
+    ):
+        """
+        Start speculative work for a question that just became current
+
+        Args:
+            session_id: Public session id
+            session_db_id: InterviewSession primary key
+            question_id: The new current question
+            question_text: Question text
+            time_limit: Question time limit in seconds
+            ai_prompt: Prompt template the hint request will use
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._current[session_id] = question_id
+            for key, (expires_at, _) in list(self._entries.items()):
+                if key[0] == session_id or expires_at <= now:
+                    del self._entries[key]
+
+        self._submit(session_id, self._speculate_hint, question_id, question_text, ai_prompt)
+
+        if time_limit:
+            timer = threading.Timer(
+                time_limit * self.follow_up_at,
+                self._submit,
+                args=(session_id, self._speculate_follow_up, session_db_id, question_id, question_text)
+            )
+            timer.daemon = True
+            timer.start()
+
+    def take(self, session_id: str, question_id: int, kind: str, context: str = '') -> Optional[Dict[str, Any]]:
+        """
+        Return and consume a matching speculative response
+
+        An opening hint only matches while the candidate has said little
+        enough that the real context could not have changed the hint much.
+        """
+        from src.services.transcript_context import estimate_tokens
+
+        if kind == 'hint' and estimate_tokens(context) > self.max_hint_context_tokens:
+            return None
+
+        with self._lock:
+            entry = self._entries.pop((session_id, question_id, kind), None)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def clear_session(self, session_id: str):
+        """Drop speculative results and stop pending work for a session"""
+        with self._lock:
+            self._current.pop(session_id, None)
+            for key in [key for key in self._entries if key[0] == session_id]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'sessions': len(self._current),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# Global instance
+speculation_cache = SpeculationCache()
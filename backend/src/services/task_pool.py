@@ -0,0 +1,278 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lanes with this prefix hold background work (summaries, speculation) that
+# must not delay a session's own lane or count towards its flow control
+BACKGROUND_LANE = 'background:'
+
+# Lanes with this prefix hold interactive requests (AI hints). They are
+# handed to free workers ahead of other lanes, oldest first, so a hint never
+# waits behind queued transcription, and don't count towards flow control
+INTERACTIVE_LANE = 'interactive:'
+
+class PoolTask:
+    """A unit of work queued on a lane"""
+
+    __slots__ = ('kind', 'fn', 'args', 'merge', 'absorb', 'enqueued_at')
+
+    def __init__(
+        self,
+        kind: str,
+        fn: Callable,
+        args: tuple,
+        merge: Optional[Callable] = None,
+        absorb: Optional[Callable] = None
+    ):
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.merge = merge
+        self.absorb = absorb
+        self.enqueued_at = time.monotonic()
+
+class BackgroundTaskPool:
+    """
+    Bounded worker pool for work started from Socket.IO handlers
+
+    Workers are started with socketio.start_background_task, so they are
+    green threads under eventlet/gevent and OS threads in threading mode.
+    Green threads share one OS thread, and asyncio allows only one running
+    loop per OS thread, so coroutines all run on a single long-lived loop
+    in its own background task. A worker hands a coroutine to that loop and
+    waits for it; each coroutine runs inside its own Flask app context.
+
+    Work is queued per lane, usually one lane per session. A lane runs one
+    task at a time, in order, and lanes take turns on the workers, except
+    that interactive lanes have their own queue, served first. A lane
+    holds at most lane_depth pending tasks. When it is full, incoming audio
+    is merged into the newest pending audio task, or the oldest pending audio
+    is dropped (stale_audio_policy); other work is rejected. Pressure changes
+    are reported through on_pressure_change so clients can slow down.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        lane_depth: int = 8,
+        max_pending: int = 1000,
+        stale_audio_policy: str = 'merge'
+    ):
+        self.workers = workers
+        self.lane_depth = lane_depth
+        self.max_pending = max_pending
+        self.stale_audio_policy = stale_audio_policy
+
+        self.app = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.on_pressure_change: Optional[Callable[[str, str], None]] = None
+
+        self._lanes: Dict[str, deque] = {}
+        self._scheduled = set()  # lanes waiting for, or held by, a worker
+        self._ready = deque()
+        self._interactive_ready = deque()  # served before _ready
+        self._levels: Dict[str, str] = {}  # last pressure level reported per lane
+        self._pending = 0
+        self._running = 0
+        self._lock = threading.Lock()
+        self._has_work = threading.Condition(self._lock)
+        self._started = False
+
+        self.completed = 0
+        self.failed = 0
+        self.merged = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def init_app(self, app, socketio):
+        """Start the workers for a Flask app"""
+        self.app = app
+        if self._started:
+            return
+        self._started = True
+        self.loop = asyncio.new_event_loop()
+        socketio.start_background_task(self._run_loop)
+        for _ in range(self.workers):
+            socketio.start_background_task(self._worker)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _in_app_context(self, coro):
+        with self.app.app_context():
+            return await coro
+
+    def submit(
+        self,
+        lane: str,
+        fn: Callable,
+        *args,
+        kind: str = 'task',
+        merge: Optional[Callable[[tuple, tuple], Optional[tuple]]] = None,
+        absorb: Optional[Callable[[tuple, tuple], tuple]] = None
+    ) -> bool:
+        """
+        Queue fn(*args) on a lane
+
+        Args:
+            lane: Queue key; tasks on the same lane run one at a time, in order
+            fn: Function or coroutine function
+            kind: 'audio' marks work that may be merged or dropped when stale
+            merge: For audio, combines a pending task's args with newer args,
+                returning None if they can't be merged
+            absorb: For audio, called with (dropped args, new args) when a
+                stale task is dropped for this one; returns the new args
+
+        Returns:
+            False if the task was rejected because the pool is saturated
+        """
+        task = PoolTask(kind, fn, args, merge, absorb)
+        with self._lock:
+            queue = self._lanes.setdefault(lane, deque())
+
+            if len(queue) >= self.lane_depth:
+                outcome = self._make_room(queue, task)
+            elif self._pending >= self.max_pending:
+                outcome = None
+            else:
+                outcome = 'queued'
+
+            if outcome in ('queued', 'dropped'):
+                queue.append(task)
+                self._pending += 1
+                if lane not in self._scheduled:
+                    self._scheduled.add(lane)
+                    self._make_ready(lane)
+            elif outcome is None:
+                self.rejected += 1
+                if not queue and lane not in self._scheduled:
+                    del self._lanes[lane]
+
+        self._report_pressure(lane)
+        return outcome is not None
+
+    def _make_ready(self, lane: str):
+        """Queue a lane for the next free worker; caller holds the lock"""
+        if lane.startswith(INTERACTIVE_LANE):
+            self._interactive_ready.append(lane)
+        else:
+            self._ready.append(lane)
+        self._has_work.notify()
+
+    def _make_room(self, queue: deque, task: PoolTask) -> Optional[str]:
+        """Merge or drop stale audio for a full lane; caller holds the lock"""
+        if task.kind != 'audio':
+            return None
+
+        if self.stale_audio_policy == 'merge' and task.merge is not None:
+            newest = next((pending for pending in reversed(queue) if pending.kind == 'audio'), None)
+            if newest is not None:
+                merged = task.merge(newest.args, task.args)
+                if merged is not None:
+                    newest.args = merged
+                    self.merged += 1
+                    return 'merged'
+
+        oldest = next((pending for pending in queue if pending.kind == 'audio'), None)
+        if oldest is None:
+            return None
+        queue.remove(oldest)
+        self._pending -= 1
+        self.dropped += 1
+        if task.absorb is not None:
+            task.args = task.absorb(oldest.args, task.args)
+        return 'dropped'
+
+    def pressure(self, lane: str) -> str:
+        """Return 'ok', 'busy' or 'saturated' for a lane"""
+        with self._lock:
+            return self._pressure(lane)
+
+    def _pressure(self, lane: str) -> str:
+        queue = self._lanes.get(lane)
+        depth = len(queue) if queue else 0
+        load = max(depth / self.lane_depth, self._pending / self.max_pending)
+        if load >= 0.75:
+            return 'saturated'
+        if load >= 0.5:
+            return 'busy'
+        return 'ok'
+
+    def _report_pressure(self, lane: str):
+        if lane.startswith((BACKGROUND_LANE, INTERACTIVE_LANE)):
+            return
+        with self._lock:
+            level = self._pressure(lane)
+            if self._levels.get(lane, 'ok') == level:
+                return
+            if level == 'ok':
+                self._levels.pop(lane, None)
+            else:
+                self._levels[lane] = level
+
+        if self.on_pressure_change:
+            try:
+                with self.app.app_context():
+                    self.on_pressure_change(lane, level)
+            except Exception as e:
+                logger.error(f"Error reporting pool pressure: {str(e)}")
+
+    def _worker(self):
+        while True:
+            with self._has_work:
+                while not self._interactive_ready and not self._ready:
+                    self._has_work.wait()
+                lane = (self._interactive_ready or self._ready).popleft()
+                task = self._lanes[lane].popleft()
+                self._pending -= 1
+                self._running += 1
+
+            try:
+                with self.app.app_context():
+                    result = task.fn(*task.args)
+                if asyncio.iscoroutine(result):
+                    asyncio.run_coroutine_threadsafe(self._in_app_context(result), self.loop).result()
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Background task failed on lane {lane}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    if self._lanes[lane]:
+                        self._make_ready(lane)
+                    else:
+                        self._scheduled.discard(lane)
+                        del self._lanes[lane]
+                self._report_pressure(lane)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'pending': self._pending,
+                'lanes': len(self._lanes),
+                'saturated_lanes': sum(1 for level in self._levels.values() if level == 'saturated'),
+                'completed': self.completed,
+                'failed': self.failed,
+                'merged': self.merged,
+                'dropped': self.dropped,
+                'rejected': self.rejected
+            }
+
+# Global instance
+task_pool = BackgroundTaskPool(
+    workers=int(os.getenv('TASK_POOL_WORKERS', '8')),
+    lane_depth=int(os.getenv('TASK_LANE_DEPTH', '8')),
+    max_pending=int(os.getenv('TASK_POOL_MAX_PENDING', '1000')),
+    stale_audio_policy=os.getenv('TASK_STALE_AUDIO_POLICY', 'merge')
+)
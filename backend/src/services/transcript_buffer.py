@@ -0,0 +1,138 @@
+import atexit
+import os
+import threading
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TranscriptWriteBuffer:
+    """
+    Write-behind buffer for TranscriptSegment rows
+
+    Segments from all sessions are collected in memory and written with a
+    single bulk insert every flush interval, or sooner once enough rows are
+    pending. Readers that need every segment call flush() first. Pending
+    rows are flushed at interpreter exit, and the buffer never holds more
+    than max_pending rows: past that the caller flushes synchronously, and
+    if the database is unreachable the oldest rows are dropped.
+    """
+
+    def __init__(self, flush_interval_ms: float = 500, flush_rows: int = 200, max_pending: int = 10000):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.flush_rows = flush_rows
+        self.max_pending = max_pending
+
+        self.app = None
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()  # guards _pending
+        self._flush_lock = threading.Lock()  # keeps inserts in arrival order
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+
+    def init_app(self, app):
+        """Bind to the Flask app and start the background flusher"""
+        self.app = app
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self._flush_on_exit)
+
+    def add(
+        self,
+        session_db_id: int,
+        question_id: Optional[int],
+        text: str,
+        confidence: Optional[float],
+        start_time: float,
+        end_time: float
+    ):
+        """Queue a segment for the next bulk insert"""
+        from datetime import datetime
+
+        row = {
+            'session_id': session_db_id,
+            'question_id': question_id,
+            'text': text,
+            'confidence': confidence,
+            'start_time': start_time,
+            'end_time': end_time,
+            'created_at': datetime.utcnow()
+        }
+        with self._lock:
+            self._pending.append(row)
+            pending = len(self._pending)
+
+        if pending >= self.max_pending:
+            # Apply backpressure rather than growing without bound
+            self.flush()
+        elif pending >= self.flush_rows:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all pending rows in one transaction; returns the number written"""
+        from src.models.interview import db, TranscriptSegment
+
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+
+            try:
+                # A separate connection keeps the caller's session untouched
+                app_context = self.app.app_context() if self.app is not None else nullcontext()
+                with app_context, db.engine.begin() as conn:
+                    conn.execute(TranscriptSegment.__table__.insert(), rows)
+            except Exception as e:
+                logger.error(f"Error flushing {len(rows)} transcript segments: {str(e)}")
+                with self._lock:
+                    self._pending = rows + self._pending
+                    overflow = len(self._pending) - self.max_pending
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self.rows_dropped += overflow
+                        logger.error(f"Dropped {overflow} transcript segments; buffer limit reached")
+                return 0
+
+            self.flushes += 1
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Transcript flusher error: {str(e)}")
+
+    def _flush_on_exit(self):
+        written = self.flush()
+        if written:
+            logger.info(f"Flushed {written} transcript segments on shutdown")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return buffer counters"""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'rows_dropped': self.rows_dropped,
+            'rows_per_flush': self.rows_written / self.flushes if self.flushes else 0.0
+        }
+
+# Global instance
+transcript_buffer = TranscriptWriteBuffer(
+    flush_interval_ms=float(os.getenv('TRANSCRIPT_FLUSH_INTERVAL_MS', '500')),
+    flush_rows=int(os.getenv('TRANSCRIPT_FLUSH_ROWS', '200')),
+    max_pending=int(os.getenv('TRANSCRIPT_BUFFER_MAX_ROWS', '10000'))
+)
@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import OrderedDict, deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = 'tail') -> str:
+    """Trim text to roughly max_tokens, keeping its head or tail"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[-max_chars:] if keep == 'tail' else text[:max_chars]
+
+class QuestionContext:
+    """Rolling transcript state for one session and question"""
+
+    __slots__ = ('last_segment_id', 'recent', 'recent_tokens', 'overflow', 'summary', 'refreshing')
+
+    def __init__(self):
+        self.last_segment_id = 0
+        self.recent = deque()  # (text, tokens) of the newest segments, verbatim
+        self.recent_tokens = 0
+        self.overflow = []  # older text waiting to be folded into the summary
+        self.summary = ''
+        self.refreshing = False
+
+class TranscriptContextManager:
+    """
+    Builds bounded prompt context from TranscriptSegment rows
+
+    Only segments newer than the last one seen are loaded on each call. The
+    newest segments are kept verbatim within a token budget; older text is
+    folded into a running summary that is refreshed in the background once
+    enough new material has accumulated.
+    """
+
+    def __init__(self):
+        self.max_tokens = int(os.getenv('TRANSCRIPT_CONTEXT_TOKENS', '600'))
+        self.summary_tokens = int(os.getenv('TRANSCRIPT_SUMMARY_TOKENS', '150'))
+        self.refresh_tokens = int(os.getenv('TRANSCRIPT_SUMMARY_REFRESH_TOKENS', '200'))
+        self.max_contexts = int(os.getenv('TRANSCRIPT_CONTEXT_MAX_ENTRIES', '1000'))
+
+        self._contexts = OrderedDict()  # (session_id, question_id) -> QuestionContext
+        self._lock = threading.Lock()
+
+    def _get(self, session_id: str, question_id: int) -> QuestionContext:
+        with self._lock:
+            key = (session_id, question_id)
+            context = self._contexts.get(key)
+            if context is None:
+                context = QuestionContext()
+                self._contexts[key] = context
+                while len(self._contexts) > self.max_contexts:
+                    self._contexts.popitem(last=False)
+            else:
+                self._contexts.move_to_end(key)
+            return context
+
+    def _load_new_segments(self, context: QuestionContext, session_db_id: int, question_id: int):
+        """Append segments created since the last call, spilling old ones into overflow"""
+        from src.models.interview import TranscriptSegment
+        from src.services.transcript_buffer import transcript_buffer
+
+        transcript_buffer.flush()
+        segments = TranscriptSegment.query.filter(
+            TranscriptSegment.session_id == session_db_id,
+            TranscriptSegment.question_id == question_id,
+            TranscriptSegment.id > context.last_segment_id
+        ).order_by(TranscriptSegment.id).all()
+
+        recent_budget = self.max_tokens - self.summary_tokens
+        for segment in segments:
+            context.last_segment_id = segment.id
+            text = segment.text.strip()
+            if not text:
+                continue
+
+            tokens = estimate_tokens(text)
+            context.recent.append((text, tokens))
+            context.recent_tokens += tokens
+
+            while context.recent_tokens > recent_budget and len(context.recent) > 1:
+                old_text, old_tokens = context.recent.popleft()
+                context.recent_tokens -= old_tokens
+                context.overflow.append(old_text)
+
+    async def _refresh_summary(self, context: QuestionContext, question: str):
+        """Fold overflow text into the summary with Gemini, or by truncation if unavailable"""
+        from src.services.gemini_service import gemini_service
+
+        pending = ' '.join(context.overflow)
+        context.overflow = []
+        try:
+            summary = await gemini_service.summarize_transcript(
+                question, context.summary, pending, self.summary_tokens
+            )
+            if not summary:
+                summary = truncate_to_tokens(f"{context.summary} {pending}".strip(), self.summary_tokens)
+            context.summary = truncate_to_tokens(summary, self.summary_tokens)
+        except Exception as e:
+            logger.error(f"Error refreshing transcript summary: {str(e)}")
+            context.overflow.insert(0, pending)
+        finally:
+            context.refreshing = False
+
+    async def get_context(self, session_id: str, session_db_id: int, question_id: int, question: str) -> str:
+        """
+        Return the bounded transcript context for a question
+
+        Args:
+            session_id: Public session id
+            session_db_id: InterviewSession primary key
+            question_id: Current question id
+            question: Question text, used to focus the summary
+
+        Returns:
+            Summary of earlier material followed by the most recent speech
+        """
+        context = self._get(session_id, question_id)
+        self._load_new_segments(context, session_db_id, question_id)
+
+        overflow_tokens = sum(estimate_tokens(text) for text in context.overflow)
+        if overflow_tokens >= self.refresh_tokens and not context.refreshing:
+            # Summarize off the request path; this call uses the current summary
+            from src.services.task_pool import task_pool, BACKGROUND_LANE
+            context.refreshing = task_pool.submit(
+                BACKGROUND_LANE + session_id, self._refresh_summary, context, question, kind='summary'
+            )
+
+        recent = ' '.join(text for text, _ in context.recent)
+        if context.summary:
+            return f"[Earlier summary] {context.summary}\n[Recent] {recent}"
+        return recent
+
+    def clip(self, transcript: str) -> str:
+        """Bound a client-supplied transcript to the context budget"""
+        return truncate_to_tokens(transcript or '', self.max_tokens)
+
+    def clear_session(self, session_id: str):
+        """Drop all contexts for a session"""
+        with self._lock:
+            for key in [key for key in self._contexts if key[0] == session_id]:
+                del self._contexts[key]
+
+# Global instance
+transcript_context_manager = TranscriptContextManager()
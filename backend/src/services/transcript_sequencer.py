@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _AdmissionWindow:
+    """Client sequence numbers seen on one stream; everything <= floor has been seen"""
+
+    __slots__ = ('floor', 'above')
+
+    def __init__(self, first_seq: int, window: int):
+        # The first number to arrive need not be the lowest; earlier ones
+        # within the window are still admitted (numbering starts at 0)
+        self.floor = max(-1, first_seq - window - 1)
+        self.above = set()
+
+class _SessionOrder:
+    """Output ordering state for one session"""
+
+    __slots__ = ('next_index', 'released', 'pending', 'gap_since', 'timer_armed_at')
+
+    def __init__(self):
+        self.next_index = 0  # next output index to hand out
+        self.released = -1  # highest index already released
+        self.pending: Dict[int, Any] = {}  # finished out of order, index -> item
+        self.gap_since: Optional[float] = None
+        self.timer_armed_at: Optional[float] = None
+
+class TranscriptSequencer:
+    """
+    Deduplicates incoming audio/transcript events and orders transcript output
+
+    Clients number their audio frames and transcript segments per stream.
+    admit() rejects numbers already seen, so retried events are neither
+    transcribed nor stored twice. Accepted work reserves an output index per
+    session; results are released strictly in index order. A result that
+    never arrives stalls its successors for at most gap_timeout seconds or
+    window results, after which the gap is skipped.
+    """
+
+    def __init__(self, window: int = 64, gap_timeout: float = 3.0, max_sessions: int = 10000):
+        self.window = window
+        self.gap_timeout = gap_timeout
+        self.max_sessions = max_sessions
+
+        self._admission: Dict[Tuple[str, str, str], _AdmissionWindow] = {}
+        self._orders = OrderedDict()  # session_id -> _SessionOrder
+        self._lock = threading.Lock()
+
+        self.duplicates = 0
+        self.gaps_skipped = 0
+
+    def admit(self, session_id: str, stream_id: str, channel: str, seq: int) -> bool:
+        """Return False if this event number was already seen on the stream"""
+        key = (session_id, stream_id, channel)
+        with self._lock:
+            admission = self._admission.get(key)
+            if admission is None:
+                admission = _AdmissionWindow(seq, self.window)
+                self._admission[key] = admission
+                while len(self._admission) > self.max_sessions:
+                    del self._admission[next(iter(self._admission))]
+
+            if seq <= admission.floor or seq in admission.above:
+                self.duplicates += 1
+                return False
+
+            admission.above.add(seq)
+            while admission.floor + 1 in admission.above:
+                admission.floor += 1
+                admission.above.discard(admission.floor)
+
+            # Treat numbers that never arrived as lost once the window is full
+            if len(admission.above) > self.window:
+                admission.floor = min(admission.above)
+                admission.above.discard(admission.floor)
+                while admission.floor + 1 in admission.above:
+                    admission.floor += 1
+                    admission.above.discard(admission.floor)
+            return True
+
+    def _order(self, session_id: str) -> _SessionOrder:
+        order = self._orders.get(session_id)
+        if order is None:
+            order = _SessionOrder()
+            self._orders[session_id] = order
+            while len(self._orders) > self.max_sessions:
+                self._orders.popitem(last=False)
+        else:
+            self._orders.move_to_end(session_id)
+        return order
+
+    def reserve(self, session_id: str) -> int:
+        """Hand out the next output index for a session"""
+        with self._lock:
+            order = self._order(session_id)
+            index = order.next_index
+            order.next_index += 1
+            return index
+
+    def _release(self, order: _SessionOrder, force: bool) -> List[Tuple[int, Any]]:
+        released = []
+        while order.pending:
+            index = order.released + 1
+            if index in order.pending:
+                released.append((index, order.pending.pop(index)))
+                order.released = index
+                continue
+            if not force and len(order.pending) <= self.window:
+                break
+            # Skip the missing index
+            self.gaps_skipped += 1
+            order.released = min(order.pending) - 1
+
+        # The gap clock restarts whenever the gap moves
+        if not order.pending:
+            order.gap_since = None
+        elif order.gap_since is None or released:
+            order.gap_since = time.monotonic()
+        return released
+
+    def complete(self, session_id: str, index: int, item: Any = None) -> List[Tuple[int, Any]]:
+        """
+        Record the result for an output index
+
+        Work that will never run must still complete its index, with no
+        item, or later results wait for the gap timeout.
+
+        Returns:
+            (index, item) pairs now ready, in order; items may be None for
+            work that produced no output
+        """
+        with self._lock:
+            order = self._order(session_id)
+            if index <= order.released:
+                return []
+            order.pending[index] = item
+            return self._release(order, force=False)
+
+    def expire(self, session_id: str) -> List[Tuple[int, Any]]:
+        """Release results held back by a gap older than gap_timeout"""
+        with self._lock:
+            order = self._orders.get(session_id)
+            if order is None:
+                return []
+            order.timer_armed_at = None
+            if order.gap_since is None or time.monotonic() - order.gap_since < self.gap_timeout:
+                return []
+            return self._release(order, force=True)
+
+    def needs_gap_timer(self, session_id: str) -> bool:
+        """Return True, once per gap, if results are waiting on a missing index"""
+        now = time.monotonic()
+        with self._lock:
+            order = self._orders.get(session_id)
+            if order is None or not order.pending:
+                return False
+            # A timer whose flush never ran (e.g. rejected by a full lane) is re-armed
+            if order.timer_armed_at is not None and now - order.timer_armed_at < 2 * self.gap_timeout:
+                return False
+            order.timer_armed_at = now
+            return True
+
+    def clear_session(self, session_id: str):
+        """Forget all sequencing state for a session"""
+        with self._lock:
+            self._orders.pop(session_id, None)
+            for key in [key for key in self._admission if key[0] == session_id]:
+                del self._admission[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'sessions': len(self._orders),
+                'pending': sum(len(order.pending) for order in self._orders.values()),
+                'duplicates': self.duplicates,
+                'gaps_skipped': self.gaps_skipped
+            }
+
+# Global instance
+transcript_sequencer = TranscriptSequencer(
+    window=int(os.getenv('TRANSCRIPT_REORDER_WINDOW', '64')),
+    gap_timeout=float(os.getenv('TRANSCRIPT_REORDER_TIMEOUT', '3'))
+)
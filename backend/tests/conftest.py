@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# Tests import the app as the `src` package, like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Flask app with the models on a throwaway SQLite database"""
+    from src.models.interview import db
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
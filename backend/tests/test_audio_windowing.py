@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from src.routes import websocket
+from src.services.audio_windowing import SpeechWindowAccumulator, audio_window_manager
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 2.0
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype='<i2')
+
+
+def speech(seconds):
+    # A loud tone stands in for speech; the detector only looks at energy
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 220 * t) * 8000).astype('<i2')
+
+
+def chunks(samples):
+    size = int(CHUNK_SECONDS * SAMPLE_RATE)
+    for index in range(0, samples.size, size):
+        yield index / SAMPLE_RATE, samples[index:index + size].tobytes()
+
+
+def test_silence_produces_no_windows():
+    accumulator = SpeechWindowAccumulator(sample_rate=SAMPLE_RATE)
+    windows = []
+    for timestamp, chunk in chunks(silence(10)):
+        windows += accumulator.add_chunk(chunk, timestamp)
+    assert windows == []
+    assert accumulator.flush() == []
+
+
+def test_long_speech_is_split_at_the_window_length():
+    accumulator = SpeechWindowAccumulator(sample_rate=SAMPLE_RATE, window_seconds=6.0)
+    windows = []
+    for timestamp, chunk in chunks(speech(14)):
+        windows += accumulator.add_chunk(chunk, timestamp)
+    windows += accumulator.flush()
+    assert len(windows) == 3
+    assert windows[0][1] == pytest.approx(0.0)
+    assert windows[-1][2] == pytest.approx(14.0, abs=0.05)
+
+
+@pytest.fixture
+def audio_handler(monkeypatch):
+    """handle_audio_data with the socket and the transcription pool stubbed out"""
+    submitted = []
+    monkeypatch.setattr(websocket.session_registry, 'touch', lambda session_id: True)
+    monkeypatch.setattr(websocket, 'emit', lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        websocket, 'submit_transcription',
+        lambda session_id, audio, audio_format, start, end: submitted.append((audio_format, start, end)) or True
+    )
+    yield submitted
+    audio_window_manager.discard('session-vad')
+
+
+def send(samples, audio_format):
+    for seq, (timestamp, chunk) in enumerate(chunks(samples)):
+        websocket.handle_audio_data({
+            'session_id': 'session-vad',
+            'stream_id': audio_format,
+            'seq': seq,
+            'audio_data': chunk,
+            'timestamp': timestamp,
+            'duration': CHUNK_SECONDS,
+            'format': audio_format,
+            'sample_rate': SAMPLE_RATE
+        })
+
+
+def test_pcm_frames_are_transcribed_once_per_speech_window(audio_handler):
+    samples = np.concatenate([silence(4), speech(3), silence(5)])
+    send(samples, 'pcm')
+
+    # Six 2 s frames, one utterance: one model call, covering the speech
+    assert len(audio_handler) == 1
+    audio_format, start, end = audio_handler[0]
+    assert audio_format == 'wav'
+    assert start <= 4.0 < 7.0 <= end < 9.0
+
+
+def test_compressed_frames_are_transcribed_one_by_one(audio_handler):
+    samples = np.concatenate([silence(4), speech(3), silence(5)])
+    send(samples, 'webm')
+    assert len(audio_handler) == 6
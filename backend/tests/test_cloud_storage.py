@@ -0,0 +1,147 @@
+import fcntl
+import os
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.models.interview import db, InterviewCode, QuestionSet, InterviewSession, Recording
+from src.services.cloud_storage import CloudStorageService
+
+BUCKET = 'recordings-test'
+
+
+@pytest.fixture
+def storage(monkeypatch, tmp_path):
+    """A CloudStorageService against moto's in-memory S3"""
+    for name, value in {
+        'AWS_ACCESS_KEY_ID': 'testing',
+        'AWS_SECRET_ACCESS_KEY': 'testing',
+        'AWS_S3_BUCKET_NAME': BUCKET,
+        'AWS_REGION': 'us-east-1',
+        'S3_MULTIPART_THRESHOLD_MB': '5',
+        'S3_PART_SIZE_MB': '5',
+        'S3_UPLOAD_WORKERS': '1',
+        'S3_UPLOAD_ATTEMPTS': '1',
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv('AWS_S3_ENDPOINT_URL', raising=False)
+
+    with mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket=BUCKET)
+        service = CloudStorageService()
+        service.recordings_dir = os.path.realpath(tmp_path / 'recordings')
+        os.makedirs(service.recordings_dir)
+        yield service
+
+
+def s3_object(key):
+    return boto3.client('s3', region_name='us-east-1').get_object(Bucket=BUCKET, Key=key)['Body'].read()
+
+
+def add_recording(app, path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    with app.app_context():
+        code = InterviewCode(code='TEST0001')
+        question_set = QuestionSet(name='Set')
+        db.session.add_all([code, question_set])
+        db.session.flush()
+        session = InterviewSession(code_id=code.id, candidate_name='Candidate', question_set_id=question_set.id)
+        db.session.add(session)
+        db.session.flush()
+        recording = Recording(
+            session_id=session.id, recording_type='video', file_path=str(path),
+            file_size=len(data), storage_type='local'
+        )
+        db.session.add(recording)
+        db.session.commit()
+        return recording.id
+
+
+def test_multipart_upload_round_trips(storage, tmp_path):
+    data = os.urandom(12 * 1024 * 1024)
+    path = tmp_path / 'recordings' / 'recording.webm'
+    path.write_bytes(data)
+
+    result = storage.upload_file(str(path), 'session-1', 'video')
+
+    assert result['storage_type'] == 'cloud'
+    assert result['cloud_url'] is None
+    assert not path.exists()
+    assert s3_object(result['cloud_key']) == data
+
+
+def test_failed_upload_keeps_the_file_local(storage, tmp_path):
+    path = tmp_path / 'recordings' / 'recording.webm'
+    path.write_bytes(b'data')
+    storage.bucket_name = 'missing-bucket'
+
+    result = storage.upload_file(str(path), 'session-1', 'video')
+
+    assert result['storage_type'] == 'local'
+    assert path.exists()
+
+
+def test_background_upload_moves_recording_to_cloud(storage, app, tmp_path):
+    data = os.urandom(1024)
+    recording_id = add_recording(app, tmp_path / 'recordings' / 'recording.webm', data)
+
+    # Local recordings found at startup are queued for upload
+    storage.init_app(app)
+
+    deadline = time.monotonic() + 10
+    while storage.get_upload_stats()['completed'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    with app.app_context():
+        recording = db.session.get(Recording, recording_id)
+        assert recording.storage_type == 'cloud'
+        assert recording.cloud_url is None
+        assert s3_object(recording.file_path) == data
+    assert not (tmp_path / 'recordings' / 'recording.webm').exists()
+
+
+def test_recording_locked_by_another_process_is_skipped(storage, app, tmp_path):
+    path = tmp_path / 'recordings' / 'recording.webm'
+    recording_id = add_recording(app, path, b'data')
+
+    with open(path, 'rb') as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        with app.app_context():
+            storage._upload_recording(recording_id)
+
+    assert storage.get_upload_stats()['skipped'] == 1
+    with app.app_context():
+        assert db.session.get(Recording, recording_id).storage_type == 'local'
+    assert path.exists()
+
+
+def test_files_outside_the_recordings_directory_are_left_alone(storage, app, tmp_path):
+    # A client-reported path naming some other server file
+    path = tmp_path / 'app.db'
+    recording_id = add_recording(app, path, b'not a recording')
+
+    storage.init_app(app)
+    assert storage.get_upload_stats()['queued'] == 0
+
+    with app.app_context():
+        storage._upload_recording(recording_id)
+        assert db.session.get(Recording, recording_id).storage_type == 'local'
+    assert storage.get_upload_stats()['completed'] == 0
+    assert path.read_bytes() == b'not a recording'
+
+
+def test_symlinks_out_of_the_recordings_directory_are_left_alone(storage, app, tmp_path):
+    target = tmp_path / 'app.db'
+    link = tmp_path / 'recordings' / 'recording.webm'
+    recording_id = add_recording(app, target, b'not a recording')
+    link.symlink_to(target)
+    with app.app_context():
+        db.session.get(Recording, recording_id).file_path = str(link)
+        db.session.commit()
+
+        storage._upload_recording(recording_id)
+        assert db.session.get(Recording, recording_id).storage_type == 'local'
+    assert target.exists()
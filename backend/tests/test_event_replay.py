@@ -0,0 +1,52 @@
+from src.services.event_replay import EventReplayBuffer
+from src.services.session_registry import SQLiteSessionRegistry
+
+
+def test_ids_are_consecutive_across_workers_sharing_a_registry(tmp_path):
+    registry = SQLiteSessionRegistry(str(tmp_path / 'registry.db'))
+    first_worker = EventReplayBuffer(id_source=registry)
+    second_worker = EventReplayBuffer(id_source=registry)
+
+    ids = [
+        first_worker.record('s1', 'transcript_update', {'text': 'a'})['event_id'],
+        second_worker.record('s1', 'ai_response', {'message': 'b'})['event_id'],
+        first_worker.record('s1', 'transcript_update', {'text': 'c'})['event_id'],
+    ]
+
+    assert ids == list(range(ids[0], ids[0] + 3))
+    assert first_worker.last_event_id('s1') == ids[-1]
+    assert second_worker.last_event_id('s1') == ids[-1]
+
+
+def test_replay_is_incomplete_when_another_worker_sent_part_of_the_range(tmp_path):
+    registry = SQLiteSessionRegistry(str(tmp_path / 'registry.db'))
+    first_worker = EventReplayBuffer(id_source=registry)
+    second_worker = EventReplayBuffer(id_source=registry)
+
+    seen = first_worker.record('s1', 'transcript_update', {'text': 'a'})['event_id']
+    second_worker.record('s1', 'ai_response', {'message': 'b'})
+    first_worker.record('s1', 'transcript_update', {'text': 'c'})
+
+    missed, complete = first_worker.since('s1', seen)
+    assert [data['text'] for _, data in missed] == ['c']
+    assert not complete
+
+    missed, complete = first_worker.since('s1', seen + 1)
+    assert [data['text'] for _, data in missed] == ['c']
+    assert complete
+
+
+def test_replay_from_a_single_worker():
+    buffer = EventReplayBuffer(capacity=3)
+    ids = [buffer.record('s1', 'transcript_update', {'seq': seq})['event_id'] for seq in range(5)]
+
+    missed, complete = buffer.since('s1', ids[2])
+    assert [data['seq'] for _, data in missed] == [3, 4]
+    assert complete
+
+    missed, complete = buffer.since('s1', ids[0])
+    assert [data['seq'] for _, data in missed] == [2, 3, 4]
+    assert not complete
+
+    assert buffer.since('s1', ids[-1]) == ([], True)
+    assert buffer.since('unknown', 1) == ([], False)
@@ -0,0 +1,17 @@
+from src.services.fake_gemini import FakeGenerativeModel
+
+
+def test_repeated_prompts_are_deterministic():
+    first = FakeGenerativeModel(median_latency_ms=0, latency_sigma=0)
+    second = FakeGenerativeModel(median_latency_ms=0, latency_sigma=0)
+    prompts = ['Response type requested: hint'] * 3 + ['Generate a follow-up question']
+
+    assert [first.generate_content(p).text for p in prompts] == [second.generate_content(p).text for p in prompts]
+
+
+def test_call_counts_are_bounded():
+    model = FakeGenerativeModel(median_latency_ms=0, latency_sigma=0, max_tracked_prompts=5)
+    for index in range(50):
+        model.generate_content(f'Response type requested: hint {index}')
+
+    assert len(model._calls) == 5
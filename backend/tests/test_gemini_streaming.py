@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services import gemini_service as gemini_module
+from src.services.fake_gemini import FakeResponse
+from src.services.response_cache import ResponseCache
+from src.services.semantic_cache import SemanticCache
+
+
+class SlowStreamingModel:
+    """Streams a fixed answer; the first call is slow to open its stream"""
+
+    def __init__(self, open_delays=(0.05,)):
+        self.open_delays = list(open_delays)
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self._lock:
+            delay = self.open_delays[min(self.calls, len(self.open_delays) - 1)]
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self.running -= 1
+        return iter([FakeResponse('Try '), FakeResponse('segmenting.')])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('GEMINI_BACKEND', 'fake')
+    monkeypatch.setattr(gemini_module, 'response_cache', ResponseCache())
+    monkeypatch.setattr(gemini_module, 'semantic_cache', SemanticCache())
+    return gemini_module.GeminiService()
+
+
+async def collect(service, transcript='I would start from the population'):
+    return [chunk async for chunk in service.stream_ai_response('Estimate it', transcript, 'hint', 'Prompt {transcript}')]
+
+
+def test_concurrent_identical_streams_share_one_call(service):
+    model = SlowStreamingModel()
+    service.text_model = model
+
+    async def main():
+        return await asyncio.gather(collect(service), collect(service))
+
+    owner, waiter = asyncio.run(main())
+
+    assert owner == ['Try ', 'segmenting.']
+    assert waiter == ['Try segmenting.']
+    assert model.calls == 1
+    stats = service.get_cache_stats()
+    assert stats['misses'] == 1
+    assert stats['coalesced'] == 1
+
+    # A later identical request is a cache hit
+    assert asyncio.run(collect(service)) == ['Try segmenting.']
+    assert model.calls == 1
+    assert service.get_cache_stats()['hits'] == 1
+
+
+def test_hedged_stream_attempts_each_take_a_slot(service):
+    model = SlowStreamingModel(open_delays=(0.3, 0.01))
+    service.text_model = model
+    service.scheduler.max_in_flight = 1
+    service.resilience.hedge_classes = {'hint'}
+    for _ in range(20):
+        service.resilience.latency['hint'].record(0.05)
+
+    assert asyncio.run(collect(service)) == ['Try ', 'segmenting.']
+
+    # The hedge waited for the primary's slot instead of running beside it
+    assert model.max_running == 1
+    assert service.get_scheduler_stats()['in_flight'] == 0
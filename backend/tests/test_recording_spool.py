@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from src.services.recording_spool import RecordingSpool, SpoolSealedError
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return RecordingSpool(str(tmp_path / 'spool'), fsync_bytes=1)
+
+
+def read(result):
+    with open(result['path'], 'rb') as f:
+        return f.read()
+
+
+def test_chunks_are_written_in_sequence_order(spool, tmp_path):
+    for seq, chunk in [(2, b'c'), (0, b'a'), (1, b'b'), (3, b'd')]:
+        assert spool.append('session-1', 7, 'stream', seq, chunk, elapsed=seq + 1.0, mime_type='video/webm')
+
+    sealed = spool.seal('session-1', 7, str(tmp_path / 'out'))
+
+    assert len(sealed) == 1
+    assert read(sealed[0]) == b'abcd'
+    assert sealed[0]['question_id'] == 7
+    assert sealed[0]['duration'] == 4.0
+    assert sealed[0]['mime_type'] == 'video/webm'
+
+
+def test_repeated_chunks_are_ignored(spool, tmp_path):
+    assert spool.append('session-1', 7, 'stream', 0, b'a')
+    assert not spool.append('session-1', 7, 'stream', 0, b'a')
+    assert spool.append('session-1', 7, 'stream', 2, b'c')
+    assert not spool.append('session-1', 7, 'stream', 2, b'c')
+    assert spool.append('session-1', 7, 'stream', 1, b'b')
+
+    assert read(spool.seal('session-1', 7, str(tmp_path / 'out'))[0]) == b'abc'
+    assert spool.get_stats()['duplicates'] == 2
+
+
+def test_a_missing_chunk_holds_the_rest_back_for_at_most_the_window(tmp_path):
+    spool = RecordingSpool(str(tmp_path / 'spool'), window=2)
+    spool.append('session-1', 7, 'stream', 0, b'a')
+    for seq in (2, 3, 4):
+        spool.append('session-1', 7, 'stream', seq, bytes([ord('a') + seq]))
+
+    assert read(spool.seal('session-1', 7, str(tmp_path / 'out'))[0]) == b'acde'
+
+
+def test_seal_only_takes_the_questions_spools(spool, tmp_path):
+    spool.append('session-1', 7, 'stream', 0, b'q7')
+    spool.append('session-1', 8, 'stream', 0, b'q8')
+
+    assert [read(result) for result in spool.seal('session-1', 7, str(tmp_path / 'out'))] == [b'q7']
+    assert [read(result) for result in spool.seal('session-1', 8, str(tmp_path / 'out'))] == [b'q8']
+
+
+def test_chunks_after_seal_are_rejected(spool, tmp_path):
+    spool.append('session-1', 7, 'stream', 0, b'a')
+    spool.seal('session-1', 7, str(tmp_path / 'out'))
+
+    with pytest.raises(SpoolSealedError):
+        spool.append('session-1', 7, 'stream', 1, b'b')
+    # No headerless spool is started for the question
+    assert not any(name.endswith('.spool') for name in os.listdir(tmp_path / 'spool' / 'session-1'))
+    assert spool.seal('session-1', 7, str(tmp_path / 'out')) == []
+
+    # Other questions are unaffected
+    assert spool.append('session-1', 8, 'stream', 0, b'a')
+
+
+def test_chunks_after_session_seal_are_rejected(spool, tmp_path):
+    spool.append('session-1', 7, 'stream', 0, b'a')
+    assert len(spool.seal_session('session-1', str(tmp_path / 'out'))) == 1
+
+    with pytest.raises(SpoolSealedError):
+        spool.append('session-1', 8, 'stream', 0, b'a')
+    assert spool.get_stats()['rejected'] == 1
+
+
+def test_seal_is_seen_by_another_process_sharing_the_directory(spool, tmp_path):
+    other = RecordingSpool(spool.base_dir)
+    spool.append('session-1', 7, 'stream', 0, b'a')
+    spool.seal('session-1', 7, str(tmp_path / 'out'))
+
+    with pytest.raises(SpoolSealedError):
+        other.append('session-1', 7, 'stream', 1, b'b')
+
+
+def test_spool_resumes_after_restart(spool, tmp_path):
+    spool.append('session-1', 7, 'stream', 0, b'a')
+    spool.append('session-1', 7, 'stream', 1, b'b')
+
+    restarted = RecordingSpool(spool.base_dir)
+    assert not restarted.append('session-1', 7, 'stream', 1, b'b')
+    assert restarted.append('session-1', 7, 'stream', 2, b'c')
+    assert read(restarted.seal('session-1', 7, str(tmp_path / 'out'))[0]) == b'abc'
+
+
+def test_expired_seal_markers_are_removed(spool, tmp_path):
+    spool.sealed_retention = 0
+    spool.append('session-1', 7, 'stream', 0, b'a')
+    spool.seal_session('session-1', str(tmp_path / 'out'))
+
+    spool._remove_expired_seals()
+    assert not os.path.exists(tmp_path / 'spool' / 'session-1')
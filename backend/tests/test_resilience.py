@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from src.services.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+def make_caller(breaker):
+    return ResilientCaller(deadlines={'hint': 1.0}, max_retries=0, breaker=breaker)
+
+
+async def fail():
+    raise ValueError('upstream error')
+
+
+async def succeed():
+    return 'ok'
+
+
+def test_circuit_opens_and_recovers_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+    caller = make_caller(breaker)
+
+    with pytest.raises(ValueError):
+        asyncio.run(caller.call('hint', fail))
+    assert breaker.state == 'open'
+
+    assert asyncio.run(caller.call('hint', succeed)) == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_open_circuit_rejects_calls():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=60)
+    caller = make_caller(breaker)
+
+    with pytest.raises(ValueError):
+        asyncio.run(caller.call('hint', fail))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(caller.call('hint', succeed))
+
+
+def test_cancelled_trial_call_frees_the_trial():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+    caller = make_caller(breaker)
+    with pytest.raises(ValueError):
+        asyncio.run(caller.call('hint', fail))
+
+    async def cancel_trial():
+        trial = asyncio.ensure_future(caller.call('hint', lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancel_trial())
+    assert breaker.state == 'half_open'
+
+    # The next call becomes the trial instead of being rejected for good
+    assert asyncio.run(caller.call('hint', succeed)) == 'ok'
+    assert breaker.state == 'closed'
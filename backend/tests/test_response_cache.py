@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from src.services.response_cache import ResponseCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'message': 'hint'}
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_compute('key', compute) for _ in range(5)])
+
+    results = run(main())
+    assert results == [{'message': 'hint'}] * 5
+    assert len(calls) == 1
+    stats = cache.get_stats()
+    assert stats['misses'] == 1
+    assert stats['coalesced'] == 4
+    assert stats['in_flight'] == 0
+
+    # Later callers are served from the cache
+    assert run(cache.get_or_compute('key', compute)) == {'message': 'hint'}
+    assert len(calls) == 1
+
+
+def test_none_results_are_shared_but_not_cached():
+    cache = ResponseCache()
+
+    async def compute():
+        return None
+
+    assert run(cache.get_or_compute('key', compute)) is None
+    assert cache.get('key') is None
+
+
+def test_owner_failure_reaches_waiters():
+    cache = ResponseCache()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        raise ValueError('model error')
+
+    async def main():
+        return await asyncio.gather(
+            *[cache.get_or_compute('key', compute) for _ in range(3)],
+            return_exceptions=True
+        )
+
+    results = run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.get_stats()['in_flight'] == 0
+
+
+def test_cancelled_owner_hands_computation_to_a_waiter():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 'value'
+
+    async def main():
+        owner = asyncio.ensure_future(cache.get_or_compute('key', compute))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.get_or_compute('key', compute))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    assert run(main()) == 'value'
+    assert len(calls) == 2
+    assert cache.get_stats()['in_flight'] == 0
+    assert cache.get('key') == 'value'
+
+
+def test_cancelled_waiter_does_not_affect_the_others():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 'value'
+
+    async def main():
+        owner = asyncio.ensure_future(cache.get_or_compute('key', compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(cache.get_or_compute('key', compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiters[0]
+        return await asyncio.wait_for(asyncio.gather(owner, waiters[1]), timeout=1)
+
+    assert run(main()) == ['value', 'value']
+    assert len(calls) == 1
+    assert cache.get_stats()['in_flight'] == 0
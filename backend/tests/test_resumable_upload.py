@@ -0,0 +1,127 @@
+import base64
+import fcntl
+import hashlib
+import io
+import os
+
+import pytest
+
+from src.services.resumable_upload import ResumableUploadStore, UploadError
+
+
+def checksum(data):
+    return 'sha256 ' + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+def write(store, upload_id, offset, data, digest=None):
+    return store.write_chunk(upload_id, offset, io.BytesIO(data), len(data), digest or checksum(data))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumableUploadStore(str(tmp_path / 'incoming'), max_chunk_bytes=1024)
+
+
+def test_chunks_append_at_the_current_offset(store):
+    upload_id = store.create({'question_id': 1}, total_size=10)['upload_id']
+
+    assert write(store, upload_id, 0, b'hello') == 5
+    assert write(store, upload_id, 5, b'world') == 10
+    assert store.status(upload_id)['offset'] == 10
+
+
+def test_offset_mismatch_reports_the_server_offset(store):
+    upload_id = store.create({})['upload_id']
+    write(store, upload_id, 0, b'hello')
+
+    with pytest.raises(UploadError) as error:
+        write(store, upload_id, 3, b'lo again')
+
+    assert error.value.status_code == 409
+    assert error.value.details['offset'] == 5
+    assert store.status(upload_id)['offset'] == 5
+
+
+def test_checksum_mismatch_rolls_the_chunk_back(store):
+    upload_id = store.create({})['upload_id']
+    write(store, upload_id, 0, b'hello')
+
+    with pytest.raises(UploadError) as error:
+        write(store, upload_id, 5, b'world', digest=checksum(b'other'))
+
+    assert error.value.status_code == 460
+    assert error.value.details['offset'] == 5
+    assert store.status(upload_id)['offset'] == 5
+    assert write(store, upload_id, 5, b'world') == 10
+
+
+def test_short_chunk_rolls_back(store):
+    upload_id = store.create({})['upload_id']
+
+    with pytest.raises(UploadError) as error:
+        store.write_chunk(upload_id, 0, io.BytesIO(b'abc'), 5, checksum(b'abcde'))
+
+    assert error.value.status_code == 400
+    assert store.status(upload_id)['offset'] == 0
+
+
+def test_incomplete_upload_cannot_be_completed(store, tmp_path):
+    upload_id = store.create({}, total_size=10)['upload_id']
+    write(store, upload_id, 0, b'hello')
+
+    with pytest.raises(UploadError) as error:
+        store.complete(upload_id, str(tmp_path / 'recordings' / 'out.webm'))
+
+    assert error.value.status_code == 409
+    assert error.value.details['offset'] == 5
+
+
+def test_complete_can_be_retried_after_the_move(store, tmp_path):
+    upload_id = store.create({'question_id': 1}, total_size=5)['upload_id']
+    write(store, upload_id, 0, b'hello')
+    destination = str(tmp_path / 'recordings' / 'out.webm')
+
+    first = store.complete(upload_id, destination)
+    retried = store.complete(upload_id, destination)
+
+    assert first == retried == {'question_id': 1, 'size': 5, 'path': destination}
+    with open(destination, 'rb') as f:
+        assert f.read() == b'hello'
+    assert store.status(upload_id)['offset'] == 5
+
+    with pytest.raises(UploadError) as error:
+        write(store, upload_id, 5, b'more')
+    assert error.value.status_code == 409
+
+    store.record_result(upload_id, {'recording_id': 7})
+    with pytest.raises(UploadError) as error:
+        store.complete(upload_id, destination)
+    assert error.value.details['result'] == {'recording_id': 7}
+
+
+def test_unknown_upload_ids_are_not_found(store):
+    with pytest.raises(UploadError) as error:
+        store.status('../../etc/passwd')
+    assert error.value.status_code == 404
+    assert not os.path.exists(store.base_dir)
+
+
+def test_complete_waits_for_an_in_flight_chunk(store, tmp_path):
+    upload_id = store.create({})['upload_id']
+    write(store, upload_id, 0, b'hello')
+    part_path, _ = store._paths(upload_id)
+    destination = str(tmp_path / 'recordings' / 'out.webm')
+
+    # Another worker is still writing a chunk
+    with open(part_path, 'r+b') as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        with pytest.raises(UploadError) as error:
+            store.complete(upload_id, destination)
+        assert error.value.status_code == 409
+        assert os.path.exists(part_path)
+
+    assert store.complete(upload_id, destination)['size'] == 5
+
+    with pytest.raises(UploadError) as error:
+        write(store, upload_id, 5, b'late')
+    assert error.value.status_code == 409
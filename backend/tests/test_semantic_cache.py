@@ -0,0 +1,38 @@
+from src.services.semantic_cache import SemanticCache
+
+QUESTION = 'Describe a project you are proud of'
+
+
+def transcript(index):
+    return f'candidate answer number {index} about topic {index * 7919}'
+
+
+def test_partitions_grow_on_demand():
+    cache = SemanticCache(partition_capacity=64, dim=256)
+    cache.add(QUESTION, transcript(0), 'hint', None, {'message': 0})
+
+    partition = next(iter(cache._partitions.values()))
+    assert partition.vectors.shape[0] < 64
+
+    for index in range(1, 20):
+        cache.add(QUESTION, transcript(index), 'hint', None, {'message': index})
+    assert partition.size == 20
+    assert 20 <= partition.vectors.shape[0] <= 64
+
+    for index in range(20):
+        assert cache.lookup(QUESTION, transcript(index), 'hint', None) == {'message': index}
+
+
+def test_full_partition_evicts_least_recently_used():
+    cache = SemanticCache(partition_capacity=4, dim=256)
+    for index in range(4):
+        cache.add(QUESTION, transcript(index), 'hint', None, {'message': index})
+    cache.lookup(QUESTION, transcript(0), 'hint', None)
+
+    cache.add(QUESTION, transcript(4), 'hint', None, {'message': 4})
+
+    partition = next(iter(cache._partitions.values()))
+    assert partition.vectors.shape[0] == 4
+    assert cache.lookup(QUESTION, transcript(0), 'hint', None) == {'message': 0}
+    assert cache.lookup(QUESTION, transcript(4), 'hint', None) == {'message': 4}
+    assert cache.get_stats()['evictions'] == 1
@@ -0,0 +1,69 @@
+import pytest
+
+from src.services.session_registry import (
+    InMemorySessionRegistry, SessionRecord, SessionRegistry, SQLiteSessionRegistry
+)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def registry(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteSessionRegistry(str(tmp_path / 'registry.db'))
+    return InMemorySessionRegistry()
+
+
+def test_incomplete_backends_cannot_be_created():
+    class GetOnlyRegistry(SessionRegistry):
+        def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyRegistry()
+
+
+def test_records_are_found_by_session_and_client(registry):
+    registry.set('s1', SessionRecord(client_id='c1', session_db_id=1, candidate_name='Ada'))
+
+    assert 's1' in registry
+    assert registry.get('s1').candidate_name == 'Ada'
+    assert registry.find_by_client('c1') == 's1'
+    assert registry.update('s1', status='active').status == 'active'
+
+    registry.delete('s1')
+    assert 's1' not in registry
+    assert registry.find_by_client('c1') is None
+    assert registry.update('s1', status='active') is None
+
+
+def test_idle_sessions_are_evicted(registry):
+    registry.set('s1', SessionRecord(client_id='c1', session_db_id=1, last_seen=0))
+    registry.set('s2', SessionRecord(client_id='c2', session_db_id=2))
+
+    assert registry.evict_idle(60) == ['s1']
+    assert registry.touch('s2')
+    assert not registry.touch('s1')
+
+
+def test_event_ids_are_consecutive_per_session(registry):
+    assert registry.last_event_id('s1') is None
+
+    first = registry.next_event_id('s1')
+    assert registry.next_event_id('s1') == first + 1
+    assert registry.last_event_id('s1') == first + 1
+
+
+def test_sqlite_reuses_a_connection_per_thread(tmp_path):
+    registry = SQLiteSessionRegistry(str(tmp_path / 'registry.db'))
+
+    with registry._connect() as first, registry._connect() as second:
+        assert first is second
+        assert first.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    with pytest.raises(RuntimeError):
+        with registry._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            raise RuntimeError('failed mid-transaction')
+
+    # The failed transaction was rolled back, so the connection is usable
+    registry.set('s1', SessionRecord(client_id='c1', session_db_id=1))
+    assert registry.touch('s1')
@@ -0,0 +1,57 @@
+import pytest
+
+from src.routes import websocket
+from src.services.speculation import speculation_cache
+
+
+@pytest.fixture
+def speculating(monkeypatch):
+    """A session with a current question and its speculative work stubbed out"""
+    monkeypatch.setattr(speculation_cache, '_submit', lambda *args: None)
+    speculation_cache.on_question_started('session-spec', 1, 7, 'Tell me about yourself', None)
+    assert speculation_cache.get_stats()['sessions'] == 1
+    yield 'session-spec'
+    speculation_cache.clear_session('session-spec')
+
+
+class _StopSweep(Exception):
+    pass
+
+
+class _OneSweepSocketIO:
+    def __init__(self):
+        self.sleeps = 0
+
+    def sleep(self, seconds):
+        self.sleeps += 1
+        if self.sleeps > 1:
+            raise _StopSweep()
+
+
+def test_idle_sweep_clears_speculation(monkeypatch, speculating):
+    monkeypatch.setattr(websocket.session_registry, 'evict_idle', lambda max_idle_seconds: [speculating])
+    monkeypatch.setattr(websocket, 'release_session_state', lambda session_id: None)
+
+    with pytest.raises(_StopSweep):
+        websocket.sweep_idle_sessions(_OneSweepSocketIO())
+
+    assert speculation_cache.get_stats()['sessions'] == 0
+
+
+def test_completing_a_session_clears_speculation(app, monkeypatch, speculating):
+    from src.models.interview import db, InterviewSession
+    from src.routes import interview
+
+    monkeypatch.setattr(websocket, 'emit', lambda *args, **kwargs: None)
+    monkeypatch.setattr(websocket, 'publish_session_delta', lambda *args, **kwargs: None)
+    monkeypatch.setattr(interview, 'seal_recordings', lambda *args, **kwargs: None)
+
+    with app.app_context():
+        db.session.add(InterviewSession(
+            session_id=speculating, code_id=1, candidate_name='Candidate', question_set_id=1, status='active'
+        ))
+        db.session.commit()
+
+        websocket.handle_session_status_update({'session_id': speculating, 'status': 'completed'})
+
+    assert speculation_cache.get_stats()['sessions'] == 0
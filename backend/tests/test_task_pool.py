@@ -0,0 +1,150 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+from flask import Flask, current_app
+from flask_socketio import SocketIO
+
+from src.services.task_pool import BackgroundTaskPool, INTERACTIVE_LANE
+
+
+def make_pool(**kwargs):
+    app = Flask(__name__)
+    pool = BackgroundTaskPool(**kwargs)
+    pool.init_app(app, SocketIO(app, async_mode='threading'))
+    return pool
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_coroutines_on_two_lanes_run_concurrently():
+    pool = make_pool(workers=4)
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+    finished = []
+
+    async def job(name):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        await asyncio.sleep(0.2)
+        # Each coroutine runs inside an app context
+        assert current_app
+        with lock:
+            state['running'] -= 1
+        finished.append(name)
+
+    assert pool.submit('session-a', job, 'a')
+    assert pool.submit('session-b', job, 'b')
+
+    assert wait_for(lambda: len(finished) == 2)
+    assert sorted(finished) == ['a', 'b']
+    assert state['peak'] == 2
+    assert pool.get_stats()['failed'] == 0
+
+
+EVENTLET_SCRIPT = textwrap.dedent("""
+    import eventlet
+    eventlet.monkey_patch()
+    import asyncio
+    from flask import Flask
+    from flask_socketio import SocketIO
+    from src.services.task_pool import BackgroundTaskPool, INTERACTIVE_LANE
+
+    app = Flask(__name__)
+    pool = BackgroundTaskPool(workers=4)
+    pool.init_app(app, SocketIO(app, async_mode='eventlet'))
+    finished = []
+
+    async def job(name):
+        await asyncio.sleep(0.2)
+        finished.append(name)
+
+    pool.submit('session-a', job, 'a')
+    pool.submit('session-b', job, 'b')
+    for _ in range(300):
+        if len(finished) == 2:
+            break
+        eventlet.sleep(0.01)
+    print(sorted(finished), pool.get_stats()['failed'])
+""")
+
+
+def test_coroutines_on_two_lanes_complete_under_eventlet():
+    # Green workers share one OS thread, where only one asyncio loop may run
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-c', EVENTLET_SCRIPT],
+        cwd=backend_dir, capture_output=True, text=True, timeout=60
+    )
+    assert result.stdout.strip().splitlines()[-1] == "['a', 'b'] 0", result.stderr
+
+
+def test_lane_runs_tasks_in_order():
+    pool = make_pool(workers=4)
+    finished = []
+
+    async def job(index):
+        await asyncio.sleep(0.01 * (3 - index))
+        finished.append(index)
+
+    for index in range(3):
+        pool.submit('session-a', job, index)
+
+    assert wait_for(lambda: len(finished) == 3)
+    assert finished == [0, 1, 2]
+
+
+def test_interactive_lane_runs_ahead_of_queued_work():
+    pool = make_pool(workers=1)
+    release = threading.Event()
+    finished = []
+
+    pool.submit('session-a', release.wait)
+    assert wait_for(lambda: pool.get_stats()['running'] == 1)
+    for index in range(3):
+        pool.submit('session-a', finished.append, f'audio-{index}', kind='audio')
+        pool.submit(f'session-{index}', finished.append, f'other-{index}')
+    pool.submit(INTERACTIVE_LANE + 'session-a', finished.append, 'hint', kind='ai_response')
+    release.set()
+
+    assert wait_for(lambda: len(finished) == 7)
+    assert finished[0] == 'hint'
+
+
+def test_interactive_lanes_are_served_oldest_first():
+    pool = make_pool(workers=1)
+    release = threading.Event()
+    finished = []
+
+    pool.submit('session-a', release.wait)
+    assert wait_for(lambda: pool.get_stats()['running'] == 1)
+    pool.submit('session-a', finished.append, 'audio', kind='audio')
+    for index in range(3):
+        pool.submit(INTERACTIVE_LANE + f'session-{index}', finished.append, f'hint-{index}', kind='ai_response')
+    release.set()
+
+    assert wait_for(lambda: len(finished) == 4)
+    assert finished == ['hint-0', 'hint-1', 'hint-2', 'audio']
+
+
+def test_full_lane_rejects_non_audio_work():
+    pool = make_pool(workers=1, lane_depth=1)
+    release = threading.Event()
+
+    pool.submit('session-a', release.wait)
+    assert wait_for(lambda: pool.get_stats()['running'] == 1)
+    assert pool.submit('session-a', lambda: None)
+    assert not pool.submit('session-a', lambda: None)
+    release.set()
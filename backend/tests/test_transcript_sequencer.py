@@ -0,0 +1,43 @@
+from src.routes import websocket
+from src.services.transcript_sequencer import TranscriptSequencer
+
+
+def test_duplicates_are_rejected():
+    sequencer = TranscriptSequencer(window=8)
+    assert sequencer.admit('s1', 'mic', 'audio', 0)
+    assert sequencer.admit('s1', 'mic', 'audio', 1)
+    assert not sequencer.admit('s1', 'mic', 'audio', 1)
+    assert not sequencer.admit('s1', 'mic', 'audio', 0)
+    assert sequencer.get_stats()['duplicates'] == 2
+
+
+def test_earlier_numbers_arriving_late_are_admitted():
+    sequencer = TranscriptSequencer(window=8)
+    assert sequencer.admit('s1', 'mic', 'audio', 5)
+    assert sequencer.admit('s1', 'mic', 'audio', 3)
+    assert sequencer.admit('s1', 'mic', 'audio', 4)
+    assert not sequencer.admit('s1', 'mic', 'audio', 3)
+
+    # Numbers further back than the window are treated as already seen
+    sequencer.admit('s2', 'mic', 'audio', 100)
+    assert not sequencer.admit('s2', 'mic', 'audio', 90)
+
+
+def test_results_are_released_in_order():
+    sequencer = TranscriptSequencer(window=8)
+    first, second = sequencer.reserve('s1'), sequencer.reserve('s1')
+
+    assert sequencer.complete('s1', second, 'b') == []
+    assert sequencer.complete('s1', first, 'a') == [(first, 'a'), (second, 'b')]
+
+
+def test_rejected_transcription_releases_its_index(monkeypatch):
+    sequencer = TranscriptSequencer(window=8)
+    monkeypatch.setattr(websocket, 'transcript_sequencer', sequencer)
+    monkeypatch.setattr(websocket.task_pool, 'submit', lambda *args, **kwargs: False)
+
+    assert not websocket.submit_transcription('s1', b'audio', 'wav', 0.0, 1.0)
+
+    # The next window is not held back behind the rejected one
+    index = sequencer.reserve('s1')
+    assert sequencer.complete('s1', index, 'text') == [(index, 'text')]
@@ -1,5 +1,49 @@
 import { useState, useRef, useEffect, useCallback } from 'react';
 
+// AudioWorklet that downsamples the microphone to 16-bit mono PCM at
+// targetRate, averaging the source samples behind each output sample, and
+// posts one ArrayBuffer per frameSamples samples
+const PCM_CAPTURE_WORKLET = `
+class PcmCaptureProcessor extends AudioWorkletProcessor {
+  constructor(options) {
+    super();
+    const { targetRate, frameSamples } = options.processorOptions;
+    this.ratio = sampleRate / targetRate;
+    this.position = 0;
+    this.sum = 0;
+    this.count = 0;
+    this.frame = new Int16Array(frameSamples);
+    this.length = 0;
+  }
+
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (channel) {
+      for (let i = 0; i < channel.length; i += 1) {
+        this.sum += channel[i];
+        this.count += 1;
+        this.position += 1;
+        if (this.position >= this.ratio) {
+          this.position -= this.ratio;
+          const sample = Math.max(-1, Math.min(1, this.sum / this.count));
+          this.frame[this.length] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+          this.length += 1;
+          this.sum = 0;
+          this.count = 0;
+          if (this.length === this.frame.length) {
+            const buffer = this.frame.slice().buffer;
+            this.port.postMessage(buffer, [buffer]);
+            this.length = 0;
+          }
+        }
+      }
+    }
+    return true;
+  }
+}
+registerProcessor('pcm-capture', PcmCaptureProcessor);
+`;
+
 export const useWebRTC = () => {
   const [isVideoEnabled, setIsVideoEnabled] = useState(false);
   const [isAudioEnabled, setIsAudioEnabled] = useState(false);
@@ -15,6 +59,8 @@ export const useWebRTC = () => {
   const mediaRecorderRef = useRef(null);
   const recordedChunksRef = useRef([]);
   const recordingTimerRef = useRef(null);
+  const pcmCaptureRef = useRef(null);
+  const pcmCaptureTokenRef = useRef(null);
 
   // Get available media devices
   const getDevices = useCallback(async () => {
@@ -77,7 +123,21 @@ export const useWebRTC = () => {
   }, [selectedCamera, selectedMicrophone]);
 
   // Stop video stream
+  // Stop PCM capture started by startPcmCapture
+  const stopPcmCapture = useCallback(() => {
+    pcmCaptureTokenRef.current = null;
+    if (pcmCaptureRef.current) {
+      const { context, source, node } = pcmCaptureRef.current;
+      node.port.onmessage = null;
+      source.disconnect();
+      node.disconnect();
+      context.close();
+      pcmCaptureRef.current = null;
+    }
+  }, []);
+
   const stopVideo = useCallback(() => {
+    stopPcmCapture();
     if (streamRef.current) {
       streamRef.current.getTracks().forEach(track => {
         track.stop();
@@ -91,10 +151,11 @@ export const useWebRTC = () => {
 
     setIsVideoEnabled(false);
     setIsAudioEnabled(false);
-  }, []);
+  }, [stopPcmCapture]);
 
-  // Start recording
-  const startRecording = useCallback(async () => {
+  // Start recording. With onChunk, each one-second chunk is handed over as
+  // onChunk(blob, elapsedSeconds, mimeType) instead of being kept in memory
+  const startRecording = useCallback(async (onChunk = null) => {
     try {
       if (!streamRef.current) {
         await startVideo();
@@ -129,9 +190,14 @@ export const useWebRTC = () => {
       mediaRecorderRef.current = mediaRecorder;
 
       // Handle data available
+      const startedAt = Date.now();
       mediaRecorder.ondataavailable = (event) => {
         if (event.data && event.data.size > 0) {
-          recordedChunksRef.current.push(event.data);
+          if (onChunk) {
+            onChunk(event.data, (Date.now() - startedAt) / 1000, mediaRecorder.mimeType);
+          } else {
+            recordedChunksRef.current.push(event.data);
+          }
         }
       };
 
@@ -161,7 +227,8 @@ export const useWebRTC = () => {
   // Stop recording
   const stopRecording = useCallback(() => {
     return new Promise((resolve) => {
-      if (mediaRecorderRef.current && isRecording) {
+      // Checked on the recorder itself; callers may hold a stale isRecording
+      if (mediaRecorderRef.current && mediaRecorderRef.current.state !== 'inactive') {
         mediaRecorderRef.current.onstop = () => {
           const blob = new Blob(recordedChunksRef.current, {
             type: mediaRecorderRef.current.mimeType || 'video/webm'
@@ -183,7 +250,85 @@ export const useWebRTC = () => {
         recordingTimerRef.current = null;
       }
     });
-  }, [isRecording]);
+  }, []);
+
+  // Record a standalone audio-only clip for transcription
+  const captureAudioChunk = useCallback((durationMs = 2000) => {
+    return new Promise((resolve, reject) => {
+      const audioTracks = streamRef.current?.getAudioTracks() || [];
+      if (audioTracks.length === 0) {
+        reject(new Error('No audio track available'));
+        return;
+      }
+
+      const mimeType = MediaRecorder.isTypeSupported('audio/webm;codecs=opus') ? 'audio/webm;codecs=opus' : 'audio/webm';
+      const recorder = new MediaRecorder(new MediaStream(audioTracks), { mimeType });
+      const chunks = [];
+
+      recorder.ondataavailable = (event) => {
+        if (event.data && event.data.size > 0) {
+          chunks.push(event.data);
+        }
+      };
+      recorder.onstop = () => resolve(new Blob(chunks, { type: mimeType }));
+      recorder.onerror = (event) => reject(event.error);
+
+      recorder.start();
+      setTimeout(() => recorder.state !== 'inactive' && recorder.stop(), durationMs);
+    });
+  }, []);
+
+  // Stream the microphone as raw 16-bit mono PCM, which the server can run
+  // voice activity detection on. onFrame(buffer, startedAt, duration,
+  // sampleRate) is called every frameMs; startedAt follows the sample
+  // clock, so consecutive frames line up exactly. Rejects where
+  // AudioWorklet is unavailable; a start that is stopped or superseded
+  // while loading resolves without capturing
+  const startPcmCapture = useCallback(async (onFrame, frameMs = 2000, targetRate = 16000) => {
+    stopPcmCapture();
+    const token = {};
+    pcmCaptureTokenRef.current = token;
+
+    const audioTracks = streamRef.current?.getAudioTracks() || [];
+    if (audioTracks.length === 0) {
+      throw new Error('No audio track available');
+    }
+    if (typeof AudioWorkletNode === 'undefined') {
+      throw new Error('AudioWorklet is not supported');
+    }
+
+    const context = new AudioContext();
+    const moduleUrl = URL.createObjectURL(new Blob([PCM_CAPTURE_WORKLET], { type: 'application/javascript' }));
+    try {
+      await context.audioWorklet.addModule(moduleUrl);
+    } catch (err) {
+      context.close();
+      throw err;
+    } finally {
+      URL.revokeObjectURL(moduleUrl);
+    }
+    if (pcmCaptureTokenRef.current !== token) {
+      context.close();
+      return;
+    }
+
+    const source = context.createMediaStreamSource(new MediaStream(audioTracks));
+    const node = new AudioWorkletNode(context, 'pcm-capture', {
+      processorOptions: { targetRate, frameSamples: Math.round(targetRate * frameMs / 1000) }
+    });
+
+    let startedAt = Date.now() / 1000;
+    node.port.onmessage = (event) => {
+      const duration = event.data.byteLength / 2 / targetRate;
+      onFrame(event.data, startedAt, duration, targetRate);
+      startedAt += duration;
+    };
+
+    // The node outputs silence; it is connected only so it keeps processing
+    source.connect(node);
+    node.connect(context.destination);
+    pcmCaptureRef.current = { context, source, node };
+  }, [stopPcmCapture]);
 
   // Get recording blob
   const getRecordingBlob = useCallback(() => {
@@ -210,34 +355,97 @@ export const useWebRTC = () => {
     }
   }, [getRecordingBlob]);
 
-  // Upload recording to server
-  const uploadRecording = useCallback(async (sessionId, questionId) => {
+  // Upload recording to server in resumable chunks; a failed chunk is retried
+  // from the offset the server reports, so a dropped connection only resends
+  // the chunk in flight
+  const uploadRecording = useCallback(async (sessionId, questionId, chunkSize = 4 * 1024 * 1024) => {
     const blob = getRecordingBlob();
     if (!blob) {
       throw new Error('No recording available');
     }
 
-    const formData = new FormData();
-    formData.append('recording', blob, `recording-${sessionId}-${questionId}-${Date.now()}.webm`);
-    formData.append('session_id', sessionId);
-    formData.append('question_id', questionId || '');
-    formData.append('recording_type', 'video');
-    formData.append('duration', recordingDuration.toString());
+    const requestJson = async (url, options = {}) => {
+      const response = await fetch(url, { credentials: 'include', ...options });
+      const body = await response.json();
+      return { ok: response.ok, status: response.status, body };
+    };
+
+    const sha256Base64 = async (data) => {
+      const digest = await crypto.subtle.digest('SHA-256', data);
+      return btoa(String.fromCharCode(...new Uint8Array(digest)));
+    };
 
     try {
-      const response = await fetch('/api/interview/upload-recording', {
+      const created = await requestJson('/api/interview/uploads', {
         method: 'POST',
-        body: formData,
-        credentials: 'include'
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          session_id: sessionId,
+          question_id: questionId || '',
+          recording_type: 'video',
+          duration: recordingDuration,
+          total_size: blob.size,
+          filename: `recording-${sessionId}-${questionId}-${Date.now()}.webm`,
+        }),
       });
+      if (!created.ok) {
+        throw new Error(created.body.error || 'Upload failed');
+      }
 
-      if (!response.ok) {
-        throw new Error('Upload failed');
+      const uploadUrl = `/api/interview/uploads/${created.body.upload_id}`;
+      const size = Math.min(chunkSize, created.body.max_chunk_size);
+      let offset = created.body.offset;
+      let failures = 0;
+
+      while (offset < blob.size) {
+        const chunk = await blob.slice(offset, offset + size).arrayBuffer();
+        let sent = null;
+        try {
+          sent = await requestJson(uploadUrl, {
+            method: 'PATCH',
+            headers: {
+              'Content-Type': 'application/offset+octet-stream',
+              'Upload-Offset': String(offset),
+              'Upload-Checksum': `sha256 ${await sha256Base64(chunk)}`,
+            },
+            body: chunk,
+          });
+        } catch (err) {
+          console.warn('Chunk upload interrupted:', err);
+        }
+
+        if (sent && sent.ok) {
+          offset = sent.body.offset;
+          failures = 0;
+          continue;
+        }
+        if (sent && sent.status === 404) {
+          throw new Error('Upload expired');
+        }
+
+        // Resume from wherever the server got to
+        failures += 1;
+        if (failures > 5) {
+          throw new Error('Upload failed');
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+        const status = await requestJson(uploadUrl);
+        if (status.ok) {
+          offset = status.body.offset;
+        }
+      }
+
+      const finalized = await requestJson(`${uploadUrl}/finalize`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ duration: recordingDuration }),
+      });
+      if (!finalized.ok) {
+        throw new Error(finalized.body.error || 'Upload failed');
       }
 
-      const result = await response.json();
-      console.log('Recording uploaded successfully:', result);
-      return result;
+      console.log('Recording uploaded successfully:', finalized.body);
+      return finalized.body;
     } catch (err) {
       console.error('Error uploading recording:', err);
       throw err;
@@ -313,6 +521,9 @@ export const useWebRTC = () => {
     downloadRecording,
     uploadRecording,
     getRecordingBlob,
+    captureAudioChunk,
+    startPcmCapture,
+    stopPcmCapture,
     setSelectedCamera,
     setSelectedMicrophone,
     getDevices,
@@ -23,6 +23,19 @@ import {
   CheckCircle
 } from 'lucide-react';
 import { adminAPI } from '../services/api';
+import socketService from '../services/socket';
+
+// Merge a live session delta into the dashboard's session list. Deltas carry
+// absolute field values, so reapplying one is harmless
+const applySessionDelta = (sessions, delta) => {
+  const exists = sessions.some(session => session.id === delta.session.id);
+  if (!exists) {
+    return delta.type === 'session_created' ? [delta.session, ...sessions] : sessions;
+  }
+  return sessions.map(session => session.id === delta.session.id
+    ? { ...session, ...delta.session }
+    : session);
+};
 
 const AdminDashboard = () => {
   const [admin, setAdmin] = useState(null);
@@ -60,16 +73,48 @@ const AdminDashboard = () => {
     checkAuth();
   }, [navigate]);
 
+  // Sessions arrive as a snapshot over the admin socket, then as deltas
+  useEffect(() => {
+    if (!admin) return;
+
+    let snapshotReceived = false;
+    let earlyDeltas = [];
+
+    socketService.connectAdmin();
+    socketService.onSessionsSnapshot((data) => {
+      // Deltas that raced ahead of the snapshot are replayed on top of it
+      setSessions(earlyDeltas.reduce(applySessionDelta, data.sessions || []));
+      earlyDeltas = [];
+      snapshotReceived = true;
+    });
+    socketService.onSessionDelta((delta) => {
+      if (!snapshotReceived) {
+        earlyDeltas.push(delta);
+        return;
+      }
+      setSessions(prev => applySessionDelta(prev, delta));
+    });
+    socketService.onAdminConnectError(async (err) => {
+      console.error('Admin live feed unavailable:', err);
+      if (!snapshotReceived) {
+        const sessionsResponse = await adminAPI.getSessions();
+        setSessions(sessionsResponse.sessions || []);
+      }
+    });
+
+    return () => {
+      socketService.disconnectAdmin();
+    };
+  }, [admin]);
+
   const loadDashboardData = async () => {
     try {
-      const [codesResponse, sessionsResponse, questionSetsResponse] = await Promise.all([
+      const [codesResponse, questionSetsResponse] = await Promise.all([
         adminAPI.getCodes(),
-        adminAPI.getSessions(),
         adminAPI.getQuestionSets()
       ]);
 
       setCodes(codesResponse.codes || []);
-      setSessions(sessionsResponse.sessions || []);
       setQuestionSets(questionSetsResponse.question_sets || []);
     } catch (err) {
       console.error('Failed to load dashboard data:', err);
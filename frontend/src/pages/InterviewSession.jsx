@@ -50,12 +50,18 @@ const InterviewSession = () => {
     startRecording,
     stopRecording,
     captureAudioChunk,
+    startPcmCapture,
+    stopPcmCapture,
     error: webrtcError
   } = useWebRTC();
 
   // Timer ref
   const timerRef = useRef(null);
   const transcriptIntervalRef = useRef(null);
+  const transcriptionActiveRef = useRef(false);
+  const audioChunkMsRef = useRef(2000);
+  const recordingChunkSeqRef = useRef(0);
+  const pendingRecordingChunksRef = useRef([]);
 
   // Initialize session
   useEffect(() => {
@@ -106,8 +112,26 @@ const InterviewSession = () => {
       setTranscript(prev => prev + ' ' + data.text);
     });
 
+    // Streamed hints grow a placeholder message until the final response replaces it
+    socketService.onAIResponseDelta((data) => {
+      setAiMessages(prev => {
+        const streaming = prev.find(message => message.id === 'streaming');
+        if (streaming) {
+          return prev.map(message => message.id === 'streaming'
+            ? { ...message, message: message.message + data.delta }
+            : message);
+        }
+        return [...prev, {
+          id: 'streaming',
+          type: data.type,
+          message: data.delta,
+          timestamp: new Date()
+        }];
+      });
+    });
+
     socketService.onAIResponse((data) => {
-      setAiMessages(prev => [...prev, {
+      setAiMessages(prev => [...prev.filter(message => message.id !== 'streaming'), {
         id: Date.now(),
         type: data.response.type,
         message: data.response.message,
@@ -115,6 +139,13 @@ const InterviewSession = () => {
       }]);
     });
 
+    // Send audio less often while the server is saturated
+    socketService.onFlowControl((data) => {
+      if (transcriptionActiveRef.current && data.chunk_ms !== audioChunkMsRef.current) {
+        startTranscriptionCapture(data.chunk_ms);
+      }
+    });
+
     socketService.onError((error) => {
       console.error('Socket error:', error);
       setError(error.message);
@@ -126,9 +157,7 @@ const InterviewSession = () => {
     if (timerRef.current) {
       clearInterval(timerRef.current);
     }
-    if (transcriptIntervalRef.current) {
-      clearInterval(transcriptIntervalRef.current);
-    }
+    stopTranscriptionCapture();
     stopMedia();
     socketService.leaveInterview(sessionId);
     socketService.disconnect();
@@ -148,7 +177,7 @@ const InterviewSession = () => {
         setSessionStatus('active');
         
         // Start recording
-        startRecording();
+        startQuestionRecording(response.current_question.id);
         
         // Start timer
         startQuestionTimer(response.current_question.time_limit);
@@ -185,23 +214,67 @@ const InterviewSession = () => {
     }, 1000);
   };
 
-  // Start transcription capture
-  const startTranscriptionCapture = () => {
+  // Start transcription capture. Raw PCM lets the server skip silence and
+  // merge speech into windows; browsers without AudioWorklet send
+  // compressed chunks, which are transcribed one by one
+  const startTranscriptionCapture = async (chunkMs = 2000) => {
+    stopTranscriptionCapture();
+    transcriptionActiveRef.current = true;
+    audioChunkMsRef.current = chunkMs;
+    
+    try {
+      await startPcmCapture((buffer, startedAt, duration, sampleRate) => {
+        socketService.sendAudioFrame(sessionId, buffer, startedAt, duration, 'pcm', sampleRate);
+      }, chunkMs);
+      return;
+    } catch (err) {
+      console.warn('PCM capture unavailable, sending compressed audio:', err);
+    }
+    
     transcriptIntervalRef.current = setInterval(async () => {
       try {
-        const audioBlob = await captureAudioChunk(2000); // 2 second chunks
+        const startedAt = Date.now() / 1000;
+        const audioBlob = await captureAudioChunk(chunkMs);
         
-        // Convert to base64 for transmission
-        const reader = new FileReader();
-        reader.onloadend = () => {
-          const base64Audio = reader.result.split(',')[1];
-          socketService.sendAudioData(sessionId, base64Audio, Date.now());
-        };
-        reader.readAsDataURL(audioBlob);
+        // Sent as a binary attachment; no base64 round trip
+        const audioBuffer = await audioBlob.arrayBuffer();
+        socketService.sendAudioFrame(sessionId, audioBuffer, startedAt, chunkMs / 1000);
       } catch (err) {
         console.error('Failed to capture audio:', err);
       }
-    }, 2000);
+    }, chunkMs);
+  };
+
+  const stopTranscriptionCapture = () => {
+    transcriptionActiveRef.current = false;
+    stopPcmCapture();
+    if (transcriptIntervalRef.current) {
+      clearInterval(transcriptIntervalRef.current);
+      transcriptIntervalRef.current = null;
+    }
+  };
+
+  // Each question gets its own recorder, so every spooled file on the server
+  // starts with a container header; chunks are streamed as they are produced
+  const startQuestionRecording = (questionId) => {
+    recordingChunkSeqRef.current = 0;
+    pendingRecordingChunksRef.current = [];
+    startRecording((blob, elapsed, mimeType) => {
+      const seq = recordingChunkSeqRef.current++;
+      pendingRecordingChunksRef.current.push(
+        blob.arrayBuffer().then(buffer => socketService.sendRecordingChunk(
+          sessionId, questionId, seq, buffer, elapsed, mimeType
+        ))
+      );
+    });
+  };
+
+  // Stop the question's recorder and wait until the server has every chunk,
+  // since moving on seals the question's recording
+  const finishQuestionRecording = async () => {
+    await stopRecording();
+    await Promise.all(pendingRecordingChunksRef.current);
+    pendingRecordingChunksRef.current = [];
   };
 
   // Handle next question
@@ -218,6 +291,8 @@ const InterviewSession = () => {
         );
       }
 
+      await finishQuestionRecording();
+
       // Move to next question
       const response = await interviewAPI.nextQuestion(sessionId);
       
@@ -231,6 +306,7 @@ const InterviewSession = () => {
           setQuestionIndex(prev => prev + 1);
           setTranscript('');
           setAiMessages([]);
+          startQuestionRecording(response.current_question.id);
           
           // Restart timer
           if (timerRef.current) {
@@ -248,8 +324,8 @@ const InterviewSession = () => {
   // Handle interview completion
   const handleInterviewComplete = async () => {
     try {
-      // Stop recording
-      const recordingBlob = await stopRecording();
+      // Stop recording; the server stores whatever was streamed
+      await finishQuestionRecording();
       
       // Stop media
       stopMedia();
@@ -263,9 +339,7 @@ const InterviewSession = () => {
       if (timerRef.current) {
         clearInterval(timerRef.current);
       }
-      if (transcriptIntervalRef.current) {
-        clearInterval(transcriptIntervalRef.current);
-      }
+      stopTranscriptionCapture();
     } catch (err) {
       console.error('Failed to complete interview:', err);
     }
@@ -278,7 +352,8 @@ const InterviewSession = () => {
         sessionId,
         currentQuestion.id,
         transcript,
-        'hint'
+        'hint',
+        true
       );
     }
   };
@@ -77,21 +77,14 @@ const SessionDetails = () => {
     return `${mins}:${secs.toString().padStart(2, '0')}`;
   };
 
-  const downloadRecording = async (recordingId) => {
-    try {
-      const response = await adminAPI.downloadRecording(recordingId);
-      // Handle download
-      const url = window.URL.createObjectURL(new Blob([response.data]));
-      const link = document.createElement('a');
-      link.href = url;
-      link.setAttribute('download', `recording_${recordingId}.webm`);
-      document.body.appendChild(link);
-      link.click();
-      link.remove();
-    } catch (err) {
-      console.error('Failed to download recording:', err);
-      setError('Failed to download recording');
-    }
+  const downloadRecording = (recordingId) => {
+    // The server answers with the file as an attachment, so navigating to it
+    // downloads without leaving the page
+    const link = document.createElement('a');
+    link.href = adminAPI.getRecordingDownloadUrl(recordingId);
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
   };
 
   if (loading) {
@@ -159,12 +159,10 @@ export const adminAPI = {
     return response.data;
   },
 
-  // Download recording
-  downloadRecording: async (recordingId) => {
-    const response = await api.get(`/api/admin/recordings/${recordingId}/download`, {
-      responseType: 'blob'
-    });
-    return response;
+  // Recording download URL; opened directly so the browser follows the
+  // redirect to cloud storage and can stream byte ranges of local files
+  getRecordingDownloadUrl: (recordingId) => {
+    return `${API_BASE_URL}/api/admin/recordings/${recordingId}/download`;
   },
 
   // Get single session
@@ -6,6 +6,19 @@ class SocketService {
   constructor() {
     this.socket = null;
     this.isConnected = false;
+    this.adminSocket = null;
+    this.heartbeatTimer = null;
+    // Sequence numbers are per stream (one per page load) so the server can
+    // drop retried events; a reload starts a new stream
+    this.streamId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+    this.audioSeq = 0;
+    this.segmentSeq = 0;
+    // Session events carry consecutive event_ids; lastEventId is the highest
+    // id up to which every event has been seen, and is sent on rejoin so the
+    // server replays only what was missed
+    this.sessionId = null;
+    this.lastEventId = null;
+    this.eventIdsAhead = new Set();
   }
 
   connect() {
@@ -28,11 +41,31 @@ class SocketService {
       this.socket.on('error', (error) => {
         console.error('Socket error:', error);
       });
+
+      // Rejoin after a dropped connection, asking for missed events
+      this.socket.io.on('reconnect', () => {
+        if (this.sessionId) {
+          this.socket.emit('join_interview', {
+            session_id: this.sessionId,
+            last_event_id: this.lastEventId,
+          });
+        }
+      });
+
+      this.socket.on('joined_interview', (data) => {
+        if (this.lastEventId === null && data.last_event_id != null) {
+          this.lastEventId = data.last_event_id;
+        }
+        if (data.replay && !data.replay.complete) {
+          console.warn('Some session events were missed and could not be replayed');
+        }
+      });
     }
     return this.socket;
   }
 
   disconnect() {
+    this.stopHeartbeat();
     if (this.socket) {
       this.socket.disconnect();
       this.socket = null;
@@ -40,26 +73,100 @@ class SocketService {
     }
   }
 
+  // Returns false for an event_id already seen (replays may repeat events)
+  acceptEvent(eventId) {
+    if (eventId == null) {
+      return true;
+    }
+    if (this.lastEventId === null) {
+      this.lastEventId = eventId;
+      return true;
+    }
+    if (eventId <= this.lastEventId || this.eventIdsAhead.has(eventId)) {
+      return false;
+    }
+    this.eventIdsAhead.add(eventId);
+    // Events the server dropped for a slow connection never arrive; stop
+    // waiting for them once the server's replay window has been passed
+    if (this.eventIdsAhead.size > 200) {
+      this.lastEventId = Math.min(...this.eventIdsAhead) - 1;
+    }
+    while (this.eventIdsAhead.has(this.lastEventId + 1)) {
+      this.lastEventId += 1;
+      this.eventIdsAhead.delete(this.lastEventId);
+    }
+    return true;
+  }
+
   // Interview session events
   joinInterview(sessionId) {
     if (this.socket) {
-      this.socket.emit('join_interview', { session_id: sessionId });
+      if (sessionId !== this.sessionId) {
+        this.sessionId = sessionId;
+        this.lastEventId = null;
+        this.eventIdsAhead.clear();
+      }
+      this.socket.emit('join_interview', { session_id: sessionId, last_event_id: this.lastEventId });
+      this.startHeartbeat(sessionId);
     }
   }
 
   leaveInterview(sessionId) {
+    this.stopHeartbeat();
+    this.sessionId = null;
     if (this.socket) {
       this.socket.emit('leave_interview', { session_id: sessionId });
     }
   }
 
+  // Keeps the session registered on the server while no other events are sent;
+  // sessions without a heartbeat are evicted after SESSION_IDLE_TIMEOUT
+  startHeartbeat(sessionId, intervalMs = 30000) {
+    this.stopHeartbeat();
+    this.heartbeatTimer = setInterval(() => {
+      if (this.socket && this.isConnected) {
+        this.socket.emit('heartbeat', { session_id: sessionId });
+      }
+    }, intervalMs);
+  }
+
+  stopHeartbeat() {
+    if (this.heartbeatTimer) {
+      clearInterval(this.heartbeatTimer);
+      this.heartbeatTimer = null;
+    }
+  }
+
   // Audio/Video events
-  sendAudioData(sessionId, audioData, timestamp) {
+  // Sends audio as a binary attachment (ArrayBuffer) with a per-stream
+  // sequence number. timestamp and duration are in seconds. format 'pcm'
+  // (16-bit mono at sampleRate) lets the server merge chunks into speech
+  // windows and skip silence before transcription
+  sendAudioFrame(sessionId, audioBuffer, timestamp, duration, format = 'webm', sampleRate = 16000) {
+    if (this.socket) {
+      this.audioSeq += 1;
+      this.socket.emit('audio_data', {
+        session_id: sessionId,
+        stream_id: this.streamId,
+        seq: this.audioSeq,
+        audio_data: audioBuffer,
+        timestamp: timestamp,
+        duration: duration,
+        format: format,
+        sample_rate: sampleRate,
+      });
+    }
+  }
+
+  // Legacy base64 variant of sendAudioFrame
+  sendAudioData(sessionId, audioData, timestamp, format = 'webm', sampleRate = 16000) {
     if (this.socket) {
       this.socket.emit('audio_data', {
         session_id: sessionId,
         audio_data: audioData,
         timestamp: timestamp,
+        format: format,
+        sample_rate: sampleRate,
       });
     }
   }
@@ -84,8 +191,11 @@ class SocketService {
   // Transcript events
   sendTranscriptSegment(sessionId, text, confidence, startTime, endTime, questionId) {
     if (this.socket) {
+      this.segmentSeq += 1;
       this.socket.emit('transcript_segment', {
         session_id: sessionId,
+        stream_id: this.streamId,
+        seq: this.segmentSeq,
         text: text,
         confidence: confidence,
         start_time: startTime,
@@ -96,18 +206,45 @@ class SocketService {
   }
 
   // AI response events
-  requestAIResponse(sessionId, questionId, transcriptContext, type = 'hint') {
+  requestAIResponse(sessionId, questionId, transcriptContext, type = 'hint', stream = false) {
     if (this.socket) {
       this.socket.emit('ai_response_request', {
         session_id: sessionId,
         question_id: questionId,
         transcript_context: transcriptContext,
         type: type,
+        stream: stream,
       });
     }
   }
 
   // Recording events
+  // Streams a MediaRecorder chunk to the server's spool for the question.
+  // Chunks are numbered from 0 per recorder; the server writes them in that
+  // order and ignores repeats, so an unacknowledged chunk is simply resent.
+  // Resolves with the acknowledgement, or null if the server never answered
+  async sendRecordingChunk(sessionId, questionId, seq, chunk, elapsed, mimeType, attempts = 3, timeoutMs = 10000) {
+    for (let attempt = 0; attempt < attempts; attempt += 1) {
+      if (!this.socket) {
+        return null;
+      }
+      try {
+        return await this.socket.timeout(timeoutMs).emitWithAck('recording_chunk', {
+          session_id: sessionId,
+          question_id: questionId,
+          stream_id: this.streamId,
+          seq: seq,
+          chunk: chunk,
+          elapsed: elapsed,
+          mime_type: mimeType,
+        });
+      } catch (err) {
+        console.warn(`Recording chunk ${seq} not acknowledged, retrying`);
+      }
+    }
+    return null;
+  }
+
   sendRecordingMetadata(sessionId, questionId, type, fileInfo) {
     if (this.socket) {
       this.socket.emit('recording_metadata', {
@@ -148,15 +285,48 @@ class SocketService {
     }
   }
 
-  onTranscriptUpdate(callback) {
+  // The server batches transcript updates: { room, updates: [...], dropped }.
+  // Each batch is acknowledged so the server can hold back updates while this
+  // client is slow; dropped > 0 means updates were skipped to catch up
+  onTranscriptUpdate(callback, onDropped) {
     if (this.socket) {
-      this.socket.on('transcript_update', callback);
+      this.socket.on('transcript_update', (data) => {
+        if (this.acceptEvent(data.event_id)) {
+          callback(data);
+        }
+      });
+      this.socket.on('transcript_updates', (batch, ack) => {
+        if (batch.dropped > 0 && onDropped) {
+          onDropped(batch.dropped);
+        }
+        batch.updates.filter(update => this.acceptEvent(update.event_id)).forEach(callback);
+        if (ack) {
+          ack();
+        }
+      });
     }
   }
 
   onAIResponse(callback) {
     if (this.socket) {
-      this.socket.on('ai_response', callback);
+      this.socket.on('ai_response', (data) => {
+        if (this.acceptEvent(data.event_id)) {
+          callback(data);
+        }
+      });
+    }
+  }
+
+  // Server pressure: { level: 'ok' | 'busy' | 'saturated', chunk_ms }
+  onFlowControl(callback) {
+    if (this.socket) {
+      this.socket.on('flow_control', callback);
+    }
+  }
+
+  onAIResponseDelta(callback) {
+    if (this.socket) {
+      this.socket.on('ai_response_delta', callback);
     }
   }
 
@@ -190,6 +360,44 @@ class SocketService {
     }
   }
 
+  // Admin monitoring: a 'sessions_snapshot' on connect, then 'session_delta'
+  // events ({ type, session: { id, ...changed fields } }). Requires the admin
+  // session cookie, so the connection is made with credentials
+  connectAdmin() {
+    if (!this.adminSocket) {
+      this.adminSocket = io(`${SOCKET_URL}/admin`, {
+        transports: ['websocket', 'polling'],
+        withCredentials: true,
+      });
+    }
+    return this.adminSocket;
+  }
+
+  disconnectAdmin() {
+    if (this.adminSocket) {
+      this.adminSocket.disconnect();
+      this.adminSocket = null;
+    }
+  }
+
+  onSessionsSnapshot(callback) {
+    if (this.adminSocket) {
+      this.adminSocket.on('sessions_snapshot', callback);
+    }
+  }
+
+  onSessionDelta(callback) {
+    if (this.adminSocket) {
+      this.adminSocket.on('session_delta', callback);
+    }
+  }
+
+  onAdminConnectError(callback) {
+    if (this.adminSocket) {
+      this.adminSocket.on('connect_error', callback);
+    }
+  }
+
   // Remove event listeners
   off(event, callback) {
     if (this.socket) {